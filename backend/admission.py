@@ -0,0 +1,183 @@
+import functools
+import math
+import threading
+import time
+from typing import Dict, Any, Tuple
+
+from flask import request, jsonify
+
+from config import ADMISSION_API_KEYS
+from metrics import registry
+
+
+ADMISSION_IN_FLIGHT = registry.gauge(
+    'meritel_admission_in_flight',
+    'Admitted requests currently running per endpoint class',
+    ('endpoint_class',)
+)
+ADMISSION_QUEUED = registry.gauge(
+    'meritel_admission_queued',
+    'Requests waiting for a slot per endpoint class',
+    ('endpoint_class',)
+)
+ADMISSION_REJECTED = registry.counter(
+    'meritel_admission_rejected_total',
+    'Requests rejected with 429 per endpoint class and reason',
+    ('endpoint_class', 'reason')
+)
+ADMISSION_QUEUE_WAIT = registry.histogram(
+    'meritel_admission_queue_wait_seconds',
+    'Time admitted requests spent queued',
+    ('endpoint_class',)
+)
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, endpoint_class: str, reason: str, retry_after: int):
+        super().__init__(f'{endpoint_class} is at capacity ({reason})')
+        self.endpoint_class = endpoint_class
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _EndpointClass:
+    def __init__(self, name: str, concurrency: int, queue: int, lock: threading.Lock):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = queue
+        self.in_flight = 0
+        self.queued = 0
+        self.per_key: Dict[str, int] = {}
+        # Moving average of how long a slot is held, for Retry-After
+        self.avg_duration = 0.0
+        # One per class, so a freed slot wakes a waiter that can take it
+        self.condition = threading.Condition(lock)
+
+
+class AdmissionController:
+    """
+    Concurrency caps with a short bounded queue for expensive endpoints.
+
+    Each endpoint class has a number of slots and a queue. A request takes
+    a free slot, or waits up to `queue_timeout` seconds in the queue; once
+    the queue is full, it is rejected at once. Independently, no single
+    caller (API key, else client address) may hold more than
+    `per_key_concurrency` slots of a class, so one client cannot fill it.
+    Limits are per server process.
+    """
+
+    def __init__(self, limits: Dict[str, Dict[str, int]], per_key_concurrency: int = 2,
+                 queue_timeout: float = 10.0):
+        self._lock = threading.Lock()
+        self.classes = {
+            name: _EndpointClass(name, settings['concurrency'], settings['queue'], self._lock)
+            for name, settings in limits.items()
+        }
+        self.per_key_concurrency = per_key_concurrency
+        self.queue_timeout = queue_timeout
+
+    def acquire(self, endpoint_class: str, key: str) -> Tuple[str, str, float]:
+        cls = self.classes[endpoint_class]
+        with self._lock:
+            if cls.per_key.get(key, 0) >= self.per_key_concurrency:
+                self._reject(cls, 'key_limit')
+
+            if cls.in_flight >= cls.concurrency:
+                if cls.queued >= cls.max_queue:
+                    self._reject(cls, 'queue_full')
+
+                cls.queued += 1
+                ADMISSION_QUEUED.set(cls.queued, endpoint_class=cls.name)
+                queued_at = time.monotonic()
+                deadline = queued_at + self.queue_timeout
+                try:
+                    while cls.in_flight >= cls.concurrency:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._reject(cls, 'queue_timeout')
+                        cls.condition.wait(remaining)
+                finally:
+                    cls.queued -= 1
+                    ADMISSION_QUEUED.set(cls.queued, endpoint_class=cls.name)
+                ADMISSION_QUEUE_WAIT.observe(time.monotonic() - queued_at, endpoint_class=cls.name)
+
+                # Another request from this key may have been admitted meanwhile
+                if cls.per_key.get(key, 0) >= self.per_key_concurrency:
+                    cls.condition.notify()
+                    self._reject(cls, 'key_limit')
+
+            cls.in_flight += 1
+            cls.per_key[key] = cls.per_key.get(key, 0) + 1
+            ADMISSION_IN_FLIGHT.set(cls.in_flight, endpoint_class=cls.name)
+
+        return endpoint_class, key, time.monotonic()
+
+    def release(self, ticket: Tuple[str, str, float]):
+        endpoint_class, key, started = ticket
+        cls = self.classes[endpoint_class]
+        with self._lock:
+            cls.in_flight -= 1
+            cls.per_key[key] -= 1
+            if cls.per_key[key] <= 0:
+                del cls.per_key[key]
+
+            held = time.monotonic() - started
+            cls.avg_duration = held if cls.avg_duration == 0 else 0.8 * cls.avg_duration + 0.2 * held
+            ADMISSION_IN_FLIGHT.set(cls.in_flight, endpoint_class=cls.name)
+            cls.condition.notify()
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                name: {
+                    'concurrency': cls.concurrency,
+                    'in_flight': cls.in_flight,
+                    'queue': cls.max_queue,
+                    'queued': cls.queued,
+                    'avg_duration': round(cls.avg_duration, 3)
+                }
+                for name, cls in self.classes.items()
+            }
+
+    def _reject(self, cls: _EndpointClass, reason: str):
+        ADMISSION_REJECTED.inc(endpoint_class=cls.name, reason=reason)
+        # Roughly when a slot frees up for the requests ahead of this one
+        waves = (cls.queued + 1) / max(cls.concurrency, 1)
+        retry_after = max(1, math.ceil((cls.avg_duration or 5.0) * waves))
+        raise AdmissionRejected(cls.name, reason, retry_after)
+
+    def limit(self, endpoint_class: str):
+        """Route decorator holding a slot of `endpoint_class` for the request."""
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                try:
+                    ticket = self.acquire(endpoint_class, client_key())
+                except AdmissionRejected as e:
+                    return rejection_response(e)
+                try:
+                    return view(*args, **kwargs)
+                finally:
+                    self.release(ticket)
+            return wrapper
+        return decorator
+
+
+def client_key() -> str:
+    # An unknown key is not trusted: a new value per request would
+    # otherwise get a fresh per-caller allowance every time
+    api_key = request.headers.get('X-API-Key')
+    if api_key and api_key in ADMISSION_API_KEYS:
+        return f'key:{api_key}'
+    return f'addr:{request.remote_addr}'
+
+
+def rejection_response(error: AdmissionRejected):
+    response = jsonify({
+        'error': f'Too many concurrent {error.endpoint_class} requests, retry later',
+        'reason': error.reason,
+        'retry_after': error.retry_after
+    })
+    response.status_code = 429
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
@@ -1,16 +1,25 @@
-from flask import Flask, request, jsonify, redirect, session, send_file
+from flask import Flask, Response, g, request, jsonify, redirect, session, send_file
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit, join_room, leave_room
 import os
+import time
 import uuid
 from datetime import datetime, timedelta
 from pathlib import Path
 
 from config import (
-    SECRET_KEY, CORS_ORIGINS, UPLOAD_FOLDER, RECORDINGS_FOLDER,
+    SECRET_KEY, CORS_ORIGINS, UPLOAD_FOLDER, UPLOAD_SESSION_TTL, RECORDINGS_FOLDER,
     ZOOM_CLIENT_ID, ZOOM_CLIENT_SECRET, ZOOM_REDIRECT_URI,
     DEEPGRAM_API_KEY, ASSEMBLYAI_API_KEY, DEFAULT_TRANSCRIPTION_SERVICE,
-    OPENAI_API_KEY, DEEPSEEK_API_KEY, DEFAULT_SUMMARIZATION_SERVICE
+    OPENAI_API_KEY, DEEPSEEK_API_KEY, DEFAULT_SUMMARIZATION_SERVICE, SUMMARY_COMBINE_MAX_CHARS, SUMMARY_STREAMING,
+    RECORDING_CACHE_MAX_AGE, SILENCE_COMPACTION, SILENCE_THRESHOLD_DB, SILENCE_MIN_DURATION,
+    LIVE_TRANSCRIBE_SPAN, LIVE_IDLE_TIMEOUT,
+    PROFILER_SAMPLE_RATE, PROFILER_ALLOWED_CALLERS, PROFILER_MAX_PROFILES, PROFILER_INTERVAL,
+    ADMISSION_LIMITS, ADMISSION_PER_KEY_CONCURRENCY, ADMISSION_QUEUE_TIMEOUT,
+    SOCKETIO_ASYNC_MODE, SOCKETIO_MESSAGE_QUEUE, STATUS_PUBLISH_INTERVAL, STATUS_HEARTBEAT_INTERVAL,
+    STORAGE_FILE_LOCKS, JOURNAL_COMPACT_INTERVAL, JOURNAL_MAX_BYTES, STATS_REBUILD_INTERVAL,
+    ADMIN_ALLOWED_CALLERS, STORAGE_SHARD_DEPTH,
+    RETENTION_MAX_AGE_DAYS, RETENTION_INTERVAL, RETENTION_BATCH, RETENTION_BITRATE, RETENTION_DURATION_TOLERANCE
 )
 from storage import MeetingStorage
 from platform_integrations.zoom_integration import ZoomPlatform
@@ -18,24 +27,159 @@ from word_timestamp_transcriber import WordTimestampTranscriber
 from summarizer import MeetingSummarizer
 from meeting_bot import BotManager
 from audio_processor import AudioProcessor
+from waveform import WaveformStore
+from recording_variants import RecordingVariantCache
+from resumable_uploads import ResumableUploadStore, UploadError, UploadSessionSweeper
+from live_recording import LiveRecordingManager
+from metrics import registry as metrics_registry, REQUEST_DURATION, SOCKETIO_CONNECTIONS, ACTIVE_BOTS
+from profiler import RequestProfiler
+from tracing import tracer
+from admission import AdmissionController, AdmissionRejected, client_key, rejection_response
+from status_events import StatusPublisher, SummaryStream, MEETINGS_ROOM
+from change_journal import JournalCompactor
+from meeting_stats import StatsRebuilder
+from storage_layout import LayoutMigrator
+from blob_store import create_blob_store
+from retention import RecordingRetention, RetentionWorker
+import json_codec
+import archive
 
 app = Flask(__name__)
+if json_codec.BACKEND == 'orjson':
+    app.json = json_codec.FastJSONProvider(app)
 app.config['SECRET_KEY'] = SECRET_KEY
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['RECORDINGS_FOLDER'] = RECORDINGS_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 500 * 1024 * 1024
 
-CORS(app, resources={r"/api/*": {"origins": CORS_ORIGINS, "allow_headers": ["Content-Type", "Authorization"], "methods": ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"]}}, supports_credentials=True)
-socketio = SocketIO(app, cors_allowed_origins=CORS_ORIGINS)
+CORS(app, resources={r"/api/*": {"origins": CORS_ORIGINS, "allow_headers": ["Content-Type", "Authorization", "X-API-Key"], "expose_headers": ["Retry-After"], "methods": ["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"]}}, supports_credentials=True)
+socketio = SocketIO(
+    app,
+    cors_allowed_origins=CORS_ORIGINS,
+    async_mode=SOCKETIO_ASYNC_MODE,
+    message_queue=SOCKETIO_MESSAGE_QUEUE
+)
 
-storage = MeetingStorage(data_dir='data')
-bot_manager = BotManager(storage=storage)
+status_publisher = StatusPublisher(
+    socketio,
+    interval=STATUS_PUBLISH_INTERVAL,
+    heartbeat_interval=STATUS_HEARTBEAT_INTERVAL
+)
+storage = MeetingStorage(
+    data_dir='data',
+    on_meeting_update=status_publisher.publish,
+    file_locks=STORAGE_FILE_LOCKS,
+    journal_max_bytes=JOURNAL_MAX_BYTES,
+    shard_depth=STORAGE_SHARD_DEPTH
+)
+blob_store = create_blob_store(data_dir='data')
+bot_manager = BotManager(
+    storage=storage,
+    on_status=status_publisher.publish,
+    max_bots=ADMISSION_LIMITS['bot']['concurrency']
+)
+status_publisher.add_heartbeat(bot_manager.heartbeat)
+status_publisher.start()
+JournalCompactor(socketio, storage, interval=JOURNAL_COMPACT_INTERVAL).start()
+StatsRebuilder(socketio, storage, interval=STATS_REBUILD_INTERVAL).start()
+LayoutMigrator(socketio, storage).start()
 audio_processor = AudioProcessor()
+waveform_store = WaveformStore(data_dir='data')
+recording_variants = RecordingVariantCache(audio_processor, data_dir='data')
+retention = RecordingRetention(
+    storage,
+    blob_store,
+    audio_processor,
+    max_age_days=RETENTION_MAX_AGE_DAYS,
+    bitrate=RETENTION_BITRATE,
+    tolerance=RETENTION_DURATION_TOLERANCE
+)
+if RETENTION_MAX_AGE_DAYS > 0:
+    RetentionWorker(socketio, retention, interval=RETENTION_INTERVAL, batch=RETENTION_BATCH).start()
+resumable_uploads = ResumableUploadStore(UPLOAD_FOLDER, data_dir='data', max_size=app.config['MAX_CONTENT_LENGTH'])
+if UPLOAD_SESSION_TTL > 0:
+    UploadSessionSweeper(socketio, resumable_uploads, ttl=UPLOAD_SESSION_TTL,
+                         interval=min(UPLOAD_SESSION_TTL, 3600)).start()
+admission = AdmissionController(
+    ADMISSION_LIMITS,
+    per_key_concurrency=ADMISSION_PER_KEY_CONCURRENCY,
+    queue_timeout=ADMISSION_QUEUE_TIMEOUT
+)
+# A bot holds its admission slot from start until it is stopped
+bot_admissions = {}
+live_recordings = LiveRecordingManager(
+    storage,
+    audio_processor,
+    RECORDINGS_FOLDER,
+    span_seconds=LIVE_TRANSCRIBE_SPAN,
+    idle_timeout=LIVE_IDLE_TIMEOUT,
+    on_change=lambda meeting_id, version: broadcast_transcript_changes(meeting_id, version - 1),
+    on_finish=lambda meeting_id, recording: _finish_live_recording(meeting_id, recording)
+)
+
+request_profiler = RequestProfiler(
+    sample_rate=PROFILER_SAMPLE_RATE,
+    allowed_callers=PROFILER_ALLOWED_CALLERS,
+    max_profiles=PROFILER_MAX_PROFILES,
+    interval=PROFILER_INTERVAL
+)
+
+ACTIVE_BOTS.set_function(lambda: len(bot_manager.active_bots))
 
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(RECORDINGS_FOLDER, exist_ok=True)
 
 
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    
+    # Scrapes would otherwise dominate the trace file
+    if request.path != '/metrics':
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        g.trace_span = tracer.start_span(
+            f'{request.method} {route}',
+            meeting_id=(request.view_args or {}).get('meeting_id'),
+            **{'http.method': request.method, 'http.route': route}
+        )
+    
+    reason = request_profiler.should_profile(request.headers, request.remote_addr)
+    if reason:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        g.profile = request_profiler.start(request.method, request.path, route, reason)
+
+
+@app.after_request
+def record_request_latency(response):
+    started = g.pop('request_started', None)
+    if started is not None:
+        # The URL rule, not the path, keeps one series per route
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        REQUEST_DURATION.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            route=route,
+            status=response.status_code
+        )
+    g.response_status = response.status_code
+    tracer.set_attributes(**{'http.status_code': response.status_code})
+    return response
+
+
+@app.teardown_request
+def finish_request_profile(exc):
+    handle = g.pop('profile', None)
+    if handle:
+        request_profiler.finish(handle, g.pop('response_status', 500 if exc else None))
+    
+    tracer.end_span(g.pop('trace_span', None), exc)
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(metrics_registry.render(), content_type=metrics_registry.CONTENT_TYPE)
+
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     return jsonify({'status': 'healthy', 'timestamp': datetime.utcnow().isoformat()})
@@ -55,6 +199,12 @@ def list_meetings():
     return jsonify({'meetings': meetings})
 
 
+@app.route('/api/stats', methods=['GET'])
+def get_stats():
+    # Served from counters kept by storage; cost does not grow with the archive
+    return jsonify({'stats': storage.get_stats()})
+
+
 @app.route('/api/meetings', methods=['POST'])
 def create_meeting():
     data = request.get_json()
@@ -96,24 +246,45 @@ def update_meeting(meeting_id):
 
 @app.route('/api/meetings/<meeting_id>', methods=['DELETE'])
 def delete_meeting(meeting_id):
+    meeting = storage.get_meeting(meeting_id)
     success = storage.delete_meeting(meeting_id)
     if not success:
         return jsonify({'error': 'Meeting not found'}), 404
     
+    waveform_store.delete(meeting_id)
+    recording_variants.delete(meeting_id)
+    if meeting and meeting.get('audio_blob'):
+        blob_store.release(meeting['audio_blob'], meeting_id)
+    
     return jsonify({'message': 'Meeting deleted successfully'})
 
 
 @app.route('/api/meetings/<meeting_id>/transcript', methods=['GET'])
 def get_transcript(meeting_id):
+    since = request.args.get('since', type=int)
+    if since is not None:
+        changes = storage.get_transcript_changes(meeting_id, since)
+        if not changes:
+            return jsonify({'error': 'Transcript not found'}), 404
+        return jsonify({'changes': changes})
+    
     transcript = storage.get_detailed_transcript(meeting_id)
     if not transcript:
         return jsonify({'error': 'Transcript not found'}), 404
     
-    return jsonify({'transcript': transcript})
+    # Full transcripts run to several MB; stream instead of building one buffer
+    return json_codec.stream_response({'transcript': transcript})
 
 
 @app.route('/api/meetings/<meeting_id>/summary', methods=['GET'])
 def get_summary(meeting_id):
+    since = request.args.get('since', type=int)
+    if since is not None:
+        changes = storage.get_summary_changes(meeting_id, since)
+        if not changes:
+            return jsonify({'error': 'Summary not found'}), 404
+        return jsonify({'changes': changes})
+    
     summary = storage.get_structured_summary(meeting_id)
     if not summary:
         return jsonify({'error': 'Summary not found'}), 404
@@ -132,8 +303,8 @@ def update_action_item(meeting_id, action_item_id):
     if not success:
         return jsonify({'error': 'Action item not found'}), 404
     
-    summary = storage.get_structured_summary(meeting_id)
-    return jsonify({'summary': summary})
+    changes = broadcast_summary_changes(meeting_id)
+    return jsonify({'changes': changes})
 
 
 @app.route('/api/meetings/<meeting_id>/recording', methods=['GET'])
@@ -142,11 +313,71 @@ def get_recording(meeting_id):
     if not meeting:
         return jsonify({'error': 'Meeting not found'}), 404
     
-    audio_file_path = meeting.get('audio_file_path')
-    if not audio_file_path or not os.path.exists(audio_file_path):
+    audio_file_path = _recording_path(meeting)
+    if not audio_file_path:
         return jsonify({'error': 'Recording not found'}), 404
     
-    return send_file(audio_file_path, as_attachment=False)
+    variant = request.args.get('variant')
+    if variant and variant != 'original':
+        if variant not in RecordingVariantCache.VARIANTS:
+            return jsonify({'error': f'Unsupported recording variant: {variant}'}), 400
+        
+        try:
+            variant_path = recording_variants.get_variant(meeting_id, audio_file_path, variant)
+        except Exception as e:
+            return jsonify({'error': f'Failed to prepare recording variant: {str(e)}'}), 500
+        
+        return _send_recording(variant_path, mimetype='audio/webm')
+    
+    return _send_recording(audio_file_path)
+
+
+def _send_recording(file_path, mimetype=None):
+    # send_file answers Range and If-None-Match/If-Modified-Since itself
+    # (206/304) once it has a validator; the ETag only changes with the file
+    file_path = os.path.abspath(file_path)
+    stat = os.stat(file_path)
+    response = send_file(
+        file_path,
+        mimetype=mimetype,
+        as_attachment=False,
+        conditional=True,
+        etag=f'{stat.st_size:x}-{stat.st_mtime_ns:x}',
+        last_modified=stat.st_mtime,
+        max_age=RECORDING_CACHE_MAX_AGE
+    )
+    response.cache_control.public = False
+    response.cache_control.private = True
+    return response
+
+
+def _recording_path(meeting):
+    # Recordings from before the blob store are loose files
+    blob_id = meeting.get('audio_blob')
+    if blob_id:
+        return blob_store.local_path(blob_id)
+    
+    audio_file_path = meeting.get('audio_file_path')
+    return audio_file_path if audio_file_path and os.path.exists(audio_file_path) else None
+
+
+def _store_recording(meeting_id, file_path, name=None):
+    # Consumes file_path; identical recordings share one stored blob
+    blob_id = blob_store.put_file(file_path, meeting_id, name)
+    return {'audio_blob': blob_id, 'audio_file_path': blob_store.local_path(blob_id)}
+
+
+def _attach_recording(meeting_id, file_path, name=None, status='recorded'):
+    previous = (storage.get_meeting(meeting_id) or {}).get('audio_blob')
+    fields = _store_recording(meeting_id, file_path, name)
+    
+    updates = dict(fields, status=status) if status else fields
+    if not storage.update_meeting(meeting_id, updates):
+        blob_store.release(fields['audio_blob'], meeting_id)
+        return None
+    if previous and previous != fields['audio_blob']:
+        blob_store.release(previous, meeting_id)
+    return fields
 
 
 @app.route('/api/meetings/<meeting_id>/audio', methods=['GET'])
@@ -154,6 +385,35 @@ def get_audio(meeting_id):
     return get_recording(meeting_id)
 
 
+@app.route('/api/meetings/<meeting_id>/waveform', methods=['GET'])
+def get_waveform(meeting_id):
+    try:
+        start = float(request.args.get('start', 0))
+        end = float(request.args['end']) if 'end' in request.args else None
+        width = int(request.args['width']) if 'width' in request.args else None
+        level = int(request.args['level']) if 'level' in request.args else None
+    except ValueError:
+        return jsonify({'error': 'Invalid waveform range parameters'}), 400
+    
+    if not waveform_store.exists(meeting_id):
+        meeting = storage.get_meeting(meeting_id)
+        if not meeting:
+            return jsonify({'error': 'Meeting not found'}), 404
+        
+        audio_file_path = _recording_path(meeting)
+        if not audio_file_path:
+            return jsonify({'error': 'Recording not found'}), 404
+        
+        # Joins the generation already started by the upload, if any
+        waveform_store.generate_async(meeting_id, audio_file_path).join()
+    
+    waveform = waveform_store.get_peaks(meeting_id, start=start, end=end, width=width, level=level)
+    if not waveform:
+        return jsonify({'error': 'Waveform not found'}), 404
+    
+    return jsonify({'waveform': waveform})
+
+
 @app.route('/api/auth/zoom', methods=['GET'])
 def zoom_auth():
     if not ZOOM_CLIENT_ID or not ZOOM_CLIENT_SECRET:
@@ -224,6 +484,8 @@ def import_zoom_meeting():
         
         participants = zoom.get_participants(zoom_meeting_id)
         
+        meeting_id = str(uuid.uuid4())
+        recording = _store_recording(meeting_id, recording_path)
         meeting_data = {
             'title': meeting_details['title'],
             'description': meeting_details['description'],
@@ -231,15 +493,21 @@ def import_zoom_meeting():
             'platform': 'zoom',
             'platform_meeting_id': str(meeting_details['platform_meeting_id']),
             'join_url': meeting_details.get('join_url'),
-            'audio_file_path': recording_path,
+            'audio_file_path': recording['audio_file_path'],
+            'audio_blob': recording['audio_blob'],
             'duration': meeting_details['duration'] * 60,
             'status': 'recorded',
             'participants': participants,
             'started_at': meeting_details.get('start_time')
         }
         
-        meeting_id = storage.create_meeting(meeting_data)
+        try:
+            storage.create_meeting(meeting_data, meeting_id=meeting_id)
+        except Exception:
+            blob_store.release(recording['audio_blob'], meeting_id)
+            raise
         meeting = storage.get_meeting(meeting_id)
+        waveform_store.generate_async(meeting_id, recording['audio_file_path'])
         
         return jsonify({
             'message': 'Meeting imported successfully',
@@ -268,18 +536,27 @@ def upload_recording():
     
     try:
         file.save(file_path)
+        tracer.set_attributes(upload_bytes=os.path.getsize(file_path))
         
+        meeting_id = str(uuid.uuid4())
+        recording = _store_recording(meeting_id, file_path, file.filename)
         meeting_data = {
             'title': title,
             'description': description,
             'meeting_type': 'online',
             'platform': 'upload',
-            'audio_file_path': file_path,
+            'audio_file_path': recording['audio_file_path'],
+            'audio_blob': recording['audio_blob'],
             'status': 'recorded'
         }
         
-        meeting_id = storage.create_meeting(meeting_data)
+        try:
+            storage.create_meeting(meeting_data, meeting_id=meeting_id)
+        except Exception:
+            blob_store.release(recording['audio_blob'], meeting_id)
+            raise
         meeting = storage.get_meeting(meeting_id)
+        waveform_store.generate_async(meeting_id, recording['audio_file_path'])
         
         return jsonify({
             'message': 'Recording uploaded successfully',
@@ -309,11 +586,12 @@ def upload_to_meeting(meeting_id):
     
     try:
         file.save(file_path)
+        tracer.set_attributes(upload_bytes=os.path.getsize(file_path))
         
-        storage.update_meeting(meeting_id, {
-            'audio_file_path': file_path,
-            'status': 'recorded'
-        })
+        recording = _attach_recording(meeting_id, file_path, file.filename)
+        if not recording:
+            return jsonify({'error': 'Meeting not found'}), 404
+        waveform_store.generate_async(meeting_id, recording['audio_file_path'])
         
         updated_meeting = storage.get_meeting(meeting_id)
         
@@ -326,6 +604,192 @@ def upload_to_meeting(meeting_id):
         return jsonify({'error': f'Failed to upload file: {str(e)}'}), 500
 
 
+@app.route('/api/uploads', methods=['POST'])
+def create_upload():
+    data = request.get_json()
+    
+    if not data or not data.get('filename') or not data.get('size'):
+        return jsonify({'error': 'filename and size are required'}), 400
+    
+    meeting_id = data.get('meeting_id')
+    if meeting_id and not storage.get_meeting(meeting_id):
+        return jsonify({'error': 'Meeting not found'}), 404
+    
+    metadata = {
+        'meeting_id': meeting_id,
+        'title': data.get('title', 'Uploaded Meeting'),
+        'description': data.get('description', ''),
+        'meeting_type': data.get('meeting_type', 'online'),
+        'platform': data.get('platform', 'upload')
+    }
+    
+    try:
+        upload = resumable_uploads.create(data['filename'], int(data['size']), metadata)
+        return jsonify(upload), 201
+    except UploadError as e:
+        return jsonify({'error': str(e)}), e.status_code
+    except ValueError:
+        return jsonify({'error': 'size must be an integer'}), 400
+
+
+@app.route('/api/uploads/<upload_id>', methods=['GET'])
+def get_upload(upload_id):
+    upload = resumable_uploads.get(upload_id)
+    if not upload:
+        return jsonify({'error': 'Upload not found'}), 404
+    
+    return jsonify(upload), 200
+
+
+@app.route('/api/uploads/<upload_id>', methods=['PUT'])
+def append_upload_chunk(upload_id):
+    offset = request.args.get('offset', type=int)
+    if offset is None:
+        return jsonify({'error': 'offset is required'}), 400
+    
+    try:
+        # Read the raw body in blocks so a chunk is never buffered whole
+        upload = resumable_uploads.append(upload_id, offset, request.stream)
+        return jsonify(upload), 200
+    except UploadError as e:
+        return jsonify({'error': str(e), 'offset': e.offset}), e.status_code
+
+
+@app.route('/api/uploads/<upload_id>/complete', methods=['POST'])
+def complete_upload(upload_id):
+    data = request.get_json(silent=True) or {}
+    
+    try:
+        session_data = resumable_uploads.complete(upload_id, data.get('checksum'))
+    except UploadError as e:
+        return jsonify({'error': str(e), 'offset': e.offset}), e.status_code
+    
+    metadata = session_data['metadata']
+    file_path = session_data['target_path']
+    tracer.set_attributes(upload_bytes=session_data['size'])
+    meeting_id = metadata.get('meeting_id')
+    
+    try:
+        if meeting_id:
+            recording = _attach_recording(meeting_id, file_path, session_data['filename'])
+            if not recording:
+                return jsonify({'error': 'Meeting not found'}), 404
+            status_code = 200
+        else:
+            meeting_id = str(uuid.uuid4())
+            recording = _store_recording(meeting_id, file_path, session_data['filename'])
+            try:
+                storage.create_meeting({
+                    'title': metadata['title'],
+                    'description': metadata['description'],
+                    'meeting_type': metadata['meeting_type'],
+                    'platform': metadata['platform'],
+                    'audio_file_path': recording['audio_file_path'],
+                    'audio_blob': recording['audio_blob'],
+                    'status': 'recorded'
+                }, meeting_id=meeting_id)
+            except Exception:
+                blob_store.release(recording['audio_blob'], meeting_id)
+                raise
+            status_code = 201
+        
+        waveform_store.generate_async(meeting_id, recording['audio_file_path'])
+        meeting = storage.get_meeting(meeting_id)
+        
+        return jsonify({
+            'message': 'Recording uploaded successfully',
+            'meeting': meeting
+        }), status_code
+    
+    except Exception as e:
+        return jsonify({'error': f'Failed to finalize upload: {str(e)}'}), 500
+
+
+@app.route('/api/uploads/<upload_id>', methods=['DELETE'])
+def abort_upload(upload_id):
+    if not resumable_uploads.abort(upload_id):
+        return jsonify({'error': 'Upload not found'}), 404
+    
+    return jsonify({'message': 'Upload aborted'}), 200
+
+
+@app.route('/api/meetings/<meeting_id>/live-recording', methods=['POST'])
+def start_live_recording(meeting_id):
+    meeting = storage.get_meeting(meeting_id)
+    if not meeting:
+        return jsonify({'error': 'Meeting not found'}), 404
+    
+    data = request.get_json(silent=True) or {}
+    service = data.get('service', DEFAULT_TRANSCRIPTION_SERVICE)
+    api_key = {'deepgram': DEEPGRAM_API_KEY, 'assemblyai': ASSEMBLYAI_API_KEY}.get(service)
+    
+    # Without a transcription key the recording is still captured, just not transcribed early
+    transcriber = None
+    if data.get('transcribe', True) and api_key:
+        transcriber = WordTimestampTranscriber(service=service, api_key=api_key)
+    
+    try:
+        status = live_recordings.start(meeting_id, transcriber=transcriber, service=service)
+        status['transcribing'] = transcriber is not None
+        return jsonify(status), 201
+    except Exception as e:
+        return jsonify({'error': f'Failed to start live recording: {str(e)}'}), 500
+
+
+@app.route('/api/meetings/<meeting_id>/live-recording', methods=['GET'])
+def get_live_recording(meeting_id):
+    recording = live_recordings.get(meeting_id)
+    if not recording:
+        return jsonify({'error': 'No live recording for this meeting'}), 404
+    
+    return jsonify(recording.status()), 200
+
+
+@app.route('/api/meetings/<meeting_id>/live-recording', methods=['PUT'])
+def append_live_recording(meeting_id):
+    recording = live_recordings.get(meeting_id)
+    if not recording:
+        return jsonify({'error': 'No live recording for this meeting'}), 404
+    
+    offset = request.args.get('offset', type=int)
+    if offset is None:
+        return jsonify({'error': 'offset is required'}), 400
+    
+    try:
+        status = live_recordings.append(recording, offset, request.stream)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 409
+    
+    if status is None:
+        return jsonify({
+            'error': f'Offset {offset} does not match committed size {recording.size}',
+            'offset': recording.size
+        }), 409
+    
+    return jsonify(status), 200
+
+
+@app.route('/api/meetings/<meeting_id>/live-recording/stop', methods=['POST'])
+def stop_live_recording(meeting_id):
+    recording = live_recordings.stop(meeting_id)
+    if not recording:
+        return jsonify({'error': 'No live recording for this meeting'}), 404
+    
+    # The last span is transcribed and the recording stored in the background
+    return jsonify({
+        'message': 'Recording stopped, finishing transcription',
+        'meeting': storage.get_meeting(meeting_id),
+        'segment_count': len(recording.segments)
+    }), 202
+
+
+def _finish_live_recording(meeting_id, recording):
+    # The transcription worker may already have moved the status on
+    stored = _attach_recording(meeting_id, recording.file_path, status=None)
+    if stored:
+        waveform_store.generate_async(meeting_id, stored['audio_file_path'])
+
+
 @app.route('/api/meetings/<meeting_id>/participants', methods=['POST'])
 def add_participant(meeting_id):
     data = request.get_json()
@@ -342,13 +806,14 @@ def add_participant(meeting_id):
 
 
 @app.route('/api/meetings/<meeting_id>/transcribe', methods=['POST'])
+@admission.limit('transcribe')
 def transcribe_meeting(meeting_id):
     meeting = storage.get_meeting(meeting_id)
     if not meeting:
         return jsonify({'error': 'Meeting not found'}), 404
     
-    audio_file_path = meeting.get('audio_file_path')
-    if not audio_file_path or not os.path.exists(audio_file_path):
+    audio_file_path = _recording_path(meeting)
+    if not audio_file_path:
         return jsonify({'error': 'Audio file not found'}), 404
     
     data = request.get_json() or {}
@@ -386,9 +851,50 @@ def transcribe_meeting(meeting_id):
         #         print(f"Echo reduction failed, using original audio: {str(e)}")
         #         processed_audio_path = audio_file_path
         
+        # A recording shared by several meetings is transcribed once per
+        # service and silence setting; speaker mapping below is per meeting.
+        # Re-transcribing a meeting, or passing force, skips the cached result
+        compact_silence = data.get('compact_silence', SILENCE_COMPACTION)
+        blob_id = meeting.get('audio_blob')
+        compaction_key = f'-compacted-{SILENCE_THRESHOLD_DB:g}db-{SILENCE_MIN_DURATION:g}s' if compact_silence else ''
+        derived_name = f'transcript-{service}{compaction_key}.json'
+        use_cache = blob_id and not data.get('force') and not storage.get_detailed_transcript(meeting_id)
+        cached = blob_store.read_derived(blob_id, derived_name) if use_cache else None
         transcriber = WordTimestampTranscriber(service=service, api_key=api_key)
         
-        result = transcriber.transcribe_with_timestamps(processed_audio_path)
+        if cached:
+            cached = json_codec.loads(cached)
+            result, compaction = cached['result'], cached['compaction']
+            print(f"Reusing the {service} transcription of recording {blob_id}")
+        else:
+            compaction = None
+            if compact_silence:
+                try:
+                    compacted_path, compaction = audio_processor.compact_silence(
+                        processed_audio_path,
+                        silence_threshold_db=SILENCE_THRESHOLD_DB,
+                        min_silence_duration=SILENCE_MIN_DURATION
+                    )
+                    if compaction:
+                        processed_audio_path = compacted_path
+                except Exception as e:
+                    print(f"Silence compaction failed, using original audio: {str(e)}")
+            
+            try:
+                result = transcriber.transcribe_with_timestamps(processed_audio_path)
+            finally:
+                if compaction and processed_audio_path != audio_file_path:
+                    try:
+                        os.remove(processed_audio_path)
+                    except OSError:
+                        pass
+            
+            audio_processor.remap_segment_timestamps(result.get('segments', []), compaction)
+            if blob_id:
+                blob_store.write_derived(blob_id, derived_name, json_codec.dumps({
+                    'result': result,
+                    'compaction': compaction
+                }))
         print(f"Transcription completed: {len(result.get('segments', []))} segments")
         
         participants = meeting.get('participants', [])
@@ -408,7 +914,8 @@ def transcribe_meeting(meeting_id):
         
         transcript_data = {
             'segments': result['segments'],
-            'service': service
+            'service': service,
+            'compaction': compaction
         }
         
         storage.save_detailed_transcript(meeting_id, transcript_data)
@@ -433,6 +940,7 @@ def transcribe_meeting(meeting_id):
             print(f"DEBUG: Participants after update: {updated_meeting.get('participants')}")
         
         transcript = storage.get_detailed_transcript(meeting_id)
+        broadcast_transcript_changes(meeting_id, transcript['version'] - 1)
         
         return jsonify({
             'message': 'Transcription completed successfully',
@@ -447,6 +955,7 @@ def transcribe_meeting(meeting_id):
 
 
 @app.route('/api/meetings/<meeting_id>/summarize', methods=['POST'])
+@admission.limit('summarize')
 def summarize_meeting(meeting_id):
     meeting = storage.get_meeting(meeting_id)
     if not meeting:
@@ -470,16 +979,21 @@ def summarize_meeting(meeting_id):
     if not api_key:
         return jsonify({'error': f'{service} API key not configured'}), 500
     
+    # Parts of the summary are pushed to the meeting's room as they arrive
+    stream = SummaryStream(socketio, meeting_id) if data.get('stream', SUMMARY_STREAMING) else None
     try:
-        summarizer = MeetingSummarizer(service=service, api_key=api_key)
+        summarizer = MeetingSummarizer(service=service, api_key=api_key, combine_max_chars=SUMMARY_COMBINE_MAX_CHARS)
         
         meeting_title = meeting.get('title', 'Meeting')
         segments = transcript['segments']
         
+        if stream:
+            stream.start()
         summary_data = summarizer.generate_structured_summary(
             transcript_segments=segments,
             meeting_title=meeting_title,
-            template=template
+            template=template,
+            on_event=stream
         )
         
         summary_data['template'] = template
@@ -488,6 +1002,9 @@ def summarize_meeting(meeting_id):
         storage.save_structured_summary(meeting_id, summary_data)
         
         saved_summary = storage.get_structured_summary(meeting_id)
+        broadcast_summary_changes(meeting_id, saved_summary['version'] - 1)
+        if stream:
+            stream.finish()
         
         return jsonify({
             'message': 'Summary generated successfully',
@@ -495,10 +1012,13 @@ def summarize_meeting(meeting_id):
         }), 200
     
     except Exception as e:
+        if stream:
+            stream.finish(error=str(e))
         return jsonify({'error': f'Summarization failed: {str(e)}'}), 500
 
 
 @app.route('/api/meetings/<meeting_id>/summarize-structured', methods=['POST'])
+@admission.limit('summarize')
 def summarize_structured(meeting_id):
     meeting = storage.get_meeting(meeting_id)
     if not meeting:
@@ -522,16 +1042,21 @@ def summarize_structured(meeting_id):
     if not api_key:
         return jsonify({'error': f'{service} API key not configured'}), 500
     
+    # Parts of the summary are pushed to the meeting's room as they arrive
+    stream = SummaryStream(socketio, meeting_id) if data.get('stream', SUMMARY_STREAMING) else None
     try:
-        summarizer = MeetingSummarizer(service=service, api_key=api_key)
+        summarizer = MeetingSummarizer(service=service, api_key=api_key, combine_max_chars=SUMMARY_COMBINE_MAX_CHARS)
         
         meeting_title = meeting.get('title', 'Meeting')
         segments = transcript['segments']
         
+        if stream:
+            stream.start()
         summary_data = summarizer.generate_structured_summary(
             transcript_segments=segments,
             meeting_title=meeting_title,
-            template=template
+            template=template,
+            on_event=stream
         )
         
         summary_data['template'] = template
@@ -540,6 +1065,9 @@ def summarize_structured(meeting_id):
         storage.save_structured_summary(meeting_id, summary_data)
         
         saved_summary = storage.get_structured_summary(meeting_id)
+        broadcast_summary_changes(meeting_id, saved_summary['version'] - 1)
+        if stream:
+            stream.finish()
         
         return jsonify({
             'message': 'Summary generated successfully',
@@ -547,6 +1075,8 @@ def summarize_structured(meeting_id):
         }), 200
     
     except Exception as e:
+        if stream:
+            stream.finish(error=str(e))
         return jsonify({'error': f'Summarization failed: {str(e)}'}), 500
 
 
@@ -565,12 +1095,22 @@ def start_bot():
     if not meeting:
         return jsonify({'error': 'Meeting not found'}), 404
     
+    if meeting_id in bot_admissions:
+        return jsonify({'error': 'Bot already active for this meeting'}), 400
+    
+    try:
+        ticket = admission.acquire('bot', client_key())
+    except AdmissionRejected as e:
+        return rejection_response(e)
+    
     try:
         success = bot_manager.start_bot(meeting_id, meeting_url, bot_name)
         
         if not success:
+            admission.release(ticket)
             return jsonify({'error': 'Bot already active for this meeting'}), 400
         
+        bot_admissions[meeting_id] = ticket
         storage.update_meeting(meeting_id, {'status': 'live', 'join_url': meeting_url})
         
         return jsonify({
@@ -580,19 +1120,25 @@ def start_bot():
         }), 200
     
     except Exception as e:
+        if bot_admissions.get(meeting_id) is not ticket:
+            admission.release(ticket)
         return jsonify({'error': f'Failed to start bot: {str(e)}'}), 500
 
 
 @app.route('/api/bots/<meeting_id>/stop', methods=['POST'])
 def stop_bot(meeting_id):
+    ticket = bot_admissions.pop(meeting_id, None)
+    if ticket:
+        admission.release(ticket)
+    
     try:
         recording_path = bot_manager.stop_bot(meeting_id)
         
         if recording_path:
-            storage.update_meeting(meeting_id, {
-                'status': 'recorded',
-                'audio_file_path': recording_path
-            })
+            recording = _attach_recording(meeting_id, recording_path)
+            if recording:
+                recording_path = recording['audio_file_path']
+                waveform_store.generate_async(meeting_id, recording_path)
         else:
             storage.update_meeting(meeting_id, {'status': 'completed'})
         
@@ -618,14 +1164,111 @@ def list_active_bots():
     return jsonify({'bots': bots})
 
 
+@app.route('/api/admin/profiles', methods=['GET'])
+def list_profiles():
+    if not request_profiler.is_allowed(request.remote_addr):
+        return jsonify({'error': 'Forbidden'}), 403
+    
+    return jsonify({
+        'sample_rate': request_profiler.sample_rate,
+        'profiles': request_profiler.list_profiles()
+    })
+
+
+@app.route('/api/admin/profiles/<profile_id>', methods=['GET'])
+def get_profile(profile_id):
+    if not request_profiler.is_allowed(request.remote_addr):
+        return jsonify({'error': 'Forbidden'}), 403
+    
+    profile = request_profiler.get_profile(profile_id)
+    if not profile:
+        return jsonify({'error': 'Profile not found'}), 404
+    
+    output_format = request.args.get('format', 'collapsed')
+    if output_format == 'collapsed':
+        return Response(profile.collapsed(), content_type='text/plain; charset=utf-8')
+    elif output_format == 'pstats':
+        return Response(
+            profile.pstats_bytes(),
+            content_type='application/octet-stream',
+            headers={'Content-Disposition': f'attachment; filename=profile_{profile_id}.pstats'}
+        )
+    elif output_format == 'text':
+        return Response(profile.pstats_text(), content_type='text/plain; charset=utf-8')
+    else:
+        return jsonify({'error': f'Unsupported profile format: {output_format}'}), 400
+
+
+@app.route('/api/admin/profiles', methods=['DELETE'])
+def clear_profiles():
+    if not request_profiler.is_allowed(request.remote_addr):
+        return jsonify({'error': 'Forbidden'}), 403
+    
+    request_profiler.clear()
+    return jsonify({'message': 'Profiles cleared'}), 200
+
+
+@app.route('/api/admin/export', methods=['GET'])
+def export_archive():
+    if request.remote_addr not in ADMIN_ALLOWED_CALLERS:
+        return jsonify({'error': 'Forbidden'}), 403
+    
+    include_audio = request.args.get('audio', 'false').lower() == 'true'
+    filename = f"meritel-{datetime.utcnow().strftime('%Y%m%d-%H%M%S')}.ndjson.gz"
+    return Response(
+        archive.gzip_stream(archive.iter_export(storage, include_audio=include_audio, blob_store=blob_store)),
+        content_type='application/gzip',
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+
+@app.route('/api/admin/import', methods=['POST'])
+def import_archive():
+    if request.remote_addr not in ADMIN_ALLOWED_CALLERS:
+        return jsonify({'error': 'Forbidden'}), 403
+    
+    if 'archive' not in request.files:
+        return jsonify({'error': 'No archive provided'}), 400
+    
+    overwrite = request.args.get('overwrite', 'false').lower() == 'true'
+    try:
+        result = archive.import_archive(
+            storage,
+            blob_store,
+            request.files['archive'].stream,
+            app.config['RECORDINGS_FOLDER'],
+            overwrite=overwrite
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify(result), 200 if not result['errors'] else 207
+
+
+@app.route('/api/admin/retention', methods=['POST'])
+def run_retention():
+    if request.remote_addr not in ADMIN_ALLOWED_CALLERS:
+        return jsonify({'error': 'Forbidden'}), 403
+    
+    if RETENTION_MAX_AGE_DAYS <= 0:
+        return jsonify({'error': 'Recording retention is disabled'}), 400
+    
+    # Every recording is an ffmpeg transcode, so one request handles at most a batch
+    limit = min(request.args.get('limit', RETENTION_BATCH, type=int), RETENTION_BATCH)
+    report = retention.run(limit=limit)
+    return jsonify(report), 200 if not report['errors'] else 207
+
+
 @socketio.on('connect')
 def handle_connect():
+    SOCKETIO_CONNECTIONS.inc()
     print(f"Client connected: {request.sid}")
     emit('connected', {'data': 'Connected to MeriTel server'})
 
 
 @socketio.on('disconnect')
 def handle_disconnect():
+    SOCKETIO_CONNECTIONS.dec()
     print(f"Client disconnected: {request.sid}")
 
 
@@ -646,11 +1289,51 @@ def handle_leave_meeting(data):
         print(f"Client {request.sid} left meeting room {meeting_id}")
 
 
-def broadcast_transcript_update(meeting_id, transcript_data):
-    socketio.emit('transcript_update', {
-        'meeting_id': meeting_id,
-        'transcript': transcript_data
-    }, room=meeting_id)
+@socketio.on('join_meetings_list')
+def handle_join_meetings_list(data=None):
+    join_room(MEETINGS_ROOM)
+
+
+@socketio.on('leave_meetings_list')
+def handle_leave_meetings_list(data=None):
+    leave_room(MEETINGS_ROOM)
+
+
+@socketio.on('sync_meeting')
+def handle_sync_meeting(data):
+    """
+    Catch a client up on what changed while it was away: sends only the
+    transcript segments and summary parts newer than the versions it has.
+    """
+    meeting_id = data.get('meeting_id')
+    if not meeting_id:
+        return
+    
+    transcript_changes = storage.get_transcript_changes(meeting_id, int(data.get('transcript_version') or 0))
+    if transcript_changes and (transcript_changes['full'] or transcript_changes['version'] > transcript_changes['since']):
+        emit('transcript_changes', transcript_changes)
+    
+    summary_changes = storage.get_summary_changes(meeting_id, int(data.get('summary_version') or 0))
+    if summary_changes and (summary_changes['full'] or summary_changes['version'] > summary_changes['since']):
+        emit('summary_changes', summary_changes)
+
+
+def broadcast_transcript_changes(meeting_id, since):
+    changes = storage.get_transcript_changes(meeting_id, since)
+    if changes:
+        socketio.emit('transcript_changes', changes, room=meeting_id)
+    return changes
+
+
+def broadcast_summary_changes(meeting_id, since=None):
+    if since is None:
+        summary = storage.get_structured_summary(meeting_id)
+        since = summary['version'] - 1 if summary else 0
+    
+    changes = storage.get_summary_changes(meeting_id, since)
+    if changes:
+        socketio.emit('summary_changes', changes, room=meeting_id)
+    return changes
 
 
 if __name__ == '__main__':
@@ -0,0 +1,355 @@
+"""
+Export and import of the whole meeting archive as gzipped NDJSON.
+
+Every line is one JSON record:
+- a header;
+- one `meeting` record per meeting, holding its meeting, transcript and
+  summary documents;
+- when audio is included, `audio` records with base64 chunks of the
+  recording right after its meeting, closed by `audio_end` with the size
+  and sha256. A recording shared by several meetings is written once;
+  the later meetings name the first in `audio_shared_with`;
+- a footer with the meeting count, so a truncated archive is detected.
+
+Each meeting's documents are read under its lock, so they are consistent
+with one another. The archive as a whole is not a point-in-time snapshot
+of a server that keeps taking writes. Export and import both stream, and
+memory stays bounded by the largest single transcript. Imported audio
+goes into the blob store, so it is deduplicated and refcounted like an
+upload.
+
+    python archive.py export backup.ndjson.gz [--audio]
+    python archive.py import backup.ndjson.gz [--workers 8] [--overwrite]
+"""
+import argparse
+import base64
+import gzip
+import hashlib
+import os
+import sys
+import threading
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Iterator, Optional
+
+import json_codec
+
+
+ARCHIVE_FORMAT = 'meritel-archive'
+ARCHIVE_VERSION = 2
+AUDIO_CHUNK_SIZE = 256 * 1024
+GZIP_LEVEL = 6
+
+
+def _line(record: Dict[str, Any]) -> bytes:
+    return json_codec.dumps(record) + b'\n'
+
+
+def iter_export(storage, include_audio: bool = False, blob_store=None) -> Iterator[bytes]:
+    """Yield the archive as uncompressed NDJSON lines."""
+    yield _line({
+        'type': 'header',
+        'format': ARCHIVE_FORMAT,
+        'version': ARCHIVE_VERSION,
+        'exported_at': datetime.utcnow().isoformat(),
+        'include_audio': include_audio
+    })
+
+    count = 0
+    # Blob id -> the meeting whose record carried the recording
+    exported_blobs: Dict[str, str] = {}
+    for meeting_id in storage.list_meeting_ids():
+        with storage.lock(meeting_id):
+            meeting = storage.get_meeting(meeting_id)
+            if meeting is None:
+                # Deleted since the ids were listed
+                continue
+            transcript = storage.get_detailed_transcript(meeting_id)
+            summary = storage.get_structured_summary(meeting_id)
+
+        blob_id = meeting.get('audio_blob')
+        shared_with = exported_blobs.get(blob_id) if include_audio and blob_id else None
+        if shared_with or not include_audio:
+            audio_path = None
+        elif blob_id and blob_store is not None:
+            audio_path = blob_store.local_path(blob_id)
+        else:
+            audio_path = meeting.get('audio_file_path')
+        has_audio = bool(audio_path) and os.path.exists(audio_path)
+        if has_audio and blob_id:
+            exported_blobs[blob_id] = meeting_id
+
+        record = {
+            'type': 'meeting',
+            'meeting': meeting,
+            'transcript': transcript,
+            'summary': summary,
+            'audio': os.path.basename(audio_path) if has_audio else None
+        }
+        if shared_with:
+            record['audio_shared_with'] = shared_with
+        yield _line(record)
+        count += 1
+
+        if has_audio:
+            yield from _iter_audio(meeting_id, audio_path)
+
+    yield _line({'type': 'footer', 'meetings': count})
+
+
+def _iter_audio(meeting_id: str, path: str) -> Iterator[bytes]:
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(AUDIO_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            size += len(chunk)
+            yield _line({'type': 'audio', 'meeting_id': meeting_id, 'data': base64.b64encode(chunk).decode('ascii')})
+    yield _line({'type': 'audio_end', 'meeting_id': meeting_id, 'size': size, 'sha256': digest.hexdigest()})
+
+
+def gzip_stream(lines: Iterator[bytes], level: int = GZIP_LEVEL) -> Iterator[bytes]:
+    """Compress a stream of lines into gzip chunks without buffering it all."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for line in json_codec.buffered(lines):
+        chunk = compressor.compress(line)
+        if chunk:
+            yield chunk
+    yield compressor.flush()
+
+
+def export_archive(storage, path: str, include_audio: bool = False, blob_store=None) -> int:
+    """Write the archive to `path` and return its size in bytes."""
+    temp_path = f'{path}.{uuid.uuid4().hex[:8]}.tmp'
+    size = 0
+    try:
+        with open(temp_path, 'wb') as f:
+            for chunk in gzip_stream(iter_export(storage, include_audio, blob_store)):
+                f.write(chunk)
+                size += len(chunk)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return size
+
+
+class _AudioWriter:
+    def __init__(self, path: Path):
+        self.path = path
+        self.temp_path = Path(f'{path}.{uuid.uuid4().hex[:8]}.tmp')
+        self.file = open(self.temp_path, 'wb')
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data: bytes):
+        self.file.write(data)
+        self.digest.update(data)
+        self.size += len(data)
+
+    def finish(self, size: int, sha256: str):
+        self.file.close()
+        if size != self.size or sha256 != self.digest.hexdigest():
+            self.abort()
+            raise ValueError(f'audio checksum mismatch for {self.path.name}')
+        os.replace(self.temp_path, self.path)
+
+    def abort(self):
+        self.file.close()
+        if self.temp_path.exists():
+            self.temp_path.unlink()
+
+
+def import_archive(storage, blob_store, fileobj, staging_dir: str, workers: int = 4,
+                   overwrite: bool = False) -> Dict[str, Any]:
+    """
+    Load an archive from a binary file object into `storage`.
+
+    The stream is decompressed and parsed on the calling thread while
+    `workers` threads write meetings, at most two per worker in flight.
+    Audio is written to `staging_dir` as it streams in and then moved
+    into `blob_store`; a meeting with audio is only written once its
+    recording has arrived and matched its checksum, and is imported
+    without the recording otherwise. Existing meetings are skipped
+    unless `overwrite` is set.
+    """
+    staging_dir = Path(staging_dir)
+    staging_dir.mkdir(parents=True, exist_ok=True)
+
+    result = {'imported': 0, 'skipped': 0, 'audio_files': 0, 'errors': [], 'complete': False}
+    result_lock = threading.Lock()
+    slots = threading.BoundedSemaphore(workers * 2)
+
+    def load(record: Dict[str, Any]):
+        meeting = record['meeting']
+        meeting_id = meeting.get('meeting_id')
+        blob_id = meeting.get('audio_blob')
+        imported = False
+        previous = None
+        try:
+            previous = storage.get_meeting(meeting_id) if overwrite else None
+            imported = storage.import_meeting(
+                meeting, record.get('transcript'), record.get('summary'), overwrite=overwrite
+            )
+            # An overwritten meeting gives up the recording it had
+            previous_blob = previous.get('audio_blob') if imported and previous else None
+            if previous_blob and previous_blob != blob_id:
+                blob_store.release(previous_blob, meeting_id)
+            with result_lock:
+                result['imported' if imported else 'skipped'] += 1
+        except Exception as e:
+            with result_lock:
+                result['errors'].append(f'{meeting_id}: {str(e)}')
+        finally:
+            # Drop the reference taken for the import, unless the meeting
+            # already held this recording
+            if blob_id and not imported and (previous or {}).get('audio_blob') != blob_id:
+                blob_store.release(blob_id, meeting_id)
+            slots.release()
+
+    def submit(record: Dict[str, Any]):
+        slots.acquire()
+        executor.submit(load, record)
+
+    def attach_blob(record: Dict[str, Any], blob_id: Optional[str]) -> bool:
+        meeting = record['meeting']
+        if not blob_id or not blob_store.add_ref(blob_id, meeting['meeting_id']):
+            meeting.pop('audio_blob', None)
+            meeting.pop('audio_file_path', None)
+            return False
+        meeting['audio_blob'] = blob_id
+        meeting['audio_file_path'] = blob_store.local_path(blob_id)
+        return True
+
+    def drop_audio(record: Dict[str, Any], error: str):
+        record['meeting'].pop('audio_file_path', None)
+        record['meeting'].pop('audio_blob', None)
+        result['errors'].append(f"{record['meeting'].get('meeting_id')}: {error}")
+
+    header = None
+    audio: Optional[_AudioWriter] = None
+    # Meeting record waiting for its audio_end
+    pending: Optional[Dict[str, Any]] = None
+    # Meeting id -> blob id of the recordings imported so far
+    imported_blobs: Dict[str, str] = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor, gzip.open(fileobj, 'rb') as stream:
+        try:
+            for line in stream:
+                if not line.strip():
+                    continue
+                record = json_codec.loads(line)
+                record_type = record.get('type')
+
+                if header is None:
+                    if record_type != 'header' or record.get('format') != ARCHIVE_FORMAT:
+                        raise ValueError('not a meeting archive')
+                    if record.get('version', 0) > ARCHIVE_VERSION:
+                        raise ValueError(f"archive version {record['version']} is newer than supported")
+                    header = record
+                elif record_type == 'meeting':
+                    if pending is not None:
+                        audio.abort()
+                        audio = None
+                        drop_audio(pending, 'audio is incomplete')
+                        submit(pending)
+                        pending = None
+
+                    meeting_id = record['meeting'].get('meeting_id')
+                    if not overwrite and storage.get_meeting(meeting_id) is not None:
+                        # Skipped by load; the meeting keeps its own recording
+                        record['meeting'].pop('audio_blob', None)
+                        submit(record)
+                    elif record.get('audio'):
+                        name = os.path.basename(record['audio'])
+                        audio = _AudioWriter(staging_dir / f'import_{uuid.uuid4().hex[:8]}_{name}')
+                        pending = record
+                    else:
+                        # The recording came earlier in this archive, or is
+                        # a blob this server may already hold
+                        shared_with = record.get('audio_shared_with')
+                        blob_id = imported_blobs.get(shared_with) if shared_with else record['meeting'].get('audio_blob')
+                        attach_blob(record, blob_id)
+                        submit(record)
+                elif record_type == 'audio' and audio is not None:
+                    audio.write(base64.b64decode(record['data']))
+                elif record_type == 'audio_end' and audio is not None:
+                    meeting_id = pending['meeting']['meeting_id']
+                    try:
+                        audio.finish(record['size'], record['sha256'])
+                        blob_id = blob_store.put_file(audio.path, meeting_id, name=pending['audio'])
+                        pending['meeting']['audio_blob'] = blob_id
+                        pending['meeting']['audio_file_path'] = blob_store.local_path(blob_id)
+                        imported_blobs[meeting_id] = blob_id
+                        result['audio_files'] += 1
+                    except Exception as e:
+                        # A checksum mismatch, or the blob store failing
+                        if audio.path.exists():
+                            audio.path.unlink()
+                        drop_audio(pending, str(e))
+                    audio = None
+                    submit(pending)
+                    pending = None
+                elif record_type == 'footer':
+                    result['complete'] = True
+        except (EOFError, OSError, zlib.error) as e:
+            result['errors'].append(f'archive is truncated or corrupt: {str(e)}')
+        finally:
+            if audio is not None:
+                audio.abort()
+            if pending is not None:
+                drop_audio(pending, 'audio is incomplete')
+                submit(pending)
+
+    if header is not None and not result['complete'] and not result['errors']:
+        result['errors'].append('archive ended without a footer')
+    return result
+
+
+def main(argv=None) -> int:
+    from blob_store import create_blob_store
+    from config import RECORDINGS_FOLDER, STORAGE_FILE_LOCKS, STORAGE_SHARD_DEPTH
+    from storage import MeetingStorage
+
+    parser = argparse.ArgumentParser(description='Export or import the meeting archive')
+    parser.add_argument('--data-dir', default='data')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = subparsers.add_parser('export', help='write all meetings to a .ndjson.gz archive')
+    export_parser.add_argument('path')
+    export_parser.add_argument('--audio', action='store_true', help='include the recordings')
+
+    import_parser = subparsers.add_parser('import', help='load meetings from a .ndjson.gz archive')
+    import_parser.add_argument('path')
+    import_parser.add_argument('--workers', type=int, default=4)
+    import_parser.add_argument('--overwrite', action='store_true', help='replace meetings that already exist')
+    import_parser.add_argument('--recordings-dir', default=RECORDINGS_FOLDER,
+                               help='where recordings are staged before moving into the blob store')
+    args = parser.parse_args(argv)
+
+    storage = MeetingStorage(data_dir=args.data_dir, file_locks=STORAGE_FILE_LOCKS, shard_depth=STORAGE_SHARD_DEPTH)
+    blob_store = create_blob_store(data_dir=args.data_dir)
+
+    if args.command == 'export':
+        size = export_archive(storage, args.path, include_audio=args.audio, blob_store=blob_store)
+        print(f"Exported the archive to {args.path} ({size / 1e6:.1f}MB)")
+        return 0
+
+    with open(args.path, 'rb') as f:
+        result = import_archive(storage, blob_store, f, args.recordings_dir, workers=args.workers,
+                                overwrite=args.overwrite)
+    print(f"Imported {result['imported']} meetings, skipped {result['skipped']} existing, "
+          f"{result['audio_files']} recordings")
+    for error in result['errors'][:20]:
+        print(f"  {error}")
+    return 1 if result['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
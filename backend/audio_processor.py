@@ -1,11 +1,15 @@
 import os
+import re
 import subprocess
+import uuid
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Any, Optional, Tuple
 import numpy as np
 from pathlib import Path
-from pydub import AudioSegment
-import noisereduce as nr
-from scipy import signal
-from scipy.signal import wiener
+
+from metrics import track_stage
+from offload import run_cpu_bound
+from tracing import tracer
 
 
 class AudioProcessor:
@@ -18,6 +22,11 @@ class AudioProcessor:
         Advanced echo reduction for Google Meet/online meeting recordings.
         Combines multiple techniques to reduce echo by 70-80%.
         """
+        # scipy.signal takes most of a second to import; only load it when
+        # audio is actually processed
+        from scipy import signal
+        from scipy.signal import wiener
+        
         try:
             # High-pass filter to remove low-frequency echo (below 80Hz)
             nyquist = sample_rate / 2
@@ -74,10 +83,13 @@ class AudioProcessor:
             print(f"Echo reduction warning: {str(e)}, returning original audio")
             return audio_samples
     
+    @track_stage('process_meeting_audio')
     def process_meeting_audio(self, input_path: str, output_path: str = None, apply_echo_reduction: bool = True) -> str:
         if not os.path.exists(input_path):
             raise FileNotFoundError(f"Input file not found: {input_path}")
         
+        tracer.set_attributes(input_bytes=os.path.getsize(input_path), echo_reduction=apply_echo_reduction)
+        
         if output_path is None:
             output_path = input_path.replace('.webm', '_processed.webm')
         
@@ -95,48 +107,9 @@ class AudioProcessor:
                 wav_temp
             ], check=True, capture_output=True)
             
-            audio = AudioSegment.from_wav(wav_temp)
-            
-            samples = np.array(audio.get_array_of_samples())
-            
-            if audio.channels == 2:
-                samples = samples.reshape((-1, 2))
-                samples = samples.mean(axis=1)
-            
-            sample_rate = audio.frame_rate
-            
-            reduced_noise = nr.reduce_noise(
-                y=samples,
-                sr=sample_rate,
-                stationary=True,
-                prop_decrease=0.8
-            )
-            
-            # Apply echo reduction for online meetings
-            if apply_echo_reduction:
-                reduced_noise = self.reduce_echo(reduced_noise, sample_rate)
-            
-            # Convert back to int16 for AudioSegment
-            processed_samples = (reduced_noise * 32767).astype(np.int16)
-            
-            processed_audio = AudioSegment(
-                processed_samples.tobytes(),
-                frame_rate=sample_rate,
-                sample_width=2,
-                channels=1
-            )
-            
-            processed_audio = processed_audio.normalize()
-            
-            processed_audio = processed_audio.compress_dynamic_range(
-                threshold=-20.0,
-                ratio=4.0,
-                attack=5.0,
-                release=50.0
-            )
-            
             wav_processed = str(self.temp_dir / 'processed_audio.wav')
-            processed_audio.export(wav_processed, format='wav')
+            # Noise reduction is numpy-heavy; kept off the gevent hub
+            run_cpu_bound(self._denoise, wav_temp, wav_processed, apply_echo_reduction)
             
             subprocess.run([
                 'ffmpeg', '-i', wav_processed,
@@ -162,6 +135,52 @@ class AudioProcessor:
             print(f"Audio processing error: {str(e)}")
             raise
     
+    def _denoise(self, wav_path: str, output_path: str, apply_echo_reduction: bool):
+        from pydub import AudioSegment
+        import noisereduce as nr
+        
+        audio = AudioSegment.from_wav(wav_path)
+        
+        samples = np.array(audio.get_array_of_samples())
+        
+        if audio.channels == 2:
+            samples = samples.reshape((-1, 2))
+            samples = samples.mean(axis=1)
+        
+        sample_rate = audio.frame_rate
+        
+        reduced_noise = nr.reduce_noise(
+            y=samples,
+            sr=sample_rate,
+            stationary=True,
+            prop_decrease=0.8
+        )
+        
+        # Apply echo reduction for online meetings
+        if apply_echo_reduction:
+            reduced_noise = self.reduce_echo(reduced_noise, sample_rate)
+        
+        # Convert back to int16 for AudioSegment
+        processed_samples = (reduced_noise * 32767).astype(np.int16)
+        
+        processed_audio = AudioSegment(
+            processed_samples.tobytes(),
+            frame_rate=sample_rate,
+            sample_width=2,
+            channels=1
+        )
+        
+        processed_audio = processed_audio.normalize()
+        
+        processed_audio = processed_audio.compress_dynamic_range(
+            threshold=-20.0,
+            ratio=4.0,
+            attack=5.0,
+            release=50.0
+        )
+        
+        processed_audio.export(output_path, format='wav')
+    
     def extract_audio_from_video(self, video_path: str, output_path: str) -> str:
         try:
             subprocess.run([
@@ -178,3 +197,255 @@ class AudioProcessor:
             
         except subprocess.CalledProcessError as e:
             raise Exception(f"Audio extraction failed: {e.stderr.decode() if e.stderr else str(e)}")
+    
+    @track_stage('transcode_to_opus')
+    def transcode_to_opus(self, input_path: str, output_path: str, bitrate: str = '32k',
+                          sample_rate: int = 16000, channels: int = 1) -> str:
+        try:
+            subprocess.run([
+                'ffmpeg', '-i', input_path,
+                '-vn',
+                '-c:a', 'libopus',
+                '-b:a', bitrate,
+                '-ar', str(sample_rate),
+                '-ac', str(channels),
+                '-application', 'voip',
+                '-y',
+                output_path
+            ], check=True, capture_output=True)
+            
+            return output_path
+            
+        except subprocess.CalledProcessError as e:
+            raise Exception(f"Opus transcoding failed: {e.stderr.decode() if e.stderr else str(e)}")
+    
+    def probe_audio(self, input_path: str) -> Dict[str, Any]:
+        """
+        Codec, sample rate and channel count of the first audio stream, and
+        its duration as decoded. Decoding to the null muxer also covers
+        MediaRecorder WebM files, whose header carries no duration.
+        """
+        try:
+            result = subprocess.run([
+                'ffmpeg', '-hide_banner',
+                '-i', input_path,
+                '-map', '0:a:0',
+                '-f', 'null', '-'
+            ], check=True, capture_output=True)
+        except subprocess.CalledProcessError as e:
+            raise Exception(f"Audio probe failed: {e.stderr.decode() if e.stderr else str(e)}")
+        
+        output = result.stderr.decode(errors='replace')
+        stream = re.search(r'Stream #0:\d+.*?: Audio: (\w+)[^,\n]*, (\d+) Hz, ([^,\n]+)', output)
+        times = re.findall(r'time=(\d+):(\d+):(\d+(?:\.\d+)?)', output)
+        if not stream or not times:
+            raise Exception(f"Audio probe found no audio stream in {input_path}")
+        
+        hours, minutes, seconds = times[-1]
+        layout = stream.group(3).strip()
+        channels = re.match(r'(\d+) channels', layout)
+        return {
+            'duration': int(hours) * 3600 + int(minutes) * 60 + float(seconds),
+            'codec': stream.group(1),
+            'sample_rate': int(stream.group(2)),
+            'channels': {'mono': 1, 'stereo': 2}.get(layout, int(channels.group(1)) if channels else None)
+        }
+    
+    def detect_speech_regions(
+        self,
+        samples: np.ndarray,
+        sample_rate: int,
+        frame_duration: float = 0.03,
+        silence_threshold_db: float = -45.0,
+        min_silence_duration: float = 1.5,
+        padding: float = 0.25
+    ) -> List[Tuple[int, int]]:
+        """
+        Find non-silent regions as (start_sample, end_sample) pairs using
+        vectorized frame RMS. Only silences longer than `min_silence_duration`
+        separate regions; each region keeps `padding` seconds of context.
+        """
+        frame_length = max(1, int(sample_rate * frame_duration))
+        n_frames = len(samples) // frame_length
+        if n_frames == 0:
+            return [(0, len(samples))] if len(samples) else []
+        
+        # Framed RMS in bounded chunks so long recordings never become one float array
+        rms_db = np.empty(n_frames, dtype=np.float32)
+        chunk_frames = 65536
+        for first in range(0, n_frames, chunk_frames):
+            last = min(first + chunk_frames, n_frames)
+            frames = samples[first * frame_length:last * frame_length].reshape(-1, frame_length)
+            frames = frames.astype(np.float32) / 32768.0
+            rms = np.sqrt(np.mean(frames * frames, axis=1))
+            rms_db[first:last] = 20 * np.log10(np.maximum(rms, 1e-10))
+        
+        voiced = rms_db > silence_threshold_db
+        if not voiced.any():
+            return []
+        
+        # Rising/falling edges of the voiced mask give frame-level runs
+        edges = np.diff(np.concatenate(([0], voiced.view(np.int8), [0])))
+        run_starts = np.flatnonzero(edges == 1)
+        run_ends = np.flatnonzero(edges == -1)
+        
+        pad = int(padding * sample_rate)
+        min_gap = int(min_silence_duration * sample_rate)
+        
+        regions = []
+        for run_start, run_end in zip(run_starts * frame_length, run_ends * frame_length):
+            start = max(0, int(run_start) - pad)
+            end = min(len(samples), int(run_end) + pad)
+            if regions and start - regions[-1][1] < min_gap:
+                regions[-1] = (regions[-1][0], max(regions[-1][1], end))
+            else:
+                regions.append((start, end))
+        
+        return regions
+    
+    @track_stage('compact_silence')
+    def compact_silence(
+        self,
+        input_path: str,
+        output_path: Optional[str] = None,
+        sample_rate: int = 16000,
+        min_saving: float = 0.1,
+        **detect_kwargs
+    ) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Splice a recording down to its speech regions for transcription.
+
+        Returns the path to transcribe and an offset map for
+        `remap_segment_timestamps`. When less than `min_saving` of the
+        audio is silence, the original path is returned with no map.
+        """
+        if not os.path.exists(input_path):
+            raise FileNotFoundError(f"Input file not found: {input_path}")
+        
+        raw_path = str(self.temp_dir / f'compact_{uuid.uuid4().hex}.raw')
+        compact_raw_path = raw_path.replace('.raw', '_speech.raw')
+        
+        try:
+            subprocess.run([
+                'ffmpeg', '-i', input_path,
+                '-vn',
+                '-ar', str(sample_rate),
+                '-ac', '1',
+                '-f', 's16le',
+                '-y',
+                raw_path
+            ], check=True, capture_output=True)
+            
+            if os.path.getsize(raw_path) < 2:
+                return input_path, None
+            
+            # numpy over the whole recording; kept off the gevent hub
+            spliced = run_cpu_bound(
+                self._splice_speech, raw_path, compact_raw_path, sample_rate, min_saving, detect_kwargs
+            )
+            if spliced is None:
+                return input_path, None
+            offset_map, total_samples, compact_position = spliced
+            
+            if output_path is None:
+                output_path = str(self.temp_dir / f'compact_{uuid.uuid4().hex}.webm')
+            
+            subprocess.run([
+                'ffmpeg',
+                '-f', 's16le',
+                '-ar', str(sample_rate),
+                '-ac', '1',
+                '-i', compact_raw_path,
+                '-c:a', 'libopus',
+                '-b:a', '32k',
+                '-application', 'voip',
+                '-y',
+                output_path
+            ], check=True, capture_output=True)
+            
+            compaction = {
+                'regions': offset_map,
+                'original_duration': total_samples / sample_rate,
+                'compacted_duration': compact_position / sample_rate
+            }
+            print(f"Silence compaction: {compaction['original_duration']:.1f}s -> "
+                  f"{compaction['compacted_duration']:.1f}s in {len(offset_map)} regions")
+            tracer.set_attributes(
+                audio_duration=compaction['original_duration'],
+                compacted_duration=compaction['compacted_duration']
+            )
+            return output_path, compaction
+            
+        except subprocess.CalledProcessError as e:
+            raise Exception(f"Silence compaction failed: {e.stderr.decode() if e.stderr else str(e)}")
+        finally:
+            for temp_file in (raw_path, compact_raw_path):
+                try:
+                    os.remove(temp_file)
+                except OSError:
+                    pass
+    
+    def _splice_speech(self, raw_path: str, compact_raw_path: str, sample_rate: int, min_saving: float,
+                       detect_kwargs: Dict[str, Any]) -> Optional[Tuple[List[Dict[str, float]], int, int]]:
+        """
+        Write the speech regions of `raw_path` back to back into
+        `compact_raw_path`. Returns the offset map and the original and
+        compacted sample counts, or None if too little would be removed.
+        """
+        samples = np.memmap(raw_path, dtype='<i2', mode='r')
+        total_samples = len(samples)
+        regions = self.detect_speech_regions(samples, sample_rate, **detect_kwargs)
+        
+        kept_samples = sum(end - start for start, end in regions)
+        if not regions or kept_samples > total_samples * (1 - min_saving):
+            return None
+        
+        offset_map = []
+        compact_position = 0
+        with open(compact_raw_path, 'wb') as f:
+            for start, end in regions:
+                f.write(samples[start:end].tobytes())
+                offset_map.append({
+                    'compact_start': compact_position / sample_rate,
+                    'original_start': start / sample_rate,
+                    'duration': (end - start) / sample_rate
+                })
+                compact_position += end - start
+        del samples
+        return offset_map, total_samples, compact_position
+    
+    def remap_segment_timestamps(
+        self,
+        segments: List[Dict[str, Any]],
+        compaction: Optional[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Map segment and word times from compacted audio back onto the
+        original recording, in place.
+        """
+        if not compaction or not compaction.get('regions'):
+            return segments
+        
+        regions = compaction['regions']
+        compact_starts = [region['compact_start'] for region in regions]
+        
+        def remap(t, end=False):
+            if t is None:
+                return t
+            # A time on a region boundary starts the later region but ends
+            # the earlier one, so an end never jumps over the cut silence
+            find = bisect_left if end else bisect_right
+            region = regions[max(0, find(compact_starts, t) - 1)]
+            offset = min(max(t - region['compact_start'], 0.0), region['duration'])
+            return round(region['original_start'] + offset, 3)
+        
+        for segment in segments:
+            for key in ('start_time', 'end_time', 'start', 'end'):
+                if key in segment:
+                    segment[key] = remap(segment[key], end=key in ('end_time', 'end'))
+            for word in segment.get('words', []):
+                for key in ('start', 'end'):
+                    if key in word:
+                        word[key] = remap(word[key], end=key == 'end')
+        
+        return segments
@@ -0,0 +1,271 @@
+"""
+Speed and quality benchmark for AudioProcessor.reduce_echo and
+process_meeting_audio.
+
+Signals are synthetic (harmonic "voiced" bursts with syllable-rate
+envelopes and pauses, plus noise and room echo), so the suite runs
+offline with only NumPy and ffmpeg. Results are compared against
+benchmarks/baselines/audio_dsp.json and the script exits non-zero on
+any regression.
+
+    cd backend
+    python -m benchmarks.audio_dsp
+    python -m benchmarks.audio_dsp --update-baseline
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import wave
+from pathlib import Path
+from typing import Dict, Any, List, Callable
+
+import numpy as np
+
+from audio_processor import AudioProcessor
+
+
+SAMPLE_RATE = 16000
+DEFAULT_LENGTHS = [10, 30, 60]
+BASELINE_FILE = Path(__file__).parent / 'baselines' / 'audio_dsp.json'
+
+# A run fails when it is this much worse than the stored baseline
+MAX_SLOWDOWN = 1.5
+MAX_MEMORY_GROWTH = 1.25
+MAX_SNR_DROP_DB = 1.0
+MAX_CLIPPING_INCREASE = 0.001
+
+
+def synthesize_speech(duration: float, sample_rate: int = SAMPLE_RATE, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    n = int(duration * sample_rate)
+    t = np.arange(n) / sample_rate
+
+    # Gliding pitch between 100 and 220 Hz, five harmonics with 1/k rolloff
+    f0 = 160 + 60 * np.sin(2 * np.pi * 0.3 * t + rng.uniform(0, np.pi))
+    phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+
+    # ~4 Hz syllable envelope gated by 0.5-2 s pauses between phrases
+    syllables = np.clip(np.sin(2 * np.pi * 4 * t + rng.uniform(0, np.pi)), 0, None) ** 2
+    gate = np.zeros(n)
+    position = 0
+    while position < n:
+        phrase = int(rng.uniform(1.5, 4.0) * sample_rate)
+        gate[position:position + phrase] = 1.0
+        position += phrase + int(rng.uniform(0.5, 2.0) * sample_rate)
+
+    speech = voiced * syllables * gate
+    return (0.5 * speech / np.max(np.abs(speech))).astype(np.float32)
+
+
+def add_echo(clean: np.ndarray, sample_rate: int = SAMPLE_RATE,
+             taps=((0.12, 0.45), (0.25, 0.25), (0.4, 0.1))) -> np.ndarray:
+    echoed = clean.astype(np.float64).copy()
+    for delay, gain in taps:
+        offset = int(delay * sample_rate)
+        echoed[offset:] += gain * clean[:len(clean) - offset]
+    return echoed
+
+
+def add_noise(signal: np.ndarray, snr_db: float = 15.0, seed: int = 1) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    noise = rng.standard_normal(len(signal))
+    signal_power = np.mean(signal ** 2)
+    noise *= np.sqrt(signal_power / (10 ** (snr_db / 10)) / np.mean(noise ** 2))
+    return signal + noise
+
+
+def si_snr(reference: np.ndarray, estimate: np.ndarray) -> float:
+    """Scale-invariant SNR in dB after aligning `estimate` to `reference`."""
+    estimate = _align(reference, estimate)
+    reference = reference - np.mean(reference)
+    estimate = estimate - np.mean(estimate)
+    target = np.dot(estimate, reference) / (np.dot(reference, reference) + 1e-12) * reference
+    residual = estimate - target
+    return float(10 * np.log10((np.sum(target ** 2) + 1e-12) / (np.sum(residual ** 2) + 1e-12)))
+
+
+def clipping_ratio(samples: np.ndarray, full_scale: float = 1.0) -> float:
+    return float(np.mean(np.abs(samples) >= 0.999 * full_scale))
+
+
+def _align(reference: np.ndarray, estimate: np.ndarray, max_lag: int = SAMPLE_RATE // 10) -> np.ndarray:
+    # Codec pre-skip and filter group delay shift the output by a few ms
+    n = min(len(reference), len(estimate))
+    size = 1 << int(np.ceil(np.log2(2 * n)))
+    correlation = np.fft.irfft(np.fft.rfft(estimate[:n], size) * np.conj(np.fft.rfft(reference[:n], size)), size)
+    lags = np.concatenate((correlation[:max_lag + 1], correlation[-max_lag:]))
+    lag = int(np.argmax(lags))
+    if lag > max_lag:
+        lag -= len(lags)
+
+    aligned = np.zeros(len(reference))
+    if lag >= 0:
+        chunk = estimate[lag:lag + len(reference)]
+        aligned[:len(chunk)] = chunk
+    else:
+        chunk = estimate[:len(reference) + lag]
+        aligned[-lag:-lag + len(chunk)] = chunk
+    return aligned
+
+
+def _measure(fn: Callable[[], Any]):
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        result = fn()
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def _write_wav(path: str, samples: np.ndarray, sample_rate: int = SAMPLE_RATE):
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(pcm.tobytes())
+
+
+def _read_audio(path: str, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    raw = subprocess.run([
+        'ffmpeg', '-v', 'error', '-i', path,
+        '-ac', '1', '-ar', str(sample_rate), '-f', 's16le', '-'
+    ], check=True, capture_output=True).stdout
+    return np.frombuffer(raw, dtype='<i2').astype(np.float32) / 32768.0
+
+
+def bench_reduce_echo(processor: AudioProcessor, length: int) -> Dict[str, Any]:
+    clean = synthesize_speech(length, seed=length)
+    degraded = add_noise(add_echo(clean), seed=length + 1)
+
+    output, elapsed, peak = _measure(lambda: processor.reduce_echo(degraded, SAMPLE_RATE))
+
+    return {
+        'wall_time': elapsed,
+        'real_time_factor': elapsed / length,
+        'peak_memory_mb': peak / 2 ** 20,
+        'snr_in_db': si_snr(clean, degraded),
+        'snr_out_db': si_snr(clean, output),
+        'snr_improvement_db': si_snr(clean, output) - si_snr(clean, degraded),
+        'clipping_ratio': clipping_ratio(output)
+    }
+
+
+def bench_process_meeting_audio(processor: AudioProcessor, length: int, workdir: str) -> Dict[str, Any]:
+    clean = synthesize_speech(length, seed=length)
+    degraded = add_noise(add_echo(clean), seed=length + 1)
+    # Leave headroom so the input itself never clips
+    degraded = degraded / np.max(np.abs(degraded)) * 0.8
+
+    input_path = os.path.join(workdir, f'bench_{length}.wav')
+    output_path = os.path.join(workdir, f'bench_{length}_processed.webm')
+    _write_wav(input_path, degraded)
+
+    _, elapsed, peak = _measure(lambda: processor.process_meeting_audio(
+        input_path, output_path, apply_echo_reduction=True
+    ))
+    output = _read_audio(output_path)
+
+    return {
+        'wall_time': elapsed,
+        'real_time_factor': elapsed / length,
+        'peak_memory_mb': peak / 2 ** 20,
+        'snr_in_db': si_snr(clean, degraded),
+        'snr_out_db': si_snr(clean, output),
+        'snr_improvement_db': si_snr(clean, output) - si_snr(clean, degraded),
+        'clipping_ratio': clipping_ratio(output)
+    }
+
+
+def run(lengths: List[int]) -> Dict[str, Dict[str, Any]]:
+    processor = AudioProcessor()
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for length in lengths:
+            results[f'reduce_echo/{length}s'] = bench_reduce_echo(processor, length)
+            results[f'process_meeting_audio/{length}s'] = bench_process_meeting_audio(processor, length, workdir)
+    return results
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]]) -> List[str]:
+    failures = []
+    for name, current in results.items():
+        expected = baseline.get(name)
+        if not expected:
+            continue
+
+        if current['real_time_factor'] > expected['real_time_factor'] * MAX_SLOWDOWN:
+            failures.append(f"{name}: real-time factor {current['real_time_factor']:.4f} "
+                            f"> {MAX_SLOWDOWN}x baseline {expected['real_time_factor']:.4f}")
+        if current['peak_memory_mb'] > expected['peak_memory_mb'] * MAX_MEMORY_GROWTH:
+            failures.append(f"{name}: peak memory {current['peak_memory_mb']:.1f} MB "
+                            f"> {MAX_MEMORY_GROWTH}x baseline {expected['peak_memory_mb']:.1f} MB")
+        if current['snr_improvement_db'] < expected['snr_improvement_db'] - MAX_SNR_DROP_DB:
+            failures.append(f"{name}: SNR improvement {current['snr_improvement_db']:.2f} dB "
+                            f"dropped more than {MAX_SNR_DROP_DB} dB below baseline "
+                            f"{expected['snr_improvement_db']:.2f} dB")
+        if current['clipping_ratio'] > expected['clipping_ratio'] + MAX_CLIPPING_INCREASE:
+            failures.append(f"{name}: clipping {current['clipping_ratio']:.4%} "
+                            f"> baseline {expected['clipping_ratio']:.4%}")
+    return failures
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark AudioProcessor speed and output quality')
+    parser.add_argument('--lengths', type=int, nargs='+', default=DEFAULT_LENGTHS,
+                        help='Signal lengths in seconds')
+    parser.add_argument('--baseline', default=str(BASELINE_FILE))
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='Store this run as the new baseline instead of comparing')
+    parser.add_argument('--output', help='Also write the results as JSON to this path')
+    args = parser.parse_args(argv)
+
+    results = run(args.lengths)
+
+    print(f"{'benchmark':<32} {'wall s':>8} {'RTF':>8} {'peak MB':>9} {'SNR in':>8} {'SNR out':>8} {'clip':>8}")
+    for name, r in results.items():
+        print(f"{name:<32} {r['wall_time']:>8.3f} {r['real_time_factor']:>8.4f} {r['peak_memory_mb']:>9.1f} "
+              f"{r['snr_in_db']:>8.2f} {r['snr_out_db']:>8.2f} {r['clipping_ratio']:>8.4%}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'machine': f"{platform.system()} {platform.machine()} / Python {platform.python_version()}",
+                'results': results
+            }, f, indent=2)
+        print(f"Baseline written to {baseline_path}")
+        return 0
+
+    if not baseline_path.exists():
+        print(f"No baseline at {baseline_path}; run with --update-baseline first")
+        return 0
+
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)['results']
+
+    failures = compare(results, baseline)
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    if not failures:
+        print("No regressions against baseline")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
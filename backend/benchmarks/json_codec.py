@@ -0,0 +1,144 @@
+"""
+Benchmark for the JSON codec on multi-MB transcripts.
+
+Builds synthetic transcripts shaped like the stored ones (segments with
+per-word timings) and compares the old storage encoding (json, indent=2),
+the compact stdlib fallback and orjson when installed, for encoding,
+decoding, on-disk size and peak memory of full versus streamed encoding.
+
+    cd backend
+    python -m benchmarks.json_codec
+    python -m benchmarks.json_codec --minutes 60 240 --repeat 5
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Dict, Any, List, Callable
+
+import json_codec
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+WORDS = ('we', 'should', 'ship', 'the', 'release', 'on', 'friday', 'after', 'review',
+         'action', 'item', 'budget', 'customer', 'meeting', 'déjà', 'vu', 'naïve', 'plan')
+
+
+def synthesize_transcript(minutes: int, seed: int = 0) -> Dict[str, Any]:
+    """About 150 words per minute in 12-word segments, like Deepgram output."""
+    rng = random.Random(seed)
+    segments = []
+    t = 0.0
+    for index in range(minutes * 150 // 12):
+        words = []
+        for _ in range(12):
+            duration = rng.uniform(0.15, 0.5)
+            words.append({
+                'word': rng.choice(WORDS),
+                'start': round(t, 3),
+                'end': round(t + duration, 3),
+                'confidence': round(rng.uniform(0.7, 1.0), 4),
+                'speaker': f'Speaker {index % 4}'
+            })
+            t += duration + rng.uniform(0.0, 0.2)
+        segments.append({
+            'segment_id': f'{index:08x}-0000-4000-8000-{rng.getrandbits(48):012x}',
+            'speaker': f'Speaker {index % 4}',
+            'speaker_name': f'Speaker {index % 4}',
+            'start_time': words[0]['start'],
+            'end_time': words[-1]['end'],
+            'text': ' '.join(w['word'] for w in words),
+            'words': words,
+            'version': 1
+        })
+    return {'meeting_id': 'benchmark', 'segments': segments, 'service': 'deepgram', 'version': 1}
+
+
+def _time(func: Callable, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def _peak_memory(func: Callable) -> int:
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _consume(iterator):
+    for _ in iterator:
+        pass
+
+
+def bench(transcript: Dict[str, Any], repeat: int) -> List[Dict[str, Any]]:
+    indented = json.dumps(transcript, indent=2, ensure_ascii=False).encode('utf-8')
+    compact = json.dumps(transcript, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    codecs = [
+        ('json indent=2 (old)',
+         lambda: json.dumps(transcript, indent=2, ensure_ascii=False).encode('utf-8'),
+         lambda: json.loads(indented), len(indented)),
+        ('json compact',
+         lambda: json.dumps(transcript, ensure_ascii=False, separators=(',', ':')).encode('utf-8'),
+         lambda: json.loads(compact), len(compact)),
+    ]
+    if orjson is not None:
+        encoded = orjson.dumps(transcript)
+        codecs.append(('orjson', lambda: orjson.dumps(transcript), lambda: orjson.loads(encoded), len(encoded)))
+
+    results = []
+    for name, encode, decode, size in codecs:
+        results.append({
+            'codec': name,
+            'size': size,
+            'encode': _time(encode, repeat),
+            'decode': _time(decode, repeat)
+        })
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark JSON encoding of large transcripts')
+    parser.add_argument('--minutes', type=int, nargs='+', default=[60, 180])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"active backend: {json_codec.BACKEND}")
+    for minutes in args.minutes:
+        transcript = synthesize_transcript(minutes)
+        print(f"\n{minutes}-minute transcript, {len(transcript['segments'])} segments")
+        print(f"  {'codec':<22} {'size':>10} {'encode':>10} {'decode':>10}")
+
+        results = bench(transcript, args.repeat)
+        old = results[0]
+        for result in results:
+            print(f"  {result['codec']:<22} {result['size'] / 1e6:>8.2f}MB "
+                  f"{result['encode'] * 1000:>8.1f}ms {result['decode'] * 1000:>8.1f}ms"
+                  f"   ({old['encode'] / result['encode']:.1f}x encode, "
+                  f"{old['decode'] / result['decode']:.1f}x decode)")
+
+        payload = {'transcript': transcript}
+        full = _peak_memory(lambda: json_codec.dumps(payload))
+        streamed = _peak_memory(lambda: _consume(json_codec.buffered(json_codec.iter_encode(payload))))
+        stream_time = _time(lambda: _consume(json_codec.buffered(json_codec.iter_encode(payload))), args.repeat)
+        print(f"  response peak memory: full {full / 1e6:.2f}MB, streamed {streamed / 1e6:.2f}MB "
+              f"({stream_time * 1000:.1f}ms to stream)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
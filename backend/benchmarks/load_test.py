@@ -0,0 +1,175 @@
+"""
+Load test for a running MeriTel backend (python server.py or app.py).
+
+Measures HTTP latency for the CRUD read path at increasing concurrency,
+then holds many Socket.IO clients in one meeting room and, when a
+message queue URL is given, publishes through it to check that every
+client receives the broadcast no matter which worker it is attached to.
+
+    cd backend
+    python -m benchmarks.load_test --url http://localhost:5000 \
+        --message-queue redis://localhost:6379/0
+
+Needs `websocket-client` for the Socket.IO clients.
+"""
+import argparse
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List
+
+import requests
+import socketio
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def http_phase(url: str, concurrency: int, total_requests: int) -> Dict[str, Any]:
+    paths = ['/api/meetings', '/api/health']
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    session_local = threading.local()
+
+    def fire(i):
+        nonlocal errors
+        if not hasattr(session_local, 'session'):
+            session_local.session = requests.Session()
+        started = time.perf_counter()
+        try:
+            response = session_local.session.get(url + paths[i % len(paths)], timeout=30)
+            ok = response.status_code == 200
+        except requests.RequestException:
+            ok = False
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(fire, range(total_requests)))
+    wall = time.perf_counter() - started
+
+    return {
+        'concurrency': concurrency,
+        'requests': total_requests,
+        'errors': errors,
+        'throughput_rps': total_requests / wall,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p95_ms': _percentile(latencies, 95) * 1000,
+        'p99_ms': _percentile(latencies, 99) * 1000
+    }
+
+
+def socket_phase(url: str, clients: int, message_queue: str = None, origin: str = 'http://localhost:3000',
+                 room: str = 'loadtest') -> Dict[str, Any]:
+    received = []
+    lock = threading.Lock()
+    joined = threading.Semaphore(0)
+
+    def on_update(data):
+        with lock:
+            received.append(time.perf_counter())
+
+    def on_joined(data):
+        joined.release()
+
+    def open_client(_):
+        client = socketio.Client(reconnection=False, websocket_extra_options={'origin': origin})
+        client.on('transcript_update', on_update)
+        client.on('joined_meeting', on_joined)
+        try:
+            client.connect(url, transports=['websocket'], wait_timeout=10)
+            client.emit('join_meeting', {'meeting_id': room})
+        except Exception as e:
+            print(f"Socket.IO connect failed: {e}")
+            return None
+        return client
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=50) as pool:
+        connected = [client for client in pool.map(open_client, range(clients)) if client]
+    connect_time = time.perf_counter() - started
+
+    for _ in connected:
+        joined.acquire(timeout=10)
+
+    result = {
+        'clients': clients,
+        'connected': len(connected),
+        'connect_time_s': connect_time
+    }
+
+    if message_queue:
+        # Same channel Flask-SocketIO subscribes its workers to
+        emitter = socketio.RedisManager(message_queue, channel='flask-socketio', write_only=True)
+        sent = time.perf_counter()
+        emitter.emit('transcript_update', {'meeting_id': room, 'transcript': {}}, room=room, namespace='/')
+
+        deadline = sent + 10
+        while time.perf_counter() < deadline:
+            with lock:
+                if len(received) >= len(connected):
+                    break
+            time.sleep(0.01)
+
+        with lock:
+            delays = [t - sent for t in received]
+        result.update({
+            'broadcast_delivered': len(delays),
+            'broadcast_p95_ms': _percentile(delays, 95) * 1000
+        })
+
+    # websocket-client waits up to 3 s for each close handshake
+    with ThreadPoolExecutor(max_workers=50) as pool:
+        list(pool.map(lambda client: client.disconnect(), connected))
+
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Load test a running MeriTel backend')
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[10, 50, 100, 200])
+    parser.add_argument('--requests', type=int, default=2000, help='HTTP requests per concurrency level')
+    parser.add_argument('--socket-clients', type=int, default=200)
+    parser.add_argument('--message-queue', help='Publish a room broadcast through this queue')
+    parser.add_argument('--origin', default='http://localhost:3000', help='An origin listed in CORS_ORIGINS')
+    parser.add_argument('--p95-budget-ms', type=float, default=250.0)
+    args = parser.parse_args(argv)
+
+    print(f"{'concurrency':>11} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    sustained = 0
+    for concurrency in args.concurrency:
+        r = http_phase(args.url, concurrency, args.requests)
+        print(f"{r['concurrency']:>11} {r['throughput_rps']:>8.1f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} "
+              f"{r['p99_ms']:>8.1f} {r['errors']:>7}")
+        if r['errors'] == 0 and r['p95_ms'] <= args.p95_budget_ms:
+            sustained = concurrency
+
+    print(f"Highest concurrency within p95 {args.p95_budget_ms:.0f} ms and no errors: {sustained}")
+
+    if args.socket_clients:
+        r = socket_phase(args.url, args.socket_clients, args.message_queue, args.origin)
+        print(f"Socket.IO: {r['connected']}/{r['clients']} clients connected in {r['connect_time_s']:.1f}s")
+        if 'broadcast_delivered' in r:
+            print(f"Broadcast through queue: {r['broadcast_delivered']}/{r['connected']} delivered, "
+                  f"p95 {r['broadcast_p95_ms']:.1f} ms")
+            if r['broadcast_delivered'] < r['connected']:
+                return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
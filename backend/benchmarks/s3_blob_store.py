@@ -0,0 +1,124 @@
+"""
+Smoke test for the S3 blob store against MinIO or another S3-compatible
+service.
+
+Runs the blob store through what the app does with a recording, with
+data/blobs in a temporary directory and objects under a fresh prefix in
+the bucket (created if missing):
+- store a recording, then the same bytes for a second meeting, which
+  must add an owner instead of a second object;
+- drop the local copy and read it back, which must fetch it again;
+- fill the local cache past its cap, which must evict the least
+  recently used copies but keep every object in the bucket;
+- release every owner, which must delete the objects.
+
+The script exits non-zero on the first failed check.
+
+    docker run -p 9000:9000 -e MINIO_ROOT_USER=minio -e MINIO_ROOT_PASSWORD=minio123 minio/minio server /data
+    cd backend
+    python -m benchmarks.s3_blob_store --endpoint-url http://localhost:9000 \\
+        --access-key minio --secret-key minio123
+"""
+import argparse
+import os
+import sys
+import tempfile
+import uuid
+from pathlib import Path
+
+from blob_store import S3BlobStore
+
+
+def _write(directory: Path, name: str, size: int) -> Path:
+    path = directory / name
+    path.write_bytes(os.urandom(size))
+    return path
+
+
+def _check(condition: bool, message: str):
+    if not condition:
+        raise AssertionError(message)
+    print(f"  ok: {message}")
+
+
+def _cache_bytes(store: S3BlobStore) -> int:
+    return sum(path.stat().st_size for path in store.cache_dir.rglob('*') if path.is_file())
+
+
+def run(store: S3BlobStore, work_dir: Path, blob_size: int):
+    print("dedup")
+    first = store.put_file(_write(work_dir, 'a.webm', blob_size), 'meeting-1')
+    copy = work_dir / 'a-copy.webm'
+    copy.write_bytes(Path(store.local_path(first)).read_bytes())
+    second = store.put_file(copy, 'meeting-2')
+    _check(first == second, 'identical recordings share one blob id')
+    _check(store.owners(first) == {'meeting-1', 'meeting-2'}, 'both meetings own the blob')
+    _check(store.exists(first), 'the object is in the bucket')
+
+    print("refetch")
+    os.remove(store.local_path(first))
+    path = store.local_path(first)
+    _check(path is not None and os.path.getsize(path) == blob_size, 'a dropped local copy is fetched again')
+
+    print("cache cap")
+    store.cache_max_bytes = blob_size * 2
+    others = [store.put_file(_write(work_dir, f'{i}.webm', blob_size), f'meeting-{i + 3}')
+              for i in range(3)]
+    _check(_cache_bytes(store) <= store.cache_max_bytes, 'the local cache stays within its cap')
+    _check(all(store.exists(blob_id) for blob_id in [first] + others), 'evicted blobs stay in the bucket')
+    path = store.local_path(first)
+    _check(path is not None and os.path.getsize(path) == blob_size, 'an evicted blob is fetched again')
+
+    print("release")
+    _check(not store.release(first, 'meeting-1'), 'the blob outlives its first owner')
+    _check(store.release(first, 'meeting-2'), 'the blob is deleted with its last owner')
+    _check(not store.exists(first), 'the object is gone from the bucket')
+    for i, blob_id in enumerate(others):
+        store.release(blob_id, f'meeting-{i + 3}')
+    _check(not any(store.exists(blob_id) for blob_id in others), 'every object was cleaned up')
+
+
+def main(argv=None) -> int:
+    from config import S3_BUCKET, S3_ENDPOINT_URL, S3_REGION, S3_ACCESS_KEY_ID, S3_SECRET_ACCESS_KEY
+
+    parser = argparse.ArgumentParser(description='Smoke test the S3 blob store against MinIO')
+    parser.add_argument('--bucket', default=S3_BUCKET or 'meritel-smoke')
+    parser.add_argument('--endpoint-url', default=S3_ENDPOINT_URL or 'http://localhost:9000')
+    parser.add_argument('--region', default=S3_REGION or 'us-east-1')
+    parser.add_argument('--access-key', default=S3_ACCESS_KEY_ID)
+    parser.add_argument('--secret-key', default=S3_SECRET_ACCESS_KEY)
+    parser.add_argument('--blob-size', type=int, default=256 * 1024)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        # A fresh prefix keeps runs apart in a shared bucket
+        store = S3BlobStore(
+            args.bucket,
+            data_dir=data_dir,
+            prefix=f'smoke-{uuid.uuid4().hex[:8]}/',
+            endpoint_url=args.endpoint_url,
+            region=args.region,
+            access_key=args.access_key,
+            secret_key=args.secret_key,
+            cache_min_age=0
+        )
+        try:
+            store._client.head_bucket(Bucket=args.bucket)
+        except store._client_error:
+            store._client.create_bucket(Bucket=args.bucket)
+
+        work_dir = Path(data_dir) / 'work'
+        work_dir.mkdir()
+        print(f"S3 blob store at {args.endpoint_url}, bucket {args.bucket}, prefix {store.prefix}")
+        try:
+            run(store, work_dir, args.blob_size)
+        except AssertionError as e:
+            print(f"FAILED: {e}")
+            return 1
+
+    print("OK: dedup, refetch, cache eviction and deletion work against the bucket")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""
+Startup benchmark for the backend.
+
+Imports `app` in fresh interpreters and reports the median import time
+and the slowest top-level imports. The run fails (non-zero exit) when a
+heavy subsystem is loaded at boot, i.e. audio processing, the meeting bot
+or the streaming SDKs, which must only load on first use, or when the
+median import time exceeds the budget.
+
+    cd backend
+    python -m benchmarks.startup
+    python -m benchmarks.startup --runs 10 --budget 0.8
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, Any, List
+
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Must not be in sys.modules after `import app`
+HEAVY_MODULES = ('scipy', 'noisereduce', 'pydub', 'playwright', 'trio', 'deepgram', 'assemblyai')
+
+# Median seconds for `import app`; measured at ~0.45 s, down from ~1.6 s
+# when audio processing and the bot were imported eagerly
+DEFAULT_BUDGET = 1.0
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app
+elapsed = time.perf_counter() - started
+heavy = sorted({name.split('.')[0] for name in sys.modules} & set(%r))
+print(json.dumps({'seconds': elapsed, 'heavy': heavy}))
+"""
+
+
+def _run_probe(importtime: bool = False) -> Dict[str, Any]:
+    env = dict(os.environ, PYTHONPATH=str(BACKEND_DIR))
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    command += ['-c', _PROBE % (HEAVY_MODULES,)]
+
+    # app.py creates its data directories relative to the working directory
+    with tempfile.TemporaryDirectory() as workdir:
+        result = subprocess.run(command, cwd=workdir, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing app failed:\n{result.stderr}")
+
+    measurement = json.loads(result.stdout.strip().splitlines()[-1])
+    if importtime:
+        measurement['imports'] = _parse_importtime(result.stderr)
+    return measurement
+
+
+def _parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """Top-level modules imported while loading app, by cumulative time."""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        _, cumulative, name = line.split('|', 2)
+        if not cumulative.strip().isdigit():
+            continue
+        # Nesting is encoded as two spaces per level after the first
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            imports.append({'module': name.strip(), 'seconds': int(cumulative) / 1e6})
+    imports.sort(key=lambda item: item['seconds'], reverse=True)
+    return imports
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Measure backend import time and check for eager heavy imports')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET, help='median seconds allowed for `import app`')
+    parser.add_argument('--top', type=int, default=10, help='slowest imports to list')
+    args = parser.parse_args(argv)
+
+    # The importtime run also warms the bytecode cache for the timed runs
+    breakdown = _run_probe(importtime=True)
+    timings = [_run_probe()['seconds'] for _ in range(args.runs)]
+    median = statistics.median(timings)
+
+    print(f"import app: median {median * 1000:.0f} ms, "
+          f"min {min(timings) * 1000:.0f} ms, max {max(timings) * 1000:.0f} ms over {args.runs} runs")
+    print("\nSlowest imports:")
+    for item in breakdown['imports'][:args.top]:
+        print(f"  {item['module']:<40} {item['seconds'] * 1000:>8.1f} ms")
+
+    failures = []
+    if breakdown['heavy']:
+        failures.append(f"heavy modules imported at startup: {', '.join(breakdown['heavy'])}")
+    if median > args.budget:
+        failures.append(f"median import time {median:.3f}s exceeds budget {args.budget:.3f}s")
+
+    if failures:
+        print('\nFAILED')
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+
+    print(f"\nOK: within {args.budget:.3f}s budget, no heavy modules at startup")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""
+Stress test for concurrent writes to MeetingStorage.
+
+Threads in several processes hammer one meeting at the same time:
+- each writer adds participants, bumps its own counter field through
+  update_meeting, and increments its own action item;
+- readers continuously read the meeting, transcript and summary files.
+
+At the end every participant and every increment must be present, and no
+reader may have seen a partly written file. The script exits non-zero on
+any lost write or torn read.
+
+    cd backend
+    python -m benchmarks.storage_stress
+    python -m benchmarks.storage_stress --processes 4 --threads 8 --iterations 200
+"""
+import argparse
+import multiprocessing
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, Any
+
+from storage import MeetingStorage
+
+
+def _writer(storage: MeetingStorage, meeting_id: str, writer: str, action_item_id: str, iterations: int):
+    for i in range(iterations):
+        storage.add_participant(meeting_id, {'id': f'{writer}-{i}', 'name': writer})
+
+        # Caller-side read-modify-write, as the bot and route handlers do
+        with storage.lock(meeting_id):
+            meeting = storage.get_meeting(meeting_id)
+            storage.update_meeting(meeting_id, {f'count_{writer}': meeting.get(f'count_{writer}', 0) + 1})
+
+        with storage.lock(meeting_id):
+            summary = storage.get_structured_summary(meeting_id)
+            item = next(item for item in summary['action_items'] if item['id'] == action_item_id)
+            storage.update_action_item(meeting_id, action_item_id, {'count': item.get('count', 0) + 1})
+
+
+def _reader(storage: MeetingStorage, meeting_id: str, stop: threading.Event, errors: list):
+    reads = 0
+    while not stop.is_set():
+        try:
+            if storage.get_meeting(meeting_id) is None:
+                errors.append('meeting file missing')
+            storage.get_structured_summary(meeting_id)
+            storage.get_detailed_transcript(meeting_id)
+            reads += 1
+        except Exception as e:
+            errors.append(f'{type(e).__name__}: {e}')
+    return reads
+
+
+def run_process(data_dir: str, meeting_id: str, process_index: int, threads: int, iterations: int,
+                results: Dict[str, Any] = None) -> Dict[str, Any]:
+    storage = MeetingStorage(data_dir=data_dir)
+    summary = storage.get_structured_summary(meeting_id)
+    items = {item['text']: item['id'] for item in summary['action_items']}
+
+    stop = threading.Event()
+    errors = []
+    reader = threading.Thread(target=_reader, args=(storage, meeting_id, stop, errors))
+    reader.start()
+
+    writers = []
+    for thread_index in range(threads):
+        writer = f'p{process_index}t{thread_index}'
+        thread = threading.Thread(target=_writer, args=(storage, meeting_id, writer, items[writer], iterations))
+        thread.start()
+        writers.append(thread)
+    for thread in writers:
+        thread.join()
+
+    stop.set()
+    reader.join()
+    result = {'errors': errors}
+    if results is not None:
+        results[process_index] = result
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Check MeetingStorage for lost updates and torn reads')
+    parser.add_argument('--processes', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--iterations', type=int, default=50)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        storage = MeetingStorage(data_dir=data_dir)
+        meeting_id = storage.create_meeting({'title': 'Stress test'})
+        writers = [f'p{p}t{t}' for p in range(args.processes) for t in range(args.threads)]
+        storage.save_structured_summary(meeting_id, {
+            'action_items': [{'text': writer, 'count': 0} for writer in writers]
+        })
+        storage.save_detailed_transcript(meeting_id, {'segments': []})
+
+        started = time.perf_counter()
+        manager = multiprocessing.Manager()
+        results = manager.dict()
+        processes = [
+            multiprocessing.Process(target=run_process, args=(
+                data_dir, meeting_id, index, args.threads, args.iterations, results
+            ))
+            for index in range(args.processes)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - started
+
+        failures = []
+        for index, process in enumerate(processes):
+            if process.exitcode != 0:
+                failures.append(f'process {index} exited with {process.exitcode}')
+        for result in results.values():
+            failures.extend(f'torn read: {error}' for error in result['errors'][:5])
+
+        meeting = storage.get_meeting(meeting_id)
+        summary = storage.get_structured_summary(meeting_id)
+        counts = {item['text']: item.get('count', 0) for item in summary['action_items']}
+        expected_participants = len(writers) * args.iterations
+
+        if len(meeting['participants']) != expected_participants:
+            failures.append(f"participants: {len(meeting['participants'])} of {expected_participants}")
+        for writer in writers:
+            if meeting.get(f'count_{writer}') != args.iterations:
+                failures.append(f"{writer} meeting counter: {meeting.get(f'count_{writer}')} of {args.iterations}")
+            if counts.get(writer) != args.iterations:
+                failures.append(f"{writer} action item counter: {counts.get(writer)} of {args.iterations}")
+
+        writes = len(writers) * args.iterations * 3
+        print(f"{args.processes} processes x {args.threads} threads x {args.iterations} iterations: "
+              f"{writes} writes in {elapsed:.2f}s ({writes / elapsed:.0f}/s)")
+
+    if failures:
+        print(f"FAILED ({len(failures)} problems)")
+        for failure in failures[:20]:
+            print(f"  {failure}")
+        return 1
+
+    print("OK: no lost writes, no torn reads")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
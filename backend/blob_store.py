@@ -0,0 +1,354 @@
+"""
+Content-addressed storage for recordings.
+
+A recording is stored once under the SHA-256 of its contents; meetings
+refer to it by blob id (`<sha256><ext>`). Every meeting holding a blob is
+recorded as an owner in a small refs file, and the blob is deleted when
+its last owner releases it. Uploading the same file twice, or importing
+the same Zoom recording again, adds an owner instead of a second copy.
+
+Refs, locks and derived results (e.g. a transcription of the blob) are
+kept under data/blobs on local disk next to the meeting files, whichever
+backend holds the blobs themselves:
+- LocalBlobStore keeps blobs in data/blobs/objects;
+- S3BlobStore keeps them in an S3-compatible bucket (AWS, MinIO) and
+  downloads them to data/blobs/cache when a local file is needed for
+  ffmpeg or a transcription service. The cache is size-capped and
+  least recently used files are evicted; a missing file is fetched again.
+"""
+import hashlib
+import os
+import re
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Optional, Set
+
+import json_codec
+from meeting_locks import MeetingLocks
+from offload import run_cpu_bound
+
+
+HASH_CHUNK_SIZE = 1024 * 1024
+BLOB_ID_PATTERN = re.compile(r'^[0-9a-f]{64}(\.[a-z0-9]{1,8})?$')
+
+
+def hash_file(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _extension(name: Optional[str]) -> str:
+    ext = os.path.splitext(name or '')[1].lower()
+    return ext if re.fullmatch(r'\.[a-z0-9]{1,8}', ext) else ''
+
+
+def _move(source, target):
+    temp_path = f'{target}.{uuid.uuid4().hex[:8]}.tmp'
+    try:
+        # shutil.move copies when source and target are on different devices
+        shutil.move(str(source), temp_path)
+        os.replace(temp_path, target)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+class BlobStore:
+    """
+    Reference counting and the local bookkeeping shared by the backends.
+    Subclasses implement _exists, _store, _delete and local_path.
+    """
+
+    def __init__(self, data_dir='data', file_locks: bool = True):
+        self.root = Path(data_dir) / 'blobs'
+        self.refs_dir = self.root / 'refs'
+        self.derived_dir = self.root / 'derived'
+        self._locks = MeetingLocks(self.root / 'locks', file_locks=file_locks)
+
+    @staticmethod
+    def valid_id(blob_id: Optional[str]) -> bool:
+        return bool(blob_id) and BLOB_ID_PATTERN.match(blob_id) is not None
+
+    def _sharded(self, directory: Path, blob_id: str, make: bool = False) -> Path:
+        if not self.valid_id(blob_id):
+            raise ValueError(f'Invalid blob id: {blob_id}')
+        path = directory / blob_id[:2] / blob_id
+        if make:
+            path.parent.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def put_file(self, source, owner: str, name: Optional[str] = None) -> str:
+        """
+        Store the file at `source` for `owner` and return its blob id.
+        `source` is consumed: moved into the store, or removed if the
+        same contents are already stored. The extension is taken from
+        `name`, or from `source` when no name is given.
+        """
+        blob_id = run_cpu_bound(hash_file, source) + _extension(name or str(source))
+        with self._locks.lock(blob_id):
+            owners = self._read_refs(blob_id)
+            if self._exists(blob_id):
+                os.remove(source)
+                print(f"Blob {blob_id} already stored, {len(owners)} other owners")
+            else:
+                self._store(source, blob_id)
+            owners.add(owner)
+            self._write_refs(blob_id, owners)
+        return blob_id
+
+    def add_ref(self, blob_id: str, owner: str) -> bool:
+        """Add `owner` to a stored blob. Returns False if the blob is missing."""
+        if not self.valid_id(blob_id):
+            return False
+        with self._locks.lock(blob_id):
+            if not self._exists(blob_id):
+                return False
+            owners = self._read_refs(blob_id)
+            owners.add(owner)
+            self._write_refs(blob_id, owners)
+            return True
+
+    def release(self, blob_id: str, owner: str) -> bool:
+        """Drop `owner`'s reference. Returns True if the blob was deleted."""
+        if not self.valid_id(blob_id):
+            return False
+        with self._locks.lock(blob_id):
+            owners = self._read_refs(blob_id)
+            owners.discard(owner)
+            if owners:
+                self._write_refs(blob_id, owners)
+                return False
+
+            self._delete(blob_id)
+            try:
+                self._sharded(self.refs_dir, blob_id).unlink()
+            except FileNotFoundError:
+                pass
+            shutil.rmtree(self._sharded(self.derived_dir, blob_id), ignore_errors=True)
+            return True
+
+    def owners(self, blob_id: str) -> Set[str]:
+        if not self.valid_id(blob_id):
+            return set()
+        return self._read_refs(blob_id)
+
+    def exists(self, blob_id: str) -> bool:
+        return self.valid_id(blob_id) and self._exists(blob_id)
+
+    def read_derived(self, blob_id: str, name: str) -> Optional[bytes]:
+        """A result computed from the blob's contents, e.g. a transcription."""
+        try:
+            return (self._sharded(self.derived_dir, blob_id) / name).read_bytes()
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def write_derived(self, blob_id: str, name: str, data: bytes):
+        directory = self._sharded(self.derived_dir, blob_id)
+        directory.mkdir(parents=True, exist_ok=True)
+        temp_path = directory / f'{name}.{uuid.uuid4().hex[:8]}.tmp'
+        temp_path.write_bytes(data)
+        os.replace(temp_path, directory / name)
+
+    def _read_refs(self, blob_id: str) -> Set[str]:
+        try:
+            return set(json_codec.read_file(self._sharded(self.refs_dir, blob_id))['owners'])
+        except FileNotFoundError:
+            return set()
+
+    def _write_refs(self, blob_id: str, owners: Set[str]):
+        json_codec.write_file(self._sharded(self.refs_dir, blob_id, make=True), {'owners': sorted(owners)})
+
+    def local_path(self, blob_id: str) -> Optional[str]:
+        """Path of a local file with the blob's contents, or None if it is missing."""
+        raise NotImplementedError
+
+    def _exists(self, blob_id: str) -> bool:
+        raise NotImplementedError
+
+    def _store(self, source, blob_id: str):
+        raise NotImplementedError
+
+    def _delete(self, blob_id: str):
+        raise NotImplementedError
+
+
+class LocalBlobStore(BlobStore):
+    """Blobs as files under data/blobs/objects, fanned out by hash prefix."""
+
+    def __init__(self, data_dir='data', file_locks: bool = True):
+        super().__init__(data_dir, file_locks)
+        self.objects_dir = self.root / 'objects'
+
+    def local_path(self, blob_id: str) -> Optional[str]:
+        if not self.valid_id(blob_id):
+            return None
+        path = self._sharded(self.objects_dir, blob_id)
+        return str(path) if path.exists() else None
+
+    def _exists(self, blob_id: str) -> bool:
+        return self._sharded(self.objects_dir, blob_id).exists()
+
+    def _store(self, source, blob_id: str):
+        _move(source, self._sharded(self.objects_dir, blob_id, make=True))
+
+    def _delete(self, blob_id: str):
+        try:
+            self._sharded(self.objects_dir, blob_id).unlink()
+        except FileNotFoundError:
+            pass
+
+
+class S3BlobStore(BlobStore):
+    """
+    Blobs as objects in an S3-compatible bucket under `prefix`. Set
+    `endpoint_url` for MinIO or other non-AWS services. Files stored or
+    fetched are kept in data/blobs/cache, since ffmpeg and the
+    transcription clients read local files.
+
+    The cache holds at most `cache_max_bytes`. Files are evicted least
+    recently used first (by mtime, refreshed on every hit), except those
+    used within the last `cache_min_age` seconds, which a request may
+    still be about to open.
+    """
+
+    def __init__(self, bucket: str, data_dir='data', file_locks: bool = True, prefix: str = 'blobs/',
+                 endpoint_url: Optional[str] = None, region: Optional[str] = None,
+                 access_key: Optional[str] = None, secret_key: Optional[str] = None,
+                 cache_max_bytes: int = 2 * 1024 ** 3, cache_min_age: float = 300):
+        super().__init__(data_dir, file_locks)
+        try:
+            import boto3
+            from botocore.exceptions import ClientError
+        except ImportError:
+            raise RuntimeError('The s3 blob store requires boto3 (pip install boto3)')
+
+        self.bucket = bucket
+        self.prefix = prefix
+        self.cache_dir = self.root / 'cache'
+        self.cache_max_bytes = cache_max_bytes
+        self.cache_min_age = cache_min_age
+        self._client_error = ClientError
+        self._client = boto3.client(
+            's3',
+            endpoint_url=endpoint_url or None,
+            region_name=region or None,
+            aws_access_key_id=access_key or None,
+            aws_secret_access_key=secret_key or None
+        )
+
+    def _key(self, blob_id: str) -> str:
+        return f'{self.prefix}{blob_id[:2]}/{blob_id}'
+
+    def _not_found(self, error) -> bool:
+        return error.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound')
+
+    def local_path(self, blob_id: str) -> Optional[str]:
+        if not self.valid_id(blob_id):
+            return None
+        path = self._sharded(self.cache_dir, blob_id, make=True)
+        try:
+            os.utime(path)
+            return str(path)
+        except FileNotFoundError:
+            pass
+
+        temp_path = f'{path}.{uuid.uuid4().hex[:8]}.tmp'
+        try:
+            self._client.download_file(self.bucket, self._key(blob_id), temp_path)
+            os.replace(temp_path, path)
+        except self._client_error as e:
+            if self._not_found(e):
+                return None
+            raise
+        finally:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+        self._trim_cache()
+        return str(path)
+
+    def _trim_cache(self):
+        """Evict least recently used files until the cache fits its cap."""
+        entries = []
+        total = 0
+        for directory, _, names in os.walk(self.cache_dir):
+            for name in names:
+                if name.endswith('.tmp'):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(directory, name))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, os.path.join(directory, name)))
+                total += stat.st_size
+        if total <= self.cache_max_bytes:
+            return
+
+        recent = time.time() - self.cache_min_age
+        for mtime, size, path in sorted(entries):
+            if total <= self.cache_max_bytes or mtime >= recent:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except FileNotFoundError:
+                pass
+
+    def _exists(self, blob_id: str) -> bool:
+        try:
+            self._client.head_object(Bucket=self.bucket, Key=self._key(blob_id))
+            return True
+        except self._client_error as e:
+            if self._not_found(e):
+                return False
+            raise
+
+    def _store(self, source, blob_id: str):
+        self._client.upload_file(str(source), self.bucket, self._key(blob_id))
+        # Processing right after an upload reads the cached copy
+        cached = self._sharded(self.cache_dir, blob_id, make=True)
+        _move(source, cached)
+        os.utime(cached)
+        self._trim_cache()
+
+    def _delete(self, blob_id: str):
+        self._client.delete_object(Bucket=self.bucket, Key=self._key(blob_id))
+        try:
+            self._sharded(self.cache_dir, blob_id).unlink()
+        except FileNotFoundError:
+            pass
+
+
+def create_blob_store(data_dir='data') -> BlobStore:
+    from config import (
+        BLOB_STORE_BACKEND, STORAGE_FILE_LOCKS, S3_BUCKET, S3_PREFIX, S3_ENDPOINT_URL,
+        S3_REGION, S3_ACCESS_KEY_ID, S3_SECRET_ACCESS_KEY, S3_CACHE_MAX_BYTES
+    )
+
+    if BLOB_STORE_BACKEND == 's3':
+        if not S3_BUCKET:
+            raise RuntimeError('BLOB_STORE_BACKEND=s3 requires S3_BUCKET')
+        return S3BlobStore(
+            S3_BUCKET,
+            data_dir=data_dir,
+            file_locks=STORAGE_FILE_LOCKS,
+            prefix=S3_PREFIX,
+            endpoint_url=S3_ENDPOINT_URL,
+            region=S3_REGION,
+            access_key=S3_ACCESS_KEY_ID,
+            secret_key=S3_SECRET_ACCESS_KEY,
+            cache_max_bytes=S3_CACHE_MAX_BYTES
+        )
+    return LocalBlobStore(data_dir=data_dir, file_locks=STORAGE_FILE_LOCKS)
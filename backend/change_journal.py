@@ -0,0 +1,95 @@
+import os
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+import json_codec
+
+
+class ChangeJournal:
+    """
+    Per-meeting append-only log of small patches to a meeting's summary.
+
+    Each record is one JSON line carrying a sequence number. The base file
+    remembers the last sequence number folded into it (`journal_seq`), so
+    records left behind by an interrupted compaction are skipped rather
+    than applied twice. Callers append under the meeting's lock.
+    """
+
+    def __init__(self, journal_dir):
+        self.journal_dir = Path(journal_dir)
+        self.journal_dir.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, meeting_id: str) -> Path:
+        return self.journal_dir / f'{meeting_id}.jsonl'
+
+    def append(self, meeting_id: str, record: Dict[str, Any]) -> int:
+        """Append one record and return the journal's size in bytes."""
+        data = json_codec.dumps(record) + b'\n'
+        with open(self._path(meeting_id), 'a+b') as f:
+            # Terminate a line torn by a crash, so it only loses itself
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    data = b'\n' + data
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+            return f.tell()
+
+    def stat(self, meeting_id: str) -> Optional[os.stat_result]:
+        try:
+            return self._path(meeting_id).stat()
+        except FileNotFoundError:
+            return None
+
+    def read(self, meeting_id: str) -> List[Dict[str, Any]]:
+        try:
+            with open(self._path(meeting_id), 'rb') as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return []
+
+        records = []
+        for line in lines:
+            if not line:
+                continue
+            try:
+                records.append(json_codec.loads(line))
+            except ValueError:
+                print(f"Skipping torn journal record for meeting {meeting_id}")
+        return records
+
+    def remove(self, meeting_id: str):
+        try:
+            self._path(meeting_id).unlink()
+        except FileNotFoundError:
+            pass
+
+    def pending(self) -> List[str]:
+        """Meetings that have records waiting to be compacted."""
+        return [path.stem for path in self.journal_dir.glob('*.jsonl')]
+
+
+class JournalCompactor:
+    """
+    Background task that folds pending journal records into the summary
+    files every `interval` seconds, keeping journals short for readers.
+    """
+
+    def __init__(self, socketio, storage, interval: float = 5.0):
+        self.socketio = socketio
+        self.storage = storage
+        self.interval = interval
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = self.socketio.start_background_task(self._run)
+
+    def _run(self):
+        while True:
+            self.socketio.sleep(self.interval)
+            try:
+                self.storage.compact_journals()
+            except Exception as e:
+                print(f"Journal compaction failed: {str(e)}")
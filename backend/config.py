@@ -9,7 +9,29 @@ DEBUG = os.getenv('DEBUG', 'True').lower() == 'true'
 
 DATABASE_PATH = os.getenv('DATABASE_PATH', 'data/meetings.db')
 UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', 'data/uploads')
+# Resumable uploads with no chunk for this many seconds are removed; 0 keeps them
+UPLOAD_SESSION_TTL = float(os.getenv('UPLOAD_SESSION_TTL', 24 * 3600))
 RECORDINGS_FOLDER = os.getenv('RECORDINGS_FOLDER', 'data/recordings')
+# Recordings are stored once per content hash: local (data/blobs) or s3
+BLOB_STORE_BACKEND = os.getenv('BLOB_STORE_BACKEND', 'local')
+S3_BUCKET = os.getenv('S3_BUCKET')
+S3_PREFIX = os.getenv('S3_PREFIX', 'blobs/')
+# Set for MinIO or another S3-compatible service, e.g. http://localhost:9000
+S3_ENDPOINT_URL = os.getenv('S3_ENDPOINT_URL')
+S3_REGION = os.getenv('S3_REGION')
+S3_ACCESS_KEY_ID = os.getenv('S3_ACCESS_KEY_ID')
+S3_SECRET_ACCESS_KEY = os.getenv('S3_SECRET_ACCESS_KEY')
+# Local copies of S3 blobs are evicted, least recently used first, above this size
+S3_CACHE_MAX_BYTES = int(os.getenv('S3_CACHE_MAX_BYTES', 2 * 1024 ** 3))
+# Recordings older than this are transcoded to 16 kHz mono Opus, dropping
+# any video track (0, the default, keeps originals forever); each run
+# handles up to RETENTION_BATCH recordings
+RETENTION_MAX_AGE_DAYS = float(os.getenv('RETENTION_MAX_AGE_DAYS', 0))
+RETENTION_INTERVAL = float(os.getenv('RETENTION_INTERVAL', 3600))
+RETENTION_BATCH = int(os.getenv('RETENTION_BATCH', 20))
+RETENTION_BITRATE = os.getenv('RETENTION_BITRATE', '24k')
+# Allowed difference in seconds between original and transcoded duration
+RETENTION_DURATION_TOLERANCE = float(os.getenv('RETENTION_DURATION_TOLERANCE', 0.5))
 
 ZOOM_CLIENT_ID = os.getenv('ZOOM_CLIENT_ID')
 ZOOM_CLIENT_SECRET = os.getenv('ZOOM_CLIENT_SECRET')
@@ -33,9 +55,87 @@ DEEPSEEK_API_KEY = os.getenv('DEEPSEEK_API_KEY')
 
 DEFAULT_TRANSCRIPTION_SERVICE = os.getenv('DEFAULT_TRANSCRIPTION_SERVICE', 'deepgram')
 DEFAULT_SUMMARIZATION_SERVICE = os.getenv('DEFAULT_SUMMARIZATION_SERVICE', 'openai')
+# Transcripts up to this many characters are summarized in one LLM request;
+# longer ones get concurrent requests for overview, action items and outline
+SUMMARY_COMBINE_MAX_CHARS = int(os.getenv('SUMMARY_COMBINE_MAX_CHARS', 4000))
+# Stream completions and push partial summaries over Socket.IO by default
+SUMMARY_STREAMING = os.getenv('SUMMARY_STREAMING', 'True').lower() == 'true'
+
+SILENCE_COMPACTION = os.getenv('SILENCE_COMPACTION', 'True').lower() == 'true'
+SILENCE_THRESHOLD_DB = float(os.getenv('SILENCE_THRESHOLD_DB', -45))
+SILENCE_MIN_DURATION = float(os.getenv('SILENCE_MIN_DURATION', 1.5))
+LIVE_TRANSCRIBE_SPAN = float(os.getenv('LIVE_TRANSCRIBE_SPAN', 60))
+# Seconds without a chunk before a live recording is stopped; 0 disables
+LIVE_IDLE_TIMEOUT = float(os.getenv('LIVE_IDLE_TIMEOUT', 300))
 
 MAX_FILE_SIZE = int(os.getenv('MAX_FILE_SIZE', 500 * 1024 * 1024))
 ALLOWED_AUDIO_EXTENSIONS = {'mp3', 'wav', 'mp4', 'm4a', 'ogg', 'webm', 'flac'}
+RECORDING_CACHE_MAX_AGE = int(os.getenv('RECORDING_CACHE_MAX_AGE', 30 * 24 * 3600))
 ALLOWED_VIDEO_EXTENSIONS = {'mp4', 'webm', 'mov', 'avi'}
 
+# flock()-based locks so several worker processes can share data/
+STORAGE_FILE_LOCKS = os.getenv('STORAGE_FILE_LOCKS', 'True').lower() == 'true'
+# Levels of hashed subdirectories for meeting files (0 keeps them flat)
+STORAGE_SHARD_DEPTH = int(os.getenv('STORAGE_SHARD_DEPTH', 1))
+# Action item edits are journaled and folded into the summary file every
+# interval, or as soon as a meeting's journal reaches JOURNAL_MAX_BYTES
+JOURNAL_COMPACT_INTERVAL = float(os.getenv('JOURNAL_COMPACT_INTERVAL', 5.0))
+JOURNAL_MAX_BYTES = int(os.getenv('JOURNAL_MAX_BYTES', 64 * 1024))
+# Dashboard counters are kept incrementally and recomputed from disk
+# this often, to pick up writes from other worker processes
+STATS_REBUILD_INTERVAL = float(os.getenv('STATS_REBUILD_INTERVAL', 300))
+# auto (orjson when installed), orjson or json
+JSON_CODEC = os.getenv('JSON_CODEC', 'auto')
+
+SOCKETIO_ASYNC_MODE = os.getenv('SOCKETIO_ASYNC_MODE', 'threading')
+SOCKETIO_MESSAGE_QUEUE = os.getenv('SOCKETIO_MESSAGE_QUEUE')
+# Status changes are batched per tick; running bots are republished
+# every heartbeat
+STATUS_PUBLISH_INTERVAL = float(os.getenv('STATUS_PUBLISH_INTERVAL', 1.0))
+STATUS_HEARTBEAT_INTERVAL = float(os.getenv('STATUS_HEARTBEAT_INTERVAL', 5.0))
+
+SERVER_HOST = os.getenv('SERVER_HOST', '0.0.0.0')
+SERVER_PORT = int(os.getenv('SERVER_PORT', 5000))
+SERVER_WORKERS = int(os.getenv('SERVER_WORKERS', 1))
+SERVER_MAX_CONNECTIONS = int(os.getenv('SERVER_MAX_CONNECTIONS', 1000))
+# OS threads per worker for numpy, hashing and noise reduction under gevent
+CPU_OFFLOAD_THREADS = int(os.getenv('CPU_OFFLOAD_THREADS', 4))
+
+PROFILER_SAMPLE_RATE = float(os.getenv('PROFILER_SAMPLE_RATE', 0))
+PROFILER_ALLOWED_CALLERS = os.getenv('PROFILER_ALLOWED_CALLERS', '127.0.0.1,::1').split(',')
+PROFILER_MAX_PROFILES = int(os.getenv('PROFILER_MAX_PROFILES', 20))
+PROFILER_INTERVAL = float(os.getenv('PROFILER_INTERVAL', 0.005))
+
+TRACING_EXPORTER = os.getenv('TRACING_EXPORTER', 'none')
+TRACING_FILE = os.getenv('TRACING_FILE', 'data/traces/spans.jsonl')
+# The jsonl file is rotated at this size, keeping TRACING_FILE_BACKUPS old files
+TRACING_FILE_MAX_BYTES = int(os.getenv('TRACING_FILE_MAX_BYTES', 50 * 1024 * 1024))
+TRACING_FILE_BACKUPS = int(os.getenv('TRACING_FILE_BACKUPS', 3))
+# Fraction of traces kept
+TRACING_SAMPLE_RATE = float(os.getenv('TRACING_SAMPLE_RATE', 1.0))
+OTLP_ENDPOINT = os.getenv('OTLP_ENDPOINT')
+
+# Concurrent slots and queue length per expensive endpoint class
+ADMISSION_LIMITS = {
+    'transcribe': {
+        'concurrency': int(os.getenv('ADMISSION_TRANSCRIBE_CONCURRENCY', 4)),
+        'queue': int(os.getenv('ADMISSION_TRANSCRIBE_QUEUE', 8))
+    },
+    'summarize': {
+        'concurrency': int(os.getenv('ADMISSION_SUMMARIZE_CONCURRENCY', 8)),
+        'queue': int(os.getenv('ADMISSION_SUMMARIZE_QUEUE', 16))
+    },
+    'bot': {
+        'concurrency': int(os.getenv('ADMISSION_BOT_CONCURRENCY', 2)),
+        'queue': 0
+    }
+}
+ADMISSION_PER_KEY_CONCURRENCY = int(os.getenv('ADMISSION_PER_KEY_CONCURRENCY', 2))
+# X-API-Key values trusted to identify a caller; others are limited by address
+ADMISSION_API_KEYS = {key for key in os.getenv('ADMISSION_API_KEYS', '').split(',') if key}
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv('ADMISSION_QUEUE_TIMEOUT', 10))
+
+# Callers allowed to use the archive export/import endpoints
+ADMIN_ALLOWED_CALLERS = os.getenv('ADMIN_ALLOWED_CALLERS', '127.0.0.1,::1').split(',')
+
 CORS_ORIGINS = os.getenv('CORS_ORIGINS', 'http://localhost:3000,http://127.0.0.1:3000').split(',')
@@ -0,0 +1,152 @@
+import json
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+# An escape cut off at the end of a chunk: a lone backslash, a partial
+# \uXXXX, or a high surrogate still waiting for its low half
+_INCOMPLETE_ESCAPE = re.compile(r'(\\u[0-9a-fA-F]{0,3}|\\u[dD][89abAB][0-9a-fA-F]{2}|\\)$')
+
+
+class _Frame:
+    __slots__ = ('container', 'path', 'start', 'key', 'index', 'expect_key')
+
+    def __init__(self, container: str, path: Tuple, start: int):
+        self.container = container
+        self.path = path
+        self.start = start
+        self.key = None
+        self.index = 0
+        self.expect_key = container == 'object'
+
+
+class IncrementalJSONParser:
+    """
+    Parses a JSON document as it streams in and reports parts of it as
+    soon as they are complete, e.g. from an LLM completion.
+
+    `text_paths` maps the path of a string value to an event name; the
+    string is reported as deltas while it grows. `item_paths` maps the path
+    of an array to an event name; each element is reported, parsed, once
+    its closing bracket arrives. Paths are tuples of keys and indexes, ()
+    being the root. Text before the first { or [ (e.g. a ```json fence)
+    is skipped. `on_event(name, value)` is called from feed().
+    """
+
+    def __init__(self, on_event: Callable[[str, Any], None],
+                 text_paths: Optional[Dict[Tuple, str]] = None,
+                 item_paths: Optional[Dict[Tuple, str]] = None):
+        self.on_event = on_event
+        self.text_paths = text_paths or {}
+        self.item_paths = item_paths or {}
+        self.done = False
+        self._data = ''
+        self._pos = 0
+        self._stack: List[_Frame] = []
+        self._started = False
+        # Open string: start offset, whether it is a key, its path
+        self._string: Optional[Tuple[int, bool, Tuple]] = None
+        self._escaped = False
+        self._text_emitted = 0
+
+    def feed(self, chunk: str):
+        if self.done or not chunk:
+            return
+        self._data += chunk
+        data = self._data
+
+        while self._pos < len(data) and not self.done:
+            if self._string is not None:
+                self._scan_string(data)
+                continue
+
+            char = data[self._pos]
+            if not self._started:
+                if char in '{[':
+                    self._started = True
+                else:
+                    self._pos += 1
+                    continue
+
+            if char == '"':
+                frame = self._stack[-1] if self._stack else None
+                is_key = frame is not None and frame.container == 'object' and frame.expect_key
+                self._string = (self._pos + 1, is_key, () if is_key else self._value_path())
+                self._text_emitted = 0
+            elif char in '{[':
+                container = 'object' if char == '{' else 'array'
+                self._stack.append(_Frame(container, self._value_path(), self._pos))
+            elif char in '}]':
+                self._close()
+            elif char == ':' and self._stack and self._stack[-1].container == 'object':
+                self._stack[-1].expect_key = False
+            elif char == ',' and self._stack:
+                frame = self._stack[-1]
+                if frame.container == 'object':
+                    frame.expect_key = True
+                    frame.key = None
+                else:
+                    frame.index += 1
+            self._pos += 1
+
+        if self._string is not None:
+            self._emit_text(data[self._string[0]:self._pos], final=False)
+
+    def _scan_string(self, data: str):
+        start, is_key, path = self._string
+        position = self._pos
+        while position < len(data):
+            char = data[position]
+            if self._escaped:
+                self._escaped = False
+            elif char == '\\':
+                self._escaped = True
+            elif char == '"':
+                raw = data[start:position]
+                self._string = None
+                self._pos = position + 1
+                if is_key:
+                    self._stack[-1].key = json.loads(f'"{raw}"', strict=False)
+                else:
+                    self._emit_text(raw, final=True, path=path)
+                return
+            position += 1
+        self._pos = position
+
+    def _emit_text(self, raw: str, final: bool, path: Optional[Tuple] = None):
+        if path is None:
+            start, is_key, path = self._string
+            if is_key:
+                return
+        name = self.text_paths.get(path)
+        if name is None:
+            return
+        if not final:
+            # Twice: cutting a partial low surrogate can expose its high half
+            raw = _INCOMPLETE_ESCAPE.sub('', _INCOMPLETE_ESCAPE.sub('', raw))
+        try:
+            text = json.loads(f'"{raw}"', strict=False)
+        except ValueError:
+            return
+        if len(text) > self._text_emitted:
+            self.on_event(name, text[self._text_emitted:])
+            self._text_emitted = len(text)
+
+    def _value_path(self) -> Tuple:
+        if not self._stack:
+            return ()
+        frame = self._stack[-1]
+        return frame.path + ((frame.key,) if frame.container == 'object' else (frame.index,))
+
+    def _close(self):
+        frame = self._stack.pop()
+        if not self._stack:
+            self.done = True
+        elif self._stack[-1].container == 'array':
+            name = self.item_paths.get(self._stack[-1].path)
+            if name is not None:
+                try:
+                    item = json.loads(self._data[frame.start:self._pos + 1], strict=False)
+                except ValueError:
+                    return
+                self.on_event(name, item)
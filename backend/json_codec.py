@@ -0,0 +1,138 @@
+"""
+JSON encoding for storage and API responses.
+
+Uses orjson when it is installed (JSON_CODEC=auto or orjson) and the
+standard library otherwise. Both write compact UTF-8; files written with
+the old `indent=2` layout read back unchanged.
+"""
+import json
+import os
+import uuid
+from typing import Any, Iterator
+
+from flask import Response
+from flask.json.provider import JSONProvider
+
+from config import JSON_CODEC
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Lists longer than this are encoded in batches when streaming
+STREAM_BATCH = 256
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _default(value: Any) -> Any:
+    # numpy scalars and arrays, sets, and anything else with a list form
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+if orjson is not None and JSON_CODEC in ('auto', 'orjson'):
+    BACKEND = 'orjson'
+    _OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(value: Any) -> bytes:
+        return orjson.dumps(value, default=_default, option=_OPTIONS)
+
+    def loads(data) -> Any:
+        return orjson.loads(data)
+else:
+    if JSON_CODEC == 'orjson':
+        print("JSON_CODEC=orjson but orjson is not installed, using the json module")
+    BACKEND = 'json'
+
+    def dumps(value: Any) -> bytes:
+        return json.dumps(value, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def loads(data) -> Any:
+        return json.loads(data)
+
+
+def read_file(path) -> Any:
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+
+def write_file(path, value: Any) -> bytes:
+    """
+    Replace `path` atomically: readers see either the old or the new
+    file, never a partly written one, even if the process dies midway.
+    Returns the bytes written.
+    """
+    data = dumps(value)
+    temp_path = f'{path}.{uuid.uuid4().hex[:8]}.tmp'
+    try:
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+        return data
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def iter_encode(value: Any, batch: int = STREAM_BATCH) -> Iterator[bytes]:
+    """
+    Encode `value` piece by piece: dicts key by key and long lists in
+    batches of `batch` items, so a multi-MB transcript is never held as
+    one encoded buffer.
+    """
+    if isinstance(value, dict):
+        yield b'{'
+        for index, (key, item) in enumerate(value.items()):
+            yield (b',' if index else b'') + dumps(str(key)) + b':'
+            yield from iter_encode(item, batch)
+        yield b'}'
+    elif isinstance(value, list) and len(value) > batch:
+        yield b'['
+        for start in range(0, len(value), batch):
+            # Strip the brackets of each batch and join them with commas
+            yield (b',' if start else b'') + dumps(value[start:start + batch])[1:-1]
+        yield b']'
+    else:
+        yield dumps(value)
+
+
+def buffered(pieces: Iterator[bytes], size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """Join small pieces into chunks of at least `size` bytes for streaming."""
+    buffer = bytearray()
+    for piece in pieces:
+        buffer += piece
+        if len(buffer) >= size:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+def stream_response(value: Any, status: int = 200) -> Response:
+    return Response(buffered(iter_encode(value)), status=status, mimetype='application/json')
+
+
+class FastJSONProvider(JSONProvider):
+    """Flask JSON provider backed by this module, so jsonify uses orjson."""
+
+    def dumps(self, obj: Any, **kwargs) -> str:
+        return dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs) -> Any:
+        return loads(s)
+
+    def response(self, *args, **kwargs) -> Response:
+        value = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(value) + b'\n', mimetype='application/json')
@@ -0,0 +1,407 @@
+import os
+import subprocess
+import threading
+import time
+import uuid
+import wave
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Callable, BinaryIO
+
+import numpy as np
+
+from offload import run_cpu_bound
+from tracing import tracer
+
+
+class LiveRecording:
+    def __init__(self, meeting_id: str, file_path: str, transcriber=None, service: str = None):
+        self.meeting_id = meeting_id
+        self.file_path = file_path
+        self.transcriber = transcriber
+        self.service = service
+        self.size = 0
+        self.transcribed_until = 0.0
+        self.segments: List[Dict[str, Any]] = []
+        self.stopped = False
+        self.failed_spans = 0
+        self.last_append = time.monotonic()
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.worker: Optional[threading.Thread] = None
+        self.decoder: Optional[LiveDecoder] = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'meeting_id': self.meeting_id,
+            'offset': self.size,
+            'transcribed_until': round(self.transcribed_until, 3),
+            'segment_count': len(self.segments),
+            'stopped': self.stopped
+        }
+
+
+class LiveDecoder:
+    """
+    One ffmpeg process per live recording that decodes the webm bytes as
+    they are appended, fed through stdin, to 16-bit mono PCM. Decoded
+    samples are buffered until the transcriber takes them, so every byte
+    of the recording is decoded once, however long the meeting runs.
+
+    `skip` drops that many samples from the start of the output, for a
+    decoder restarted on a recording that was partly transcribed.
+    """
+
+    def __init__(self, sample_rate: int, skip: int = 0):
+        self.sample_rate = sample_rate
+        self.failed = False
+        self._closed = False
+        self._skip = skip * 2
+        self._pcm = bytearray()
+        self._lock = threading.Lock()
+        self._process = subprocess.Popen([
+            'ffmpeg', '-v', 'error',
+            # The webm header is enough to find the opus stream; the
+            # default probe would wait for 5 MB of input
+            '-probesize', '32768', '-analyzeduration', '0',
+            '-f', 'webm', '-i', 'pipe:0',
+            '-vn', '-ac', '1', '-ar', str(sample_rate),
+            '-f', 's16le', 'pipe:1'
+        ], stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+
+    def feed(self, data: bytes):
+        if self.failed:
+            return
+        try:
+            self._process.stdin.write(data)
+            self._process.stdin.flush()
+        except (BrokenPipeError, OSError, ValueError):
+            self.failed = True
+
+    def close(self, timeout: float = 60):
+        """Signal the end of the recording and wait for the last samples."""
+        self._closed = True
+        try:
+            self._process.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass
+        self._reader.join(timeout)
+        try:
+            self._process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self.failed = True
+
+    def kill(self):
+        self._process.kill()
+        self.failed = True
+
+    def samples(self) -> np.ndarray:
+        """Every buffered sample not yet consumed."""
+        with self._lock:
+            return np.frombuffer(bytes(self._pcm[:len(self._pcm) // 2 * 2]), dtype='<i2')
+
+    def consume(self, count: int):
+        with self._lock:
+            del self._pcm[:count * 2]
+
+    def _read_loop(self):
+        while True:
+            data = self._process.stdout.read1(65536)
+            if not data:
+                break
+            with self._lock:
+                if self._skip:
+                    dropped = min(self._skip, len(data))
+                    self._skip -= dropped
+                    data = data[dropped:]
+                self._pcm.extend(data)
+        # The newest cluster may be incomplete at the end; keep what decoded
+        if self._process.wait() != 0 and not self._closed:
+            self.failed = True
+
+
+class LiveRecordingManager:
+    """
+    Receives MediaRecorder chunks while a physical meeting is being
+    recorded and transcribes finished spans in the background.
+
+    The browser posts each 1-second chunk at its byte offset; chunks are
+    appended to one webm file, which is always a playable prefix of the
+    recording. Each chunk is also fed to the recording's LiveDecoder, and
+    a worker, once the decoded tail holds at least `span_seconds` of
+    audio, cuts it at a pause and
+    sends that span to the transcriber. Each span's segments are appended
+    to the stored transcript as they arrive, so clients can sync them as
+    deltas. On stop only the last partial span is left to transcribe;
+    that happens in the background and `on_finish(meeting_id, recording)`
+    is called once the transcript is saved.
+
+    A recording that gets no chunk for `idle_timeout` seconds (the tab
+    was closed or the network lost) is stopped as if the client had
+    called stop, so its decoder and worker do not outlive it.
+
+    Recordings live in this process. With several server workers, the
+    requests for one live recording must reach the same worker.
+
+    Spans are diarized independently, so speaker labels are only
+    consistent within a span.
+    """
+
+    def __init__(
+        self,
+        storage,
+        audio_processor,
+        recordings_folder: str,
+        span_seconds: float = 60.0,
+        sample_rate: int = 16000,
+        idle_timeout: float = 300.0,
+        on_change: Optional[Callable[[str, int], None]] = None,
+        on_finish: Optional[Callable[[str, LiveRecording], None]] = None
+    ):
+        self.storage = storage
+        self.audio_processor = audio_processor
+        self.recordings_folder = Path(recordings_folder)
+        self.recordings_folder.mkdir(parents=True, exist_ok=True)
+        self.span_seconds = span_seconds
+        self.sample_rate = sample_rate
+        self.idle_timeout = idle_timeout
+        self.on_change = on_change
+        self.on_finish = on_finish
+        self.recordings: Dict[str, LiveRecording] = {}
+        self._lock = threading.Lock()
+
+    def start(self, meeting_id: str, transcriber=None, service: str = None) -> Dict[str, Any]:
+        with self._lock:
+            recording = self.recordings.get(meeting_id)
+            if recording and not recording.stopped:
+                return recording.status()
+
+            file_path = str(self.recordings_folder / f'live_{meeting_id}_{uuid.uuid4().hex[:8]}.webm')
+            open(file_path, 'wb').close()
+
+            recording = LiveRecording(meeting_id, file_path, transcriber, service)
+            self.recordings[meeting_id] = recording
+
+        self.storage.update_meeting(meeting_id, {
+            'audio_file_path': file_path,
+            'status': 'recording'
+        })
+
+        if transcriber:
+            recording.decoder = LiveDecoder(self.sample_rate)
+        # Also without a transcriber, to stop the recording once it is idle
+        recording.worker = threading.Thread(target=self._transcribe_loop, args=(recording,), daemon=True)
+        recording.worker.start()
+
+        print(f"Live recording started for {meeting_id}: {file_path}")
+        return recording.status()
+
+    def get(self, meeting_id: str) -> Optional[LiveRecording]:
+        return self.recordings.get(meeting_id)
+
+    def append(self, recording: LiveRecording, offset: int, stream: BinaryIO) -> Dict[str, Any]:
+        """
+        Append a chunk at `offset`. Returns None when the offset leaves a
+        gap, so the caller can report the committed size; a chunk that was
+        already stored (a client retry) is read and ignored.
+        """
+        with recording.lock:
+            if recording.stopped:
+                raise ValueError('Recording already stopped')
+            recording.last_append = time.monotonic()
+
+            data = stream.read()
+            if offset + len(data) <= recording.size:
+                return recording.status()
+            if offset != recording.size:
+                return None
+
+            with open(recording.file_path, 'ab') as f:
+                f.write(data)
+            recording.size += len(data)
+            if recording.decoder:
+                recording.decoder.feed(data)
+
+        recording.wakeup.set()
+        return recording.status()
+
+    def stop(self, meeting_id: str) -> Optional[LiveRecording]:
+        """
+        Stop accepting chunks. Only the tail since the last finished span
+        is left to transcribe; the worker does that and then finishes the
+        recording, so this returns right away.
+        """
+        recording = self.recordings.get(meeting_id)
+        if not recording:
+            return None
+
+        with recording.lock:
+            if recording.stopped:
+                return recording
+            recording.stopped = True
+        recording.wakeup.set()
+
+        self.storage.update_meeting(meeting_id, {
+            'audio_file_path': recording.file_path,
+            'status': 'recorded'
+        })
+        print(f"Live recording stopped for {meeting_id}: {recording.size} bytes, "
+              f"{len(recording.segments)} segments so far")
+        return recording
+
+    def _finish(self, recording: LiveRecording):
+        with self._lock:
+            if self.recordings.get(recording.meeting_id) is recording:
+                del self.recordings[recording.meeting_id]
+        if self.on_finish:
+            try:
+                self.on_finish(recording.meeting_id, recording)
+            except Exception as e:
+                print(f"Finishing live recording failed for {recording.meeting_id}: {str(e)}")
+
+    def _transcribe_loop(self, recording: LiveRecording):
+        while True:
+            recording.wakeup.wait(timeout=5)
+            recording.wakeup.clear()
+            idle = time.monotonic() - recording.last_append
+            if not recording.stopped and self.idle_timeout and idle >= self.idle_timeout:
+                print(f"Live recording for {recording.meeting_id} idle for {idle:.0f}s, stopping it")
+                self.stop(recording.meeting_id)
+            final = recording.stopped
+
+            if not recording.transcriber:
+                if final:
+                    break
+                continue
+
+            try:
+                if final:
+                    # Everything was fed; wait for the last decoded samples
+                    recording.decoder.close()
+                while self._transcribe_next_span(recording, final):
+                    pass
+                recording.failed_spans = 0
+            except Exception as e:
+                recording.failed_spans += 1
+                print(f"Live transcription span failed for {recording.meeting_id}: {str(e)}")
+                if final and recording.failed_spans < 3:
+                    continue
+
+            if final:
+                break
+
+        if recording.failed_spans == 0 and recording.segments:
+            self.storage.save_detailed_transcript(recording.meeting_id, {
+                'segments': recording.segments,
+                'service': recording.service
+            })
+            print(f"Live transcript saved for {recording.meeting_id}")
+        self._finish(recording)
+
+    def _transcribe_next_span(self, recording: LiveRecording, final: bool) -> bool:
+        if recording.decoder.failed:
+            self._restart_decoder(recording, final)
+        samples = recording.decoder.samples()
+        if len(samples) == 0:
+            return False
+
+        cut = len(samples) if final else self._find_cut(samples)
+        if cut is None:
+            return False
+
+        with tracer.span('live_recording.span', meeting_id=recording.meeting_id, final=final):
+            self._transcribe_samples(recording, samples[:cut])
+        recording.decoder.consume(cut)
+        return cut < len(samples)
+
+    def _restart_decoder(self, recording: LiveRecording, final: bool):
+        """
+        Replace a decoder whose ffmpeg died (e.g. on a corrupt chunk) by
+        decoding the stored file again, skipping what was transcribed.
+        """
+        print(f"Live decoder for {recording.meeting_id} failed, decoding the recording again")
+        with recording.lock:
+            recording.decoder.kill()
+            skip = int(round(recording.transcribed_until * self.sample_rate))
+            decoder = LiveDecoder(self.sample_rate, skip=skip)
+            with open(recording.file_path, 'rb') as f:
+                while True:
+                    data = f.read(1024 * 1024)
+                    if not data:
+                        break
+                    decoder.feed(data)
+            recording.decoder = decoder
+        if final:
+            decoder.close()
+        if decoder.failed:
+            raise Exception('Decoding live recording failed')
+
+    def _transcribe_samples(self, recording: LiveRecording, samples: np.ndarray):
+        span_path = str(self.audio_processor.temp_dir / f'live_{uuid.uuid4().hex}.wav')
+        try:
+            with wave.open(span_path, 'wb') as f:
+                f.setnchannels(1)
+                f.setsampwidth(2)
+                f.setframerate(self.sample_rate)
+                f.writeframes(samples.tobytes())
+
+            result = recording.transcriber.transcribe_with_timestamps(span_path)
+        finally:
+            try:
+                os.remove(span_path)
+            except OSError:
+                pass
+
+        span_start = recording.transcribed_until
+        segments = result.get('segments', [])
+        for segment in segments:
+            for key in ('start_time', 'end_time'):
+                segment[key] = round(segment[key] + span_start, 3)
+            for word in segment.get('words', []):
+                word['start'] = round(word['start'] + span_start, 3)
+                word['end'] = round(word['end'] + span_start, 3)
+
+        recording.segments.extend(segments)
+        recording.transcribed_until = span_start + len(samples) / self.sample_rate
+        tracer.set_attributes(span_start=span_start, audio_duration=len(samples) / self.sample_rate,
+                              segment_count=len(segments))
+        print(f"Live transcription for {recording.meeting_id}: "
+              f"{span_start:.1f}s-{recording.transcribed_until:.1f}s, {len(segments)} segments")
+
+        if segments:
+            version = self.storage.append_transcript_segments(recording.meeting_id, segments, recording.service)
+            if self.on_change:
+                self.on_change(recording.meeting_id, version)
+
+    def _find_cut(self, samples: np.ndarray) -> Optional[int]:
+        """
+        Pick where to end the next span: the last pause after half a span,
+        keeping a second clear of the live edge, where the last chunk may
+        end mid-word. Falls back to a hard cut at two spans.
+        """
+        span = int(self.span_seconds * self.sample_rate)
+        guard = self.sample_rate
+        if len(samples) < span + guard:
+            return None
+
+        regions = run_cpu_bound(
+            self.audio_processor.detect_speech_regions,
+            samples, self.sample_rate, min_silence_duration=0.4, padding=0.1
+        )
+        if not regions:
+            return len(samples) - guard
+
+        for (_, gap_start), (gap_end, _) in reversed(list(zip(regions, regions[1:]))):
+            middle = (gap_start + gap_end) // 2
+            if span // 2 <= middle <= len(samples) - guard:
+                return middle
+
+        # Trailing silence after the last speech region is also a pause
+        if span // 2 <= regions[-1][1] <= len(samples) - guard:
+            return regions[-1][1]
+
+        if len(samples) >= 2 * span:
+            return len(samples) - guard
+        return None
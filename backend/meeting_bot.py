@@ -6,8 +6,13 @@ import time
 import base64
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any
-from playwright.async_api import async_playwright, Page, Browser
+from typing import Optional, Dict, Any, TYPE_CHECKING
+
+from metrics import stage_timer
+from offload import gevent_patched
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page, Browser
 
 
 class MeetingBot:
@@ -16,14 +21,17 @@ class MeetingBot:
         self.meeting_url = meeting_url
         self.bot_name = bot_name
         self.is_running = False
-        self.browser: Optional[Browser] = None
-        self.page: Optional[Page] = None
+        self.browser: Optional['Browser'] = None
+        self.page: Optional['Page'] = None
         self.audio_chunks = []
         self.recording_path = None
         self.start_time = None
         self.storage = storage
         
     async def start(self, on_transcript_update=None):
+        # Playwright (and trio under it) is only needed once a bot runs
+        from playwright.async_api import async_playwright
+        
         self.is_running = True
         self.start_time = datetime.utcnow()
         self.audio_chunks_received = []
@@ -33,49 +41,54 @@ class MeetingBot:
         self.recording_path = recording_dir / f"{self.meeting_id}_{int(time.time())}.webm"
         
         async with async_playwright() as playwright:
-            self.browser = await playwright.chromium.launch(
-                headless=False,
-                args=[
-                    '--disable-blink-features=AutomationControlled',
-                    '--autoplay-policy=no-user-gesture-required',
-                    '--use-fake-ui-for-media-stream',
-                ]
-            )
-            
-            context = await self.browser.new_context(
-                permissions=['microphone', 'camera'],
-                viewport={'width': 1280, 'height': 720}
-            )
-            
-            self.page = await context.new_page()
-            
-            if 'meet.google.com' in self.meeting_url:
-                await self._join_google_meet()
-            elif 'zoom.us' in self.meeting_url:
-                await self._join_zoom()
-            else:
-                raise ValueError(f"Unsupported meeting platform: {self.meeting_url}")
+            with stage_timer('bot.join'):
+                self.browser = await playwright.chromium.launch(
+                    headless=False,
+                    args=[
+                        '--disable-blink-features=AutomationControlled',
+                        '--autoplay-policy=no-user-gesture-required',
+                        '--use-fake-ui-for-media-stream',
+                    ]
+                )
+                
+                context = await self.browser.new_context(
+                    permissions=['microphone', 'camera'],
+                    viewport={'width': 1280, 'height': 720}
+                )
+                
+                self.page = await context.new_page()
+                
+                if 'meet.google.com' in self.meeting_url:
+                    await self._join_google_meet()
+                elif 'zoom.us' in self.meeting_url:
+                    await self._join_zoom()
+                else:
+                    raise ValueError(f"Unsupported meeting platform: {self.meeting_url}")
             
             print("Bot joined meeting successfully")
             
             if self.storage:
-                meeting = self.storage.get_meeting(self.meeting_id)
-                participants = meeting.get('participants', [])
-                if self.bot_name not in participants:
-                    participants.append(self.bot_name)
-                    self.storage.update_meeting(self.meeting_id, {'participants': participants})
-                    print(f"Added {self.bot_name} to participants list")
+                # HTTP handlers may update the meeting at the same time
+                with self.storage.lock(self.meeting_id):
+                    meeting = self.storage.get_meeting(self.meeting_id)
+                    participants = meeting.get('participants', [])
+                    if self.bot_name not in participants:
+                        participants.append(self.bot_name)
+                        self.storage.update_meeting(self.meeting_id, {'participants': participants})
+                        print(f"Added {self.bot_name} to participants list")
             
             await asyncio.sleep(5)
             
-            await self._start_audio_capture()
+            with stage_timer('bot.capture_start'):
+                await self._start_audio_capture()
             
             while self.is_running:
                 await asyncio.sleep(1)
             
             try:
                 print("Stopping audio capture...")
-                await self._stop_audio_capture()
+                with stage_timer('bot.capture_stop'):
+                    await self._stop_audio_capture()
                 
                 print("Leaving meeting...")
                 await self.page.close()
@@ -270,28 +283,76 @@ class MeetingBot:
         return str(self.recording_path) if self.recording_path and os.path.exists(str(self.recording_path)) else None
 
 
+class _NativeThread:
+    """
+    Thread-like handle for a target run on a gevent OS thread pool.
+
+    Under server.py's gevent monkey patching threading.Thread is a
+    greenlet; bots run their own asyncio loop and need a real OS thread.
+    """
+
+    def __init__(self, target, pool):
+        self._target = target
+        self._pool = pool
+        self._result = None
+
+    def start(self):
+        self._result = self._pool.spawn(self._target)
+
+    def is_alive(self) -> bool:
+        return self._result is not None and not self._result.ready()
+
+    def join(self, timeout=None):
+        if self._result is not None:
+            self._result.wait(timeout)
+
+
 class BotManager:
-    def __init__(self, storage=None):
+    def __init__(self, storage=None, on_status=None, max_bots: int = 2):
         self.active_bots: Dict[str, MeetingBot] = {}
         self.bot_threads: Dict[str, threading.Thread] = {}
         self.storage = storage
+        # Called with (meeting_id, changes) when a bot starts or stops
+        self.on_status = on_status
+        # Each bot holds an OS thread for the whole meeting
+        self.max_bots = max_bots
+        self._pool = None
+        self._started = []
     
     def start_bot(self, meeting_id: str, meeting_url: str, bot_name: str = "MeriTel Bot") -> bool:
         if meeting_id in self.active_bots:
             return False
         
+        # Bots that did not stop in time still hold their thread
+        self._started = [thread for thread in self._started if thread.is_alive()]
+        if len(self._started) >= self.max_bots:
+            raise RuntimeError(f'All {self.max_bots} bot threads are busy')
+        
         bot = MeetingBot(meeting_id, meeting_url, bot_name, storage=self.storage)
         self.active_bots[meeting_id] = bot
         
         def run_bot():
             asyncio.run(bot.start())
         
-        thread = threading.Thread(target=run_bot, daemon=True)
+        thread = self._thread(run_bot)
         self.bot_threads[meeting_id] = thread
+        self._started.append(thread)
         thread.start()
         
+        self._publish(meeting_id)
         return True
     
+    def _thread(self, target):
+        if not gevent_patched():
+            return threading.Thread(target=target, daemon=True)
+        
+        if self._pool is None:
+            from gevent.threadpool import ThreadPool
+            # Not the hub's pool: it also serves DNS lookups, which would
+            # stall behind bots holding its threads for hours
+            self._pool = ThreadPool(self.max_bots)
+        return _NativeThread(target, self._pool)
+    
     def stop_bot(self, meeting_id: str) -> Optional[str]:
         if meeting_id not in self.active_bots:
             return None
@@ -309,6 +370,7 @@ class BotManager:
         if meeting_id in self.bot_threads:
             del self.bot_threads[meeting_id]
         
+        self._publish(meeting_id)
         return recording_path
     
     def get_bot_status(self, meeting_id: str) -> Dict[str, Any]:
@@ -325,6 +387,7 @@ class BotManager:
             'status': 'active',
             'meeting_url': bot.meeting_url,
             'bot_name': bot.bot_name,
+            'started_at': bot.start_time.isoformat() if bot.start_time else None,
             'duration': duration,
             'is_recording': bot.is_running
         }
@@ -332,5 +395,15 @@ class BotManager:
     def list_active_bots(self) -> Dict[str, Dict[str, Any]]:
         return {
             meeting_id: self.get_bot_status(meeting_id)
-            for meeting_id in self.active_bots.keys()
+            for meeting_id in list(self.active_bots.keys())
+        }
+    
+    def heartbeat(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            meeting_id: {'bot': status}
+            for meeting_id, status in self.list_active_bots().items()
         }
+    
+    def _publish(self, meeting_id: str):
+        if self.on_status:
+            self.on_status(meeting_id, {'bot': self.get_bot_status(meeting_id)})
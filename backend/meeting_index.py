@@ -0,0 +1,217 @@
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+import json_codec
+from storage_layout import StorageLayout
+
+
+INDEXED_FIELDS = ('meeting_type', 'platform', 'status')
+# Ids of changed meetings, appended by every writer; rotated past this size
+CHANGE_LOG = '.changes'
+CHANGE_LOG_MAX_BYTES = 4 * 1024 * 1024
+
+
+class MeetingIndex:
+    """
+    In-memory copy of every meeting file, with secondary indexes on
+    meeting_type, platform and status.
+
+    Meetings are kept as their encoded file contents and decoded on each
+    read. Callers mutate what they get back (e.g. participants lists), and
+    decoding is cheaper than deep-copying a parsed dict.
+
+    MeetingStorage updates the index on each of its own writes. Writes from
+    elsewhere are picked up without rereading everything:
+    - get() stats the one file and reparses it only if its mtime or size
+      changed, so a read inside a meeting lock is never stale;
+    - list() first reads the ids that other processes appended to the
+      change log since the last call and reloads just those. A rotated
+      log, or a change to the flat files at the top of the directory,
+      falls back to a rescan.
+    """
+
+    def __init__(self, meetings_dir, layout: Optional[StorageLayout] = None):
+        self.meetings_dir = Path(meetings_dir)
+        self.layout = layout or StorageLayout(self.meetings_dir.parent, depth=0)
+        self._meetings: Dict[str, bytes] = {}
+        self._stats: Dict[str, Tuple[int, int]] = {}
+        self._paths: Dict[str, Path] = {}
+        self._fields: Dict[str, Tuple] = {}
+        self._by_field: Dict[str, Dict[Any, Set[str]]] = {field: {} for field in INDEXED_FIELDS}
+        self._log_path = self.meetings_dir / CHANGE_LOG
+        self._log_state = None
+        self._dir_mtime = None
+        self._lock = threading.RLock()
+        with self._lock:
+            self._rescan()
+
+    def get(self, meeting_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            cached_path = self._paths.get(meeting_id)
+        paths = self.layout.candidates(self.meetings_dir, meeting_id)
+        if cached_path is not None:
+            paths.insert(0, cached_path)
+
+        for path in paths:
+            try:
+                stat = path.stat()
+                with self._lock:
+                    meeting = self._meetings.get(meeting_id)
+                    if (meeting is not None and self._paths.get(meeting_id) == path
+                            and self._stats.get(meeting_id) == (stat.st_mtime_ns, stat.st_size)):
+                        return json_codec.loads(meeting)
+                # Stat before reading: if the file is replaced in between,
+                # the stale stat makes the next get() reparse it
+                data = path.read_bytes()
+            except FileNotFoundError:
+                continue
+            meeting = json_codec.loads(data)
+            self.put(meeting_id, data, stat, meeting, path)
+            return meeting
+
+        self.remove(meeting_id)
+        return None
+
+    def ids(self) -> List[str]:
+        self.refresh()
+        with self._lock:
+            return list(self._meetings)
+
+    def list(self, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        self.refresh()
+        with self._lock:
+            ids = None
+            for field, value in (filters or {}).items():
+                if field not in self._by_field:
+                    continue
+                matches = self._by_field[field].get(value, set())
+                ids = set(matches) if ids is None else ids & matches
+            if ids is None:
+                ids = self._meetings.keys()
+            documents = [self._meetings[meeting_id] for meeting_id in ids]
+        return [json_codec.loads(data) for data in documents]
+
+    def put(self, meeting_id: str, data: bytes, stat: os.stat_result,
+            meeting: Optional[Dict[str, Any]] = None, path: Optional[Path] = None):
+        """Record the bytes just written to (or read from) a meeting's file."""
+        if meeting is None:
+            meeting = json_codec.loads(data)
+        fields = tuple(meeting.get(field) for field in INDEXED_FIELDS)
+
+        with self._lock:
+            self._unindex(meeting_id)
+            self._meetings[meeting_id] = data
+            self._stats[meeting_id] = (stat.st_mtime_ns, stat.st_size)
+            self._paths[meeting_id] = path or self.layout.path(self.meetings_dir, meeting_id)
+            self._fields[meeting_id] = fields
+            for field, value in zip(INDEXED_FIELDS, fields):
+                self._by_field[field].setdefault(value, set()).add(meeting_id)
+
+    def remove(self, meeting_id: str):
+        with self._lock:
+            self._unindex(meeting_id)
+            self._meetings.pop(meeting_id, None)
+            self._stats.pop(meeting_id, None)
+            self._paths.pop(meeting_id, None)
+            self._fields.pop(meeting_id, None)
+
+    def mark_changed(self, meeting_id: str):
+        """Tell the indexes in other processes that a meeting's file changed."""
+        fd = os.open(self._log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, f'{meeting_id}\n'.encode('utf-8'))
+            size = os.fstat(fd).st_size
+        finally:
+            os.close(fd)
+
+        if size >= CHANGE_LOG_MAX_BYTES:
+            # Readers notice the new inode and rescan once
+            temp_path = f'{self._log_path}.{uuid.uuid4().hex[:8]}.tmp'
+            open(temp_path, 'wb').close()
+            os.replace(temp_path, self._log_path)
+
+    def _unindex(self, meeting_id: str):
+        old = self._fields.get(meeting_id)
+        if old is None:
+            return
+        for field, value in zip(INDEXED_FIELDS, old):
+            ids = self._by_field[field].get(value)
+            if ids is not None:
+                ids.discard(meeting_id)
+                if not ids:
+                    del self._by_field[field][value]
+
+    def _log_stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self._log_path.stat()
+            return stat.st_ino, stat.st_size
+        except FileNotFoundError:
+            return None
+
+    def refresh(self):
+        with self._lock:
+            log_state = self._log_stat()
+            dir_mtime = self.meetings_dir.stat().st_mtime_ns
+
+            same_log = (log_state is not None and self._log_state is not None
+                        and log_state[0] == self._log_state[0] and log_state[1] >= self._log_state[1])
+            if not same_log and log_state != self._log_state:
+                self._rescan()
+                return
+
+            if same_log and log_state[1] > self._log_state[1]:
+                self._replay_log(log_state[1])
+            if dir_mtime != self._dir_mtime:
+                # Flat files were added or removed, e.g. during migration
+                self._dir_mtime = dir_mtime
+                self._rescan_flat()
+
+    def _replay_log(self, size: int):
+        offset = self._log_state[1]
+        with open(self._log_path, 'rb') as f:
+            f.seek(offset)
+            data = f.read(size - offset)
+        # A line still being written is read next time
+        end = data.rfind(b'\n') + 1
+        self._log_state = (self._log_state[0], offset + end)
+        for meeting_id in set(data[:end].decode('utf-8').split()):
+            self.get(meeting_id)
+
+    def _rescan(self):
+        # Note where the log and directory stand first: changes landing
+        # during the scan are replayed next time
+        self._log_state = self._log_stat()
+        self._dir_mtime = self.meetings_dir.stat().st_mtime_ns
+        self._load(self.layout.iter_files(self.meetings_dir), set(self._meetings))
+
+    def _rescan_flat(self):
+        flat_ids = {
+            meeting_id for meeting_id, path in self._paths.items()
+            if path.parent == self.meetings_dir
+        }
+        self._load(self.layout.flat_files(self.meetings_dir), flat_ids)
+
+    def _load(self, files, expected: Set[str]):
+        """Reload changed files; ids in `expected` that were not found are looked up again."""
+        seen = set()
+        for meeting_id, entry in files:
+            seen.add(meeting_id)
+            try:
+                stat = entry.stat()
+                if (self._paths.get(meeting_id) == Path(entry.path)
+                        and self._stats.get(meeting_id) == (stat.st_mtime_ns, stat.st_size)):
+                    continue
+                with open(entry.path, 'rb') as f:
+                    data = f.read()
+                self.put(meeting_id, data, stat, path=Path(entry.path))
+            except FileNotFoundError:
+                seen.discard(meeting_id)
+            except ValueError as e:
+                print(f"Skipping unreadable meeting file {entry.name}: {str(e)}")
+
+        for meeting_id in expected - seen:
+            # Moved or deleted
+            self.get(meeting_id)
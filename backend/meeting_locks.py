@@ -0,0 +1,71 @@
+import os
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class _Stripe:
+    def __init__(self, lock_file=None):
+        self.lock = threading.RLock()
+        self.lock_file = lock_file
+        self.fd = None
+        self.depth = 0
+
+
+class MeetingLocks:
+    """
+    Striped per-meeting locks for MeetingStorage.
+
+    A meeting id hashes to one of `stripes` re-entrant locks, so updates
+    to one meeting are serialized without a lock object per meeting. With
+    `file_locks` each stripe is also backed by a flock()ed file under
+    `lock_dir`, which serializes server worker processes sharing the same
+    data directory. The file lock is taken once per outermost acquire.
+    """
+
+    def __init__(self, lock_dir, stripes: int = 64, file_locks: bool = True):
+        self.file_locks = file_locks and fcntl is not None
+        if self.file_locks:
+            Path(lock_dir).mkdir(parents=True, exist_ok=True)
+        self._stripes = [
+            _Stripe(os.path.join(lock_dir, f'stripe_{index:03d}.lock') if self.file_locks else None)
+            for index in range(stripes)
+        ]
+
+    def _stripe(self, meeting_id: str) -> _Stripe:
+        return self._stripes[zlib.crc32(meeting_id.encode('utf-8')) % len(self._stripes)]
+
+    @contextmanager
+    def lock(self, meeting_id: str):
+        stripe = self._stripe(meeting_id)
+        with stripe.lock:
+            if stripe.depth == 0 and self.file_locks:
+                self._lock_file(stripe)
+            stripe.depth += 1
+            try:
+                yield
+            finally:
+                stripe.depth -= 1
+                if stripe.depth == 0 and stripe.fd is not None:
+                    fcntl.flock(stripe.fd, fcntl.LOCK_UN)
+
+    def _lock_file(self, stripe: _Stripe):
+        if stripe.fd is None:
+            stripe.fd = os.open(stripe.lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+        # Poll rather than block, so a gevent worker keeps serving other
+        # requests while another process holds the lock
+        delay = 0.0005
+        while True:
+            try:
+                fcntl.flock(stripe.fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return
+            except BlockingIOError:
+                time.sleep(delay)
+                delay = min(delay * 2, 0.01)
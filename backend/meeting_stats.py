@@ -0,0 +1,182 @@
+import heapq
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+
+RECENT_MEETINGS = 5
+RECENT_FIELDS = ('meeting_id', 'title', 'meeting_type', 'platform', 'status', 'duration', 'created_at')
+
+
+def action_item_counts(action_items: List[Dict[str, Any]]) -> Tuple[int, int]:
+    completed = sum(1 for item in action_items if item.get('completed'))
+    return len(action_items) - completed, completed
+
+
+class MeetingStats:
+    """
+    Dashboard aggregates kept up to date by MeetingStorage, so /api/stats
+    never scans the data directory.
+
+    Each meeting's contribution is remembered, and a save replaces it: a
+    repeated or out-of-order save cannot double count. Writes made by
+    other processes are not seen here; MeetingStorage.rebuild_stats()
+    recomputes everything from disk and runs periodically to correct
+    that drift.
+    """
+
+    def __init__(self, recent: int = RECENT_MEETINGS):
+        self.recent_limit = recent
+        self._reset()
+        self._rebuilt_at = None
+        # Meetings written while a rebuild is scanning; their live values win
+        self._touched = None
+        self._lock = threading.RLock()
+
+    def _reset(self):
+        self._meetings: Dict[str, Dict[str, Any]] = {}
+        self._action_items: Dict[str, Tuple[int, int]] = {}
+        self._by_type = Counter()
+        self._by_platform = Counter()
+        self._by_status = Counter()
+        self._duration = 0
+        self._open_items = 0
+        self._completed_items = 0
+        self._recent: List[Dict[str, Any]] = []
+
+    def meeting_saved(self, meeting_id: str, meeting: Dict[str, Any]):
+        entry = {field: meeting.get(field) for field in RECENT_FIELDS}
+        entry['meeting_id'] = meeting_id
+        with self._lock:
+            # Re-added right below, so no need to refill the recent list
+            self._remove_meeting(meeting_id, refill=False)
+            self._add_meeting(entry)
+            if self._touched is not None:
+                self._touched.add(meeting_id)
+
+    def meeting_removed(self, meeting_id: str):
+        with self._lock:
+            self._remove_meeting(meeting_id)
+            self._set_action_items(meeting_id, None)
+            if self._touched is not None:
+                self._touched.add(meeting_id)
+
+    def summary_saved(self, meeting_id: str, action_items: List[Dict[str, Any]]):
+        with self._lock:
+            self._set_action_items(meeting_id, action_item_counts(action_items))
+            if self._touched is not None:
+                self._touched.add(meeting_id)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'total_meetings': len(self._meetings),
+                'meetings_by_type': dict(self._by_type),
+                'meetings_by_platform': dict(self._by_platform),
+                'meetings_by_status': dict(self._by_status),
+                'total_duration_seconds': self._duration,
+                'action_items': {
+                    'open': self._open_items,
+                    'completed': self._completed_items
+                },
+                'recent_meetings': [dict(entry) for entry in self._recent],
+                'rebuilt_at': self._rebuilt_at
+            }
+
+    def begin_rebuild(self):
+        with self._lock:
+            self._touched = set()
+
+    def finish_rebuild(self, meetings: Dict[str, Dict[str, Any]], action_items: Dict[str, Tuple[int, int]]):
+        """
+        Replace all counters with the ones computed from `meetings` and
+        `action_items` (open and completed counts per meeting), read from
+        disk since begin_rebuild(). Meetings saved in the meantime keep
+        their live values, since the scan may have read them before the
+        save.
+        """
+        with self._lock:
+            touched, self._touched = self._touched or set(), None
+            live_meetings = {meeting_id: self._meetings.get(meeting_id) for meeting_id in touched}
+            live_items = {meeting_id: self._action_items.get(meeting_id) for meeting_id in touched}
+
+            self._reset()
+            for meeting_id, meeting in meetings.items():
+                if meeting_id not in touched:
+                    self.meeting_saved(meeting_id, meeting)
+            for meeting_id, counts in action_items.items():
+                if meeting_id not in touched:
+                    self._set_action_items(meeting_id, counts)
+            for meeting_id in touched:
+                if live_meetings[meeting_id] is not None:
+                    self._add_meeting(live_meetings[meeting_id])
+                self._set_action_items(meeting_id, live_items[meeting_id])
+            self._rebuilt_at = datetime.utcnow().isoformat()
+
+    def _add_meeting(self, entry: Dict[str, Any]):
+        self._meetings[entry['meeting_id']] = entry
+        self._by_type[entry['meeting_type']] += 1
+        self._by_platform[entry['platform'] or 'none'] += 1
+        self._by_status[entry['status']] += 1
+        self._duration += entry['duration'] or 0
+
+        if len(self._recent) < self.recent_limit or (entry['created_at'] or '') > (self._recent[-1]['created_at'] or ''):
+            self._recent.append(entry)
+            self._recent.sort(key=lambda x: x['created_at'] or '', reverse=True)
+            del self._recent[self.recent_limit:]
+
+    def _remove_meeting(self, meeting_id: str, refill: bool = True):
+        entry = self._meetings.pop(meeting_id, None)
+        if entry is None:
+            return
+        for counter, key in ((self._by_type, entry['meeting_type']),
+                             (self._by_platform, entry['platform'] or 'none'),
+                             (self._by_status, entry['status'])):
+            counter[key] -= 1
+            if counter[key] <= 0:
+                del counter[key]
+        self._duration -= entry['duration'] or 0
+
+        if any(recent['meeting_id'] == meeting_id for recent in self._recent):
+            self._recent = [recent for recent in self._recent if recent['meeting_id'] != meeting_id]
+            if refill:
+                # Only when one of the recent meetings is deleted
+                self._recent = heapq.nlargest(self.recent_limit, self._meetings.values(),
+                                              key=lambda x: x['created_at'] or '')
+
+    def _set_action_items(self, meeting_id: str, counts: Optional[Tuple[int, int]]):
+        old_open, old_completed = self._action_items.pop(meeting_id, (0, 0))
+        self._open_items -= old_open
+        self._completed_items -= old_completed
+        if counts is not None:
+            self._action_items[meeting_id] = counts
+            self._open_items += counts[0]
+            self._completed_items += counts[1]
+
+
+class StatsRebuilder:
+    """
+    Background task that recomputes MeetingStats from disk when it starts
+    and then every `interval` seconds. The first rebuild runs here rather
+    than in MeetingStorage, so a large archive does not delay startup;
+    until it is done the snapshot has `rebuilt_at` set to None.
+    """
+
+    def __init__(self, socketio, storage, interval: float = 300.0):
+        self.socketio = socketio
+        self.storage = storage
+        self.interval = interval
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = self.socketio.start_background_task(self._run)
+
+    def _run(self):
+        while True:
+            try:
+                self.storage.rebuild_stats()
+            except Exception as e:
+                print(f"Rebuilding meeting stats failed: {str(e)}")
+            self.socketio.sleep(self.interval)
@@ -0,0 +1,68 @@
+"""
+CPU-bound work off the gevent hub.
+
+Under server.py every greenlet of a worker runs on one OS thread, so a
+long numpy computation, a hash over a large recording or noise reduction
+stalls every request and Socket.IO connection of that worker until it
+is done. `run_cpu_bound` runs such work on a small pool of real OS
+threads and blocks only the calling greenlet. numpy, hashlib and file
+reads release the GIL for most of their time, so the hub keeps serving
+while they run.
+
+Without gevent (`python app.py`, scripts) the work runs in the calling
+thread.
+
+The other gevent helpers shared across modules live here too:
+`gevent_patched`, `original` for an unpatched function, and
+`native_lock`.
+"""
+import threading
+from typing import Callable, TypeVar
+
+T = TypeVar('T')
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def gevent_patched() -> bool:
+    try:
+        from gevent import monkey
+        return monkey.is_module_patched('threading')
+    except ImportError:
+        return False
+
+
+def original(module: str, name: str):
+    """`module.name` as it was before gevent patched it."""
+    try:
+        from gevent import monkey
+        return monkey.get_original(module, name)
+    except ImportError:
+        return getattr(__import__(module), name)
+
+
+def native_lock():
+    """
+    A lock that blocks the OS thread even under gevent, for state shared
+    with real OS threads (the profiler's sampler, bot threads).
+    """
+    return original('_thread', 'allocate_lock')()
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                from gevent.threadpool import ThreadPool
+                from config import CPU_OFFLOAD_THREADS
+                # Separate from the hub's pool, which resolves DNS
+                _pool = ThreadPool(CPU_OFFLOAD_THREADS)
+    return _pool
+
+
+def run_cpu_bound(func: Callable[..., T], *args, **kwargs) -> T:
+    if not gevent_patched():
+        return func(*args, **kwargs)
+    return _get_pool().apply(func, args, kwargs)
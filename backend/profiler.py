@@ -0,0 +1,233 @@
+import heapq
+import io
+import itertools
+import marshal
+import pstats
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+# Under gevent the sampler must run on a real OS thread with real locks
+# and sleep, or it would only run when the request yields
+from offload import native_lock, original
+
+
+class StackSampler:
+    """
+    Samples one thread's Python stack every `interval` seconds from a
+    background thread. Overhead is confined to the sampled thread being
+    briefly paused for the GIL, so it is safe on live requests.
+
+    Under gevent workers all greenlets share one OS thread, so samples
+    also include whatever other request is running at that instant.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005, max_depth: int = 128):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self._stopped = False
+        self._finished = native_lock()
+
+    def start(self):
+        self._finished.acquire()
+        original('_thread', 'start_new_thread')(self._run, ())
+
+    def stop(self):
+        self._stopped = True
+        if self._finished.acquire(timeout=1.0):
+            self._finished.release()
+
+    def _run(self):
+        sleep = original('time', 'sleep')
+        try:
+            while not self._stopped:
+                sleep(self.interval)
+                if self._stopped:
+                    break
+                frame = sys._current_frames().get(self.thread_id)
+                if frame is None:
+                    break
+
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    code = frame.f_code
+                    stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                    frame = frame.f_back
+                del frame
+
+                self.samples[tuple(reversed(stack))] += 1
+                self.sample_count += 1
+        finally:
+            self._finished.release()
+
+
+class RequestProfile:
+    def __init__(self, method: str, path: str, route: str, reason: str, interval: float):
+        self.profile_id = uuid.uuid4().hex[:12]
+        self.method = method
+        self.path = path
+        self.route = route
+        self.reason = reason
+        self.interval = interval
+        self.started_at = datetime.utcnow().isoformat()
+        self.duration = 0.0
+        self.status_code = None
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'profile_id': self.profile_id,
+            'method': self.method,
+            'path': self.path,
+            'route': self.route,
+            'reason': self.reason,
+            'status_code': self.status_code,
+            'started_at': self.started_at,
+            'duration': round(self.duration, 4),
+            'sample_count': self.sample_count
+        }
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's collapsed-stack format, one `a;b;c count` per line."""
+        lines = []
+        for stack, count in self.samples.most_common():
+            frames = ';'.join(f'{name} ({filename.rsplit("/", 1)[-1]}:{line})'
+                              for filename, line, name in stack)
+            lines.append(f'{frames} {count}')
+        return '\n'.join(lines) + '\n'
+
+    def stats(self) -> Dict[Tuple, Tuple]:
+        """
+        Build a pstats-compatible table from the samples: self time from
+        leaf frames, cumulative time from every frame on the stack (counted
+        once per sample so recursion is not double-counted). Call counts
+        are sample counts, not real calls.
+        """
+        self_counts: Counter = Counter()
+        total_counts: Counter = Counter()
+        callers: Dict[Tuple, Counter] = {}
+
+        for stack, count in self.samples.items():
+            self_counts[stack[-1]] += count
+            for func in set(stack):
+                total_counts[func] += count
+            for caller, callee in zip(stack, stack[1:]):
+                callers.setdefault(callee, Counter())[caller] += count
+
+        table = {}
+        for func, total in total_counts.items():
+            func_callers = {
+                caller: (n, n, n * self.interval, n * self.interval)
+                for caller, n in callers.get(func, {}).items()
+            }
+            calls = sum(n for n, _, _, _ in func_callers.values()) or total
+            table[func] = (calls, calls, self_counts[func] * self.interval, total * self.interval, func_callers)
+        return table
+
+    def pstats_bytes(self) -> bytes:
+        return marshal.dumps(self.stats())
+
+    def pstats_text(self, limit: int = 40) -> str:
+        stats = _SampledStats(self.stats())
+        stream = io.StringIO()
+        pstats.Stats(stats, stream=stream).sort_stats('cumulative').print_stats(limit)
+        return stream.getvalue()
+
+
+class _SampledStats:
+    # pstats.Stats accepts any object with create_stats() and a .stats dict
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+class RequestProfiler:
+    """
+    Opt-in profiling of live requests.
+
+    A request is profiled when it falls in the random `sample_rate`
+    fraction, or when it carries `header` and comes from an address in
+    `allowed_callers`. Only the `max_profiles` slowest profiles are kept.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 0.0,
+        allowed_callers: Optional[List[str]] = None,
+        header: str = 'X-Debug-Profile',
+        max_profiles: int = 20,
+        interval: float = 0.005
+    ):
+        self.sample_rate = sample_rate
+        self.allowed_callers = set(allowed_callers or [])
+        self.header = header
+        self.max_profiles = max_profiles
+        self.interval = interval
+        self._profiles: List[Tuple[float, int, RequestProfile]] = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def is_allowed(self, remote_addr: Optional[str]) -> bool:
+        return remote_addr in self.allowed_callers
+
+    def should_profile(self, headers, remote_addr: Optional[str]) -> Optional[str]:
+        if headers.get(self.header) and self.is_allowed(remote_addr):
+            return 'header'
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            return 'sampled'
+        return None
+
+    def start(self, method: str, path: str, route: str, reason: str):
+        profile = RequestProfile(method, path, route, reason, self.interval)
+        # The OS thread id, which is what sys._current_frames is keyed by
+        sampler = StackSampler(original('_thread', 'get_ident')(), self.interval)
+        sampler.start()
+        return profile, sampler, time.perf_counter()
+
+    def finish(self, handle, status_code: Optional[int] = None) -> RequestProfile:
+        profile, sampler, started = handle
+        profile.duration = time.perf_counter() - started
+        sampler.stop()
+        profile.samples = sampler.samples
+        profile.sample_count = sampler.sample_count
+        # Samples land late when the request holds the GIL, so weight each
+        # by the wall time actually covered rather than the nominal interval
+        if sampler.sample_count:
+            profile.interval = profile.duration / sampler.sample_count
+        profile.status_code = status_code
+
+        entry = (profile.duration, next(self._counter), profile)
+        with self._lock:
+            if len(self._profiles) < self.max_profiles:
+                heapq.heappush(self._profiles, entry)
+            elif profile.duration > self._profiles[0][0]:
+                heapq.heapreplace(self._profiles, entry)
+        return profile
+
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            profiles = [entry[2] for entry in self._profiles]
+        profiles.sort(key=lambda p: p.duration, reverse=True)
+        return [p.summary() for p in profiles]
+
+    def get_profile(self, profile_id: str) -> Optional[RequestProfile]:
+        with self._lock:
+            for _, _, profile in self._profiles:
+                if profile.profile_id == profile_id:
+                    return profile
+        return None
+
+    def clear(self):
+        with self._lock:
+            self._profiles = []
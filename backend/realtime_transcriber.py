@@ -1,8 +1,11 @@
 import asyncio
 import json
-from typing import Callable, Optional, Dict, Any
-from deepgram import DeepgramClient, LiveTranscriptionEvents, LiveOptions
-import assemblyai as aai
+from typing import Callable, Optional, Dict, Any, TYPE_CHECKING
+
+# The provider SDKs are imported by the method that streams to them, so
+# importing this module stays cheap
+if TYPE_CHECKING:
+    import assemblyai as aai
 
 
 class RealtimeTranscriber:
@@ -27,6 +30,8 @@ class RealtimeTranscriber:
             raise ValueError(f"Unsupported service: {self.service}")
     
     async def _stream_deepgram(self, audio_stream):
+        from deepgram import DeepgramClient, LiveTranscriptionEvents, LiveOptions
+        
         try:
             deepgram = DeepgramClient(self.api_key)
             
@@ -98,6 +103,8 @@ class RealtimeTranscriber:
             print(f"Deepgram streaming error: {e}")
     
     async def _stream_assemblyai(self, audio_stream):
+        import assemblyai as aai
+        
         try:
             aai.settings.api_key = self.api_key
             
@@ -121,7 +128,9 @@ class RealtimeTranscriber:
         except Exception as e:
             print(f"AssemblyAI streaming error: {e}")
     
-    def _on_assemblyai_data(self, transcript: aai.RealtimeTranscript):
+    def _on_assemblyai_data(self, transcript: 'aai.RealtimeTranscript'):
+        import assemblyai as aai
+        
         if not transcript.text:
             return
         
@@ -155,7 +164,7 @@ class RealtimeTranscriber:
             if self.on_transcript_callback:
                 self.on_transcript_callback(transcript_data)
     
-    def _on_assemblyai_error(self, error: aai.RealtimeError):
+    def _on_assemblyai_error(self, error: 'aai.RealtimeError'):
         print(f"AssemblyAI error: {error}")
     
     def stop(self):
@@ -0,0 +1,84 @@
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class RecordingVariantCache:
+    """
+    On-demand low-bitrate Opus renditions of meeting recordings.
+
+    Variants are transcoded on first request and cached under
+    data/variants. The cache key includes the source file's size and
+    mtime, so replacing a recording never serves a stale rendition.
+    """
+
+    VARIANTS = {
+        'low': {'bitrate': '16k', 'sample_rate': 16000, 'channels': 1},
+        'medium': {'bitrate': '32k', 'sample_rate': 24000, 'channels': 1},
+        'high': {'bitrate': '64k', 'sample_rate': 48000, 'channels': 1},
+    }
+
+    def __init__(self, audio_processor, data_dir='data'):
+        self.audio_processor = audio_processor
+        self.variants_dir = Path(data_dir) / 'variants'
+        self.variants_dir.mkdir(parents=True, exist_ok=True)
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    def get_variant(self, meeting_id: str, source_path: str, variant: str) -> str:
+        if variant not in self.VARIANTS:
+            raise ValueError(f"Unsupported recording variant: {variant}")
+
+        stat = os.stat(source_path)
+        key = f"{meeting_id}_{variant}_{stat.st_size:x}{stat.st_mtime_ns:x}"
+        variant_path = self.variants_dir / f'{key}.webm'
+        if variant_path.exists():
+            return str(variant_path)
+
+        # One transcode per key; concurrent requests wait for the first one
+        try:
+            with self._lock_for(key):
+                if variant_path.exists():
+                    return str(variant_path)
+
+                self.delete(meeting_id, variant)
+
+                temp_path = self.variants_dir / f'{key}.tmp.webm'
+                settings = self.VARIANTS[variant]
+                try:
+                    self.audio_processor.transcode_to_opus(
+                        source_path,
+                        str(temp_path),
+                        bitrate=settings['bitrate'],
+                        sample_rate=settings['sample_rate'],
+                        channels=settings['channels']
+                    )
+                    os.replace(temp_path, variant_path)
+                finally:
+                    if temp_path.exists():
+                        temp_path.unlink()
+        finally:
+            # Also after a failed transcode or an early return, so keys of
+            # replaced recordings do not pile up
+            with self._locks_lock:
+                self._locks.pop(key, None)
+
+        print(f"Cached {variant} recording variant for {meeting_id}: {variant_path}")
+        return str(variant_path)
+
+    def delete(self, meeting_id: str, variant: Optional[str] = None) -> int:
+        pattern = f'{meeting_id}_{variant}_*.webm' if variant else f'{meeting_id}_*.webm'
+        removed = 0
+        for variant_file in self.variants_dir.glob(pattern):
+            if variant_file.name.endswith('.tmp.webm'):
+                continue
+            variant_file.unlink()
+            removed += 1
+        return removed
+
+    def _lock_for(self, key: str) -> threading.Lock:
+        with self._locks_lock:
+            if key not in self._locks:
+                self._locks[key] = threading.Lock()
+            return self._locks[key]
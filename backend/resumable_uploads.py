@@ -0,0 +1,256 @@
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Any, Optional, BinaryIO
+
+from blob_store import hash_file
+from offload import run_cpu_bound
+
+
+class UploadError(Exception):
+    def __init__(self, message: str, status_code: int = 400, offset: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.offset = offset
+
+
+class ResumableUploadStore:
+    """
+    Chunked uploads written straight into the destination file.
+
+    Each upload has a session file under data/upload_sessions and a
+    `.part` file in the upload folder. The `.part` file's size is the
+    committed offset, so a client that lost its connection asks for the
+    offset and resumes from there, even after a server restart. A session
+    nothing was written to for a while is given up by expire().
+    """
+
+    def __init__(self, upload_folder: str, data_dir='data', max_size: int = 0, buffer_size: int = 1024 * 1024):
+        self.upload_folder = Path(upload_folder)
+        self.sessions_dir = Path(data_dir) / 'upload_sessions'
+        self.upload_folder.mkdir(parents=True, exist_ok=True)
+        self.sessions_dir.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size
+        self.buffer_size = buffer_size
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+
+    def create(self, filename: str, size: int, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        if size <= 0:
+            raise UploadError('Upload size must be positive')
+        if self.max_size and size > self.max_size:
+            raise UploadError(f'Upload exceeds maximum size of {self.max_size} bytes', 413)
+
+        upload_id = uuid.uuid4().hex
+        file_ext = os.path.splitext(filename or '')[1]
+        target_path = self.upload_folder / f'upload_{upload_id}{file_ext}'
+
+        session = {
+            'upload_id': upload_id,
+            'filename': filename,
+            'size': size,
+            'target_path': str(target_path),
+            'metadata': metadata or {},
+            'created_at': datetime.utcnow().isoformat()
+        }
+
+        self._part_path(session).touch()
+        self._save_session(session)
+
+        return self._describe(session)
+
+    def get(self, upload_id: str) -> Optional[Dict[str, Any]]:
+        session = self._load_session(upload_id)
+        if not session:
+            return None
+        return self._describe(session)
+
+    def append(self, upload_id: str, offset: int, stream: BinaryIO) -> Dict[str, Any]:
+        """
+        Write the request body at `offset`. The offset must not be past the
+        committed size; an earlier offset overwrites a partially received
+        chunk the client is retrying.
+        """
+        with self._lock_for(upload_id):
+            session = self._require_session(upload_id)
+            part_path = self._part_path(session)
+            committed = part_path.stat().st_size
+
+            if offset < 0 or offset > committed:
+                raise UploadError(f'Offset {offset} does not match committed size {committed}', 409, committed)
+
+            written = offset
+            with open(part_path, 'r+b') as f:
+                f.seek(offset)
+                f.truncate()
+                while True:
+                    buffer = stream.read(self.buffer_size)
+                    if not buffer:
+                        break
+                    written += len(buffer)
+                    if written > session['size']:
+                        f.truncate(offset)
+                        raise UploadError('Chunk extends past declared upload size', 413, offset)
+                    f.write(buffer)
+                f.flush()
+                os.fsync(f.fileno())
+
+            return self._describe(session)
+
+    def complete(self, upload_id: str, checksum: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Verify size and optional `sha256:<hex>` checksum, then move the
+        `.part` file into place. Returns the session with its final path.
+        """
+        with self._lock_for(upload_id):
+            session = self._require_session(upload_id)
+            part_path = self._part_path(session)
+            received = part_path.stat().st_size
+
+            if received != session['size']:
+                raise UploadError(f"Upload incomplete: {received} of {session['size']} bytes", 409, received)
+
+            if checksum:
+                algorithm, _, expected = checksum.partition(':')
+                if algorithm.lower() != 'sha256' or not expected:
+                    raise UploadError('Checksum must be given as sha256:<hex>')
+
+                # Off the gevent hub; a large upload takes seconds to hash
+                if run_cpu_bound(hash_file, part_path) != expected.lower():
+                    raise UploadError('Checksum mismatch', 422)
+
+            os.replace(part_path, session['target_path'])
+            self._session_file(upload_id).unlink()
+
+        with self._locks_lock:
+            self._locks.pop(upload_id, None)
+
+        return session
+
+    def abort(self, upload_id: str) -> bool:
+        with self._lock_for(upload_id):
+            session = self._load_session(upload_id)
+            if not session:
+                return False
+
+            part_path = self._part_path(session)
+            if part_path.exists():
+                part_path.unlink()
+            self._session_file(upload_id).unlink()
+
+        with self._locks_lock:
+            self._locks.pop(upload_id, None)
+        return True
+
+    def expire(self, ttl: float) -> int:
+        """
+        Abort sessions that received no chunk for `ttl` seconds, counting
+        from their creation for one that never got any. Returns how many
+        were removed.
+        """
+        cutoff = time.time() - ttl
+        expired = 0
+        for session_file in self.sessions_dir.glob('*.json'):
+            upload_id = session_file.stem
+            try:
+                session = self._load_session(upload_id)
+            except ValueError:
+                continue
+            # Checked again under the lock, in case a chunk just arrived
+            if not session or self._last_activity(session) > cutoff:
+                continue
+
+            with self._lock_for(upload_id):
+                session = self._load_session(upload_id)
+                if session and self._last_activity(session) <= cutoff:
+                    part_path = self._part_path(session)
+                    if part_path.exists():
+                        part_path.unlink()
+                    self._session_file(upload_id).unlink()
+                    expired += 1
+                    print(f"Expired resumable upload {upload_id} ({session['filename']})")
+
+            with self._locks_lock:
+                self._locks.pop(upload_id, None)
+        return expired
+
+    def _last_activity(self, session: Dict[str, Any]) -> float:
+        created_at = datetime.fromisoformat(session['created_at']).replace(tzinfo=timezone.utc).timestamp()
+        try:
+            return max(created_at, self._part_path(session).stat().st_mtime)
+        except FileNotFoundError:
+            return created_at
+
+    def _describe(self, session: Dict[str, Any]) -> Dict[str, Any]:
+        part_path = self._part_path(session)
+        return {
+            'upload_id': session['upload_id'],
+            'filename': session['filename'],
+            'size': session['size'],
+            'offset': part_path.stat().st_size if part_path.exists() else 0,
+            'chunk_size': self.buffer_size * 8
+        }
+
+    def _require_session(self, upload_id: str) -> Dict[str, Any]:
+        session = self._load_session(upload_id)
+        if not session:
+            raise UploadError('Upload not found', 404)
+        return session
+
+    def _load_session(self, upload_id: str) -> Optional[Dict[str, Any]]:
+        session_file = self._session_file(upload_id)
+        if not session_file.exists():
+            return None
+
+        with open(session_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_session(self, session: Dict[str, Any]):
+        session_file = self._session_file(session['upload_id'])
+        with open(session_file, 'w', encoding='utf-8') as f:
+            json.dump(session, f, indent=2, ensure_ascii=False)
+
+    def _session_file(self, upload_id: str) -> Path:
+        # Upload IDs are uuid4 hex; anything else never maps to a file
+        if not upload_id.isalnum():
+            upload_id = '_invalid_'
+        return self.sessions_dir / f'{upload_id}.json'
+
+    def _part_path(self, session: Dict[str, Any]) -> Path:
+        return Path(session['target_path'] + '.part')
+
+    def _lock_for(self, upload_id: str) -> threading.Lock:
+        with self._locks_lock:
+            if upload_id not in self._locks:
+                self._locks[upload_id] = threading.Lock()
+            return self._locks[upload_id]
+
+
+class UploadSessionSweeper:
+    """
+    Background task that expires abandoned resumable uploads every
+    `interval` seconds, freeing their `.part` files.
+    """
+
+    def __init__(self, socketio, uploads: ResumableUploadStore, ttl: float, interval: float = 3600.0):
+        self.socketio = socketio
+        self.uploads = uploads
+        self.ttl = ttl
+        self.interval = interval
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = self.socketio.start_background_task(self._run)
+
+    def _run(self):
+        while True:
+            try:
+                self.uploads.expire(self.ttl)
+            except Exception as e:
+                print(f"Expiring resumable uploads failed: {str(e)}")
+            self.socketio.sleep(self.interval)
@@ -0,0 +1,201 @@
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Any, List, Optional
+
+from metrics import RETENTION_RECORDINGS, RETENTION_RECLAIMED_BYTES
+
+
+OPUS_TIER = 'opus'
+OPUS_SAMPLE_RATE = 16000
+
+
+class RecordingRetention:
+    """
+    Transcodes recordings older than `max_age_days` to 16 kHz mono Opus.
+
+    Originals (WAV, video, high-bitrate M4A) are kept at full size only
+    while they are recent. An aged recording is transcoded once per blob,
+    the result is checked to have the same duration (within `tolerance`
+    seconds) and to be smaller, and then every meeting using the original
+    is switched to the Opus blob under its lock. The original is deleted
+    by the blob store once its last meeting has been switched. A blob
+    still shared with a meeting younger than the cutoff is left for a
+    later pass. Meetings are marked with audio_tier 'opus' and not
+    looked at again.
+    """
+
+    def __init__(self, storage, blob_store, audio_processor, max_age_days: float = 30,
+                 bitrate: str = '24k', tolerance: float = 0.5):
+        self.storage = storage
+        self.blob_store = blob_store
+        self.audio_processor = audio_processor
+        self.max_age = timedelta(days=max_age_days)
+        self.bitrate = bitrate
+        self.tolerance = tolerance
+
+    def run(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        """Handle up to `limit` recordings and report what was done."""
+        report = {'transcoded': 0, 'skipped': 0, 'failed': 0, 'reclaimed_bytes': 0, 'errors': []}
+        # Storage writes created_at as naive UTC (datetime.utcnow())
+        cutoff = datetime.utcnow() - self.max_age
+
+        groups: Dict[Any, List[Dict[str, Any]]] = {}
+        for meeting in self.storage.list_meetings():
+            if meeting.get('audio_blob'):
+                key = ('blob', meeting['audio_blob'])
+            elif meeting.get('audio_file_path'):
+                key = ('file', meeting['audio_file_path'])
+            else:
+                continue
+            groups.setdefault(key, []).append(meeting)
+
+        handled = 0
+        for (kind, source), meetings in groups.items():
+            if limit is not None and handled >= limit:
+                break
+            if any(meeting.get('audio_tier') == OPUS_TIER for meeting in meetings):
+                continue
+            if not all(self._aged(meeting, cutoff) for meeting in meetings):
+                continue
+            # Other owners may not be in this listing, e.g. just created
+            if kind == 'blob' and self.blob_store.owners(source) - {m['meeting_id'] for m in meetings}:
+                continue
+
+            handled += 1
+            try:
+                result, reclaimed = self._retain(kind, source, meetings)
+            except Exception as e:
+                result, reclaimed = 'failed', 0
+                report['errors'].append(f'{source}: {str(e)}')
+                print(f"Retention failed for {source}: {str(e)}")
+            report[result] += 1
+            report['reclaimed_bytes'] += reclaimed
+            RETENTION_RECORDINGS.inc(result=result)
+            if reclaimed > 0:
+                RETENTION_RECLAIMED_BYTES.inc(reclaimed)
+
+        if handled:
+            print(f"Retention: {report['transcoded']} recordings transcoded, {report['skipped']} skipped, "
+                  f"{report['failed']} failed, {report['reclaimed_bytes'] / 1e6:.1f}MB reclaimed")
+        return report
+
+    def _aged(self, meeting: Dict[str, Any], cutoff: datetime) -> bool:
+        # Bot meetings in progress, and live recordings still being written
+        if meeting.get('status') in ('live', 'recording'):
+            return False
+        created_at = _parse_utc(meeting.get('created_at'))
+        return created_at is not None and created_at < cutoff
+
+    def _retain(self, kind: str, source: str, meetings: List[Dict[str, Any]]):
+        source_path = self.blob_store.local_path(source) if kind == 'blob' else source
+        if not source_path or not os.path.exists(source_path):
+            raise Exception('recording file is missing')
+
+        original = self.audio_processor.probe_audio(source_path)
+        # Opus always decodes at 48 kHz, so the sample rate says nothing here
+        if original['codec'] == 'opus' and original['channels'] == 1:
+            self._mark(kind, source, meetings, {})
+            return 'skipped', 0
+
+        temp_path = str(self.audio_processor.temp_dir / f'retention_{uuid.uuid4().hex}.webm')
+        try:
+            self.audio_processor.transcode_to_opus(
+                source_path, temp_path, bitrate=self.bitrate, sample_rate=OPUS_SAMPLE_RATE, channels=1
+            )
+            transcoded = self.audio_processor.probe_audio(temp_path)
+            if abs(transcoded['duration'] - original['duration']) > self.tolerance:
+                raise Exception(f"duration changed from {original['duration']:.2f}s "
+                                f"to {transcoded['duration']:.2f}s")
+
+            old_size = os.path.getsize(source_path)
+            new_size = os.path.getsize(temp_path)
+            if new_size >= old_size:
+                self._mark(kind, source, meetings, {})
+                return 'skipped', 0
+
+            first, *rest = [meeting['meeting_id'] for meeting in meetings]
+            new_blob = self.blob_store.put_file(temp_path, first)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        for meeting_id in rest:
+            self.blob_store.add_ref(new_blob, meeting_id)
+
+        switched = self._mark(kind, source, meetings, {
+            'audio_blob': new_blob,
+            'audio_file_path': self.blob_store.local_path(new_blob)
+        }, new_blob)
+        if not switched:
+            return 'skipped', 0
+
+        removed = False
+        if kind == 'blob':
+            for meeting_id in switched:
+                removed = self.blob_store.release(source, meeting_id) or removed
+        elif len(switched) == len(meetings):
+            os.remove(source)
+            removed = True
+
+        # The Opus copy only frees space once nothing uses the original
+        reclaimed = (old_size if removed else 0) - new_size
+        return 'transcoded', reclaimed
+
+    def _mark(self, kind: str, source: str, meetings: List[Dict[str, Any]],
+              updates: Dict[str, Any], new_blob: Optional[str] = None) -> List[str]:
+        """
+        Apply `updates` to each meeting that still uses `source`, under its
+        lock. Meetings whose recording changed meanwhile drop their
+        reference to `new_blob`. Returns the ids that were updated.
+        """
+        field = 'audio_blob' if kind == 'blob' else 'audio_file_path'
+        switched = []
+        for meeting in meetings:
+            meeting_id = meeting['meeting_id']
+            with self.storage.lock(meeting_id):
+                current = self.storage.get_meeting(meeting_id)
+                if current is not None and current.get(field) == source and (
+                        kind == 'blob' or not current.get('audio_blob')):
+                    self.storage.update_meeting(meeting_id, dict(updates, audio_tier=OPUS_TIER))
+                    switched.append(meeting_id)
+                    continue
+            if new_blob:
+                self.blob_store.release(new_blob, meeting_id)
+        return switched
+
+
+def _parse_utc(value: Optional[str]) -> Optional[datetime]:
+    """A created_at timestamp as naive UTC; None if it is missing or invalid."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+class RetentionWorker:
+    """Background task that runs RecordingRetention every `interval` seconds."""
+
+    def __init__(self, socketio, retention: RecordingRetention, interval: float = 3600.0,
+                 batch: int = 20):
+        self.socketio = socketio
+        self.retention = retention
+        self.interval = interval
+        self.batch = batch
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = self.socketio.start_background_task(self._run)
+
+    def _run(self):
+        while True:
+            self.socketio.sleep(self.interval)
+            try:
+                self.retention.run(limit=self.batch)
+            except Exception as e:
+                print(f"Recording retention failed: {str(e)}")
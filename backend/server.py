@@ -0,0 +1,122 @@
+"""
+Production entry point for the MeriTel backend.
+
+Runs the Flask app under gevent's WSGI server instead of the Werkzeug
+development server used by `python app.py`. With --workers N, N worker
+processes share one listening port through SO_REUSEPORT (Linux) and
+share Socket.IO rooms through the message queue in
+SOCKETIO_MESSAGE_QUEUE (e.g. redis://localhost:6379/0).
+
+    python server.py --workers 4 --port 5000
+"""
+import os
+import sys
+
+if __name__ == '__main__' and '--worker' in sys.argv:
+    # Workers patch before anything imports socket, threading or requests.
+    # Non-aggressive patching keeps select.epoll, which trio (pulled in by
+    # playwright) looks up at import time
+    os.environ['SOCKETIO_ASYNC_MODE'] = 'gevent'
+    from gevent import monkey
+    monkey.patch_all(aggressive=False)
+
+import argparse
+import signal
+import subprocess
+import time
+
+
+def run_worker(host: str, port: int, max_connections: int):
+    import socket
+    from gevent.pool import Pool
+    from gevent.pywsgi import WSGIServer
+    from app import app
+
+    # SO_REUSEPORT lets every worker bind the same port; the kernel spreads
+    # new connections across them
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if hasattr(socket, 'SO_REUSEPORT'):
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    listener.bind((host, port))
+    listener.listen(1024)
+    listener.setblocking(False)
+
+    print(f"MeriTel worker {os.getpid()} serving on http://{host}:{port}")
+    server = WSGIServer(listener, app, spawn=Pool(max_connections), log=None)
+    server.serve_forever()
+
+
+def run_supervisor(args):
+    from config import SOCKETIO_MESSAGE_QUEUE
+
+    if args.workers > 1 and not SOCKETIO_MESSAGE_QUEUE:
+        print("SOCKETIO_MESSAGE_QUEUE must be set to run more than one worker "
+              "(Socket.IO rooms are shared through it)")
+        return 1
+
+    command = [
+        sys.executable, os.path.abspath(__file__), '--worker',
+        '--host', args.host,
+        '--port', str(args.port),
+        '--max-connections', str(args.max_connections)
+    ]
+
+    workers = {}
+    stopping = False
+
+    def spawn():
+        process = subprocess.Popen(command)
+        workers[process.pid] = process
+
+    def shutdown(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for process in workers.values():
+            process.terminate()
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    for _ in range(args.workers):
+        spawn()
+
+    # Restart crashed workers until asked to stop
+    while not stopping:
+        for pid, process in list(workers.items()):
+            if process.poll() is not None:
+                del workers[pid]
+                if not stopping:
+                    print(f"Worker {pid} exited with {process.returncode}, restarting")
+                    spawn()
+        time.sleep(1)
+
+    for process in workers.values():
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    return 0
+
+
+def main(argv=None) -> int:
+    from config import SERVER_HOST, SERVER_PORT, SERVER_WORKERS, SERVER_MAX_CONNECTIONS
+
+    parser = argparse.ArgumentParser(description='Run the MeriTel backend in production mode')
+    parser.add_argument('--host', default=SERVER_HOST)
+    parser.add_argument('--port', type=int, default=SERVER_PORT)
+    parser.add_argument('--workers', type=int, default=SERVER_WORKERS)
+    parser.add_argument('--max-connections', type=int, default=SERVER_MAX_CONNECTIONS,
+                        help='Concurrent connections (greenlets) per worker')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        run_worker(args.host, args.port, args.max_connections)
+        return 0
+
+    return run_supervisor(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
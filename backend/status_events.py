@@ -0,0 +1,133 @@
+import threading
+import time
+from typing import Dict, Any, List, Callable, Optional
+
+from offload import native_lock
+
+
+MEETINGS_ROOM = 'meetings'
+
+
+class StatusPublisher:
+    """
+    Pushes meeting status changes to Socket.IO instead of having clients
+    poll for them.
+
+    `publish` only records the change; a background task flushes all
+    pending changes once per `interval`, so a burst of updates to one
+    meeting goes out as one `meeting_status` event to that meeting's room,
+    and the list room gets a single batched `meetings_status` event per
+    tick. Every `heartbeat_interval` the heartbeat sources (the running
+    bots) are published as well. Emits therefore scale with the number of
+    changes and bots, not with open tabs.
+    """
+
+    def __init__(self, socketio, interval: float = 1.0, heartbeat_interval: float = 5.0):
+        self.socketio = socketio
+        self.interval = interval
+        self.heartbeat_interval = heartbeat_interval
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        # publish() is called from bot threads, which are real OS threads
+        # even under gevent
+        self._lock = native_lock()
+        self._heartbeats: List[Callable[[], Dict[str, Dict[str, Any]]]] = []
+        self._task = None
+
+    def publish(self, meeting_id: str, changes: Dict[str, Any]):
+        if not changes:
+            return
+        with self._lock:
+            self._pending.setdefault(meeting_id, {}).update(changes)
+
+    def add_heartbeat(self, source: Callable[[], Dict[str, Dict[str, Any]]]):
+        """`source` returns {meeting_id: changes} to republish every heartbeat."""
+        self._heartbeats.append(source)
+
+    def start(self):
+        # Started from the main thread: a background task spawned from a
+        # bot thread would not run under gevent
+        if self._task is None:
+            self._task = self.socketio.start_background_task(self._run)
+
+    def _run(self):
+        next_heartbeat = time.monotonic() + self.heartbeat_interval
+        while True:
+            self.socketio.sleep(self.interval)
+
+            if time.monotonic() >= next_heartbeat:
+                next_heartbeat = time.monotonic() + self.heartbeat_interval
+                for source in self._heartbeats:
+                    try:
+                        for meeting_id, changes in source().items():
+                            self.publish(meeting_id, changes)
+                    except Exception as e:
+                        print(f"Status heartbeat failed: {str(e)}")
+
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Publishing status updates failed: {str(e)}")
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+
+        updates = []
+        for meeting_id, changes in pending.items():
+            update = dict(changes, meeting_id=meeting_id)
+            self.socketio.emit('meeting_status', update, room=meeting_id)
+            updates.append(update)
+        self.socketio.emit('meetings_status', {'updates': updates}, room=MEETINGS_ROOM)
+
+
+class SummaryStream:
+    """
+    Relays a summary to its meeting's room while the LLM is still writing
+    it, as `summary_stream` events: started, overview (text to append),
+    action_item, outline (one finished entry each), then done or error.
+
+    Overview text arrives a few characters at a time, so it is sent at
+    most every `interval` seconds; list entries go out as soon as they
+    are complete. Called from the summarizer's request threads.
+    """
+
+    def __init__(self, socketio, meeting_id: str, interval: float = 0.1):
+        self.socketio = socketio
+        self.meeting_id = meeting_id
+        self.interval = interval
+        self._text: List[str] = []
+        self._last_text = 0.0
+        self._counts = {'action_item': 0, 'outline': 0}
+        self._lock = threading.Lock()
+
+    def start(self):
+        self._emit({'type': 'started'})
+
+    def __call__(self, name: str, value: Any):
+        with self._lock:
+            if name == 'overview':
+                self._text.append(value)
+                if time.monotonic() - self._last_text >= self.interval:
+                    self._flush_text()
+                return
+
+            self._flush_text()
+            index = self._counts[name]
+            self._counts[name] += 1
+            self._emit({'type': name, 'index': index, 'item': value})
+
+    def finish(self, error: Optional[str] = None):
+        with self._lock:
+            self._flush_text()
+            self._emit({'type': 'error', 'error': error} if error else {'type': 'done'})
+
+    def _flush_text(self):
+        if self._text:
+            text, self._text = ''.join(self._text), []
+            self._last_text = time.monotonic()
+            self._emit({'type': 'overview', 'text': text})
+
+    def _emit(self, event: Dict[str, Any]):
+        self.socketio.emit('summary_stream', dict(event, meeting_id=self.meeting_id), room=self.meeting_id)
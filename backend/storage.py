@@ -1,14 +1,39 @@
+import itertools
 import os
-import json
 import uuid
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
 
+import json_codec
+from change_journal import ChangeJournal
+from meeting_index import MeetingIndex
+from meeting_locks import MeetingLocks
+from meeting_stats import MeetingStats, action_item_counts
+from storage_layout import StorageLayout
+from metrics import track_stage
+from tracing import tracer
+
+
+# Deleted segments and action items remembered for delta sync; clients
+# further behind than this get the full document
+MAX_TOMBSTONES = 1000
+SUMMARY_FIELDS = ('overview', 'outline', 'keywords', 'sentiment', 'template')
+# Meeting fields pushed to status subscribers when they change
+STATUS_FIELDS = ('title', 'status', 'duration', 'started_at', 'ended_at', 'participants',
+                 'audio_file_path', 'transcript_file_path')
+
+
+def _without_version(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in item.items() if key != 'version'}
+
 
 class MeetingStorage:
-    def __init__(self, data_dir='data'):
+    def __init__(self, data_dir='data', on_meeting_update=None, file_locks=True,
+                 journal_max_bytes=64 * 1024, shard_depth=1):
         self.data_dir = Path(data_dir)
+        self.on_meeting_update = on_meeting_update
+        self.journal_max_bytes = journal_max_bytes
         self.meetings_dir = self.data_dir / 'meetings'
         self.transcripts_dir = self.data_dir / 'transcripts'
         self.summaries_dir = self.data_dir / 'summaries'
@@ -16,9 +41,31 @@ class MeetingStorage:
         self.meetings_dir.mkdir(parents=True, exist_ok=True)
         self.transcripts_dir.mkdir(parents=True, exist_ok=True)
         self.summaries_dir.mkdir(parents=True, exist_ok=True)
+        # Files are fanned out into hashed subdirectories; flat files from
+        # before are found too until they are migrated
+        self._layout = StorageLayout(self.data_dir, depth=shard_depth)
+        
+        # Every read-modify-write of a meeting's files holds its lock;
+        # readers need none because files are replaced atomically
+        self._locks = MeetingLocks(self.data_dir / 'locks', file_locks=file_locks)
+        # Meeting metadata is served from memory; transcripts and
+        # summaries are too large to keep and are read from disk
+        self._index = MeetingIndex(self.meetings_dir, self._layout)
+        # Small summary edits are appended here and folded into the
+        # summary file later, instead of rewriting it on every edit
+        self._journal = ChangeJournal(self.data_dir / 'journals')
+        # Dashboard counters, updated on every write below and rebuilt
+        # from disk by StatsRebuilder
+        self._stats = MeetingStats()
+        # meeting_id -> (file stamps, action item counts) from the last
+        # rebuild, so unchanged summaries are not read again
+        self._summary_counts: Dict[str, Tuple[Tuple, Tuple[int, int]]] = {}
     
-    def create_meeting(self, meeting_data: Dict[str, Any]) -> str:
-        meeting_id = str(uuid.uuid4())
+    @track_stage('storage.create_meeting', root=False)
+    def create_meeting(self, meeting_data: Dict[str, Any], meeting_id: Optional[str] = None) -> str:
+        meeting_id = meeting_id or str(uuid.uuid4())
+        # Requests that create a meeting join that meeting's trace
+        tracer.set_meeting(meeting_id)
         
         meeting = {
             'meeting_id': meeting_id,
@@ -30,6 +77,7 @@ class MeetingStorage:
             'join_url': meeting_data.get('join_url'),
             'recording_url': meeting_data.get('recording_url'),
             'audio_file_path': meeting_data.get('audio_file_path'),
+            'audio_blob': meeting_data.get('audio_blob'),
             'duration': meeting_data.get('duration', 0),
             'status': meeting_data.get('status', 'created'),
             'participants': meeting_data.get('participants', []),
@@ -38,61 +86,85 @@ class MeetingStorage:
             'ended_at': meeting_data.get('ended_at')
         }
         
-        self._save_meeting(meeting_id, meeting)
+        with self._locks.lock(meeting_id):
+            self._save_meeting(meeting_id, meeting)
+        self._publish(meeting_id, dict(meeting, created=True))
         return meeting_id
     
+    @track_stage('storage.get_meeting', root=False)
     def get_meeting(self, meeting_id: str) -> Optional[Dict[str, Any]]:
-        meeting_file = self.meetings_dir / f'{meeting_id}.json'
-        if not meeting_file.exists():
-            return None
-        
-        with open(meeting_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return self._index.get(meeting_id)
     
+    @track_stage('storage.update_meeting', root=False)
     def update_meeting(self, meeting_id: str, updates: Dict[str, Any]) -> bool:
-        meeting = self.get_meeting(meeting_id)
-        if not meeting:
-            return False
-        
-        meeting.update(updates)
-        self._save_meeting(meeting_id, meeting)
-        return True
+        with self._locks.lock(meeting_id):
+            meeting = self.get_meeting(meeting_id)
+            if not meeting:
+                return False
+            if all(meeting.get(field) == value for field, value in updates.items()):
+                return True
+            
+            changes = {
+                field: updates[field]
+                for field in STATUS_FIELDS
+                if field in updates and updates[field] != meeting.get(field)
+            }
+            
+            meeting.update(updates)
+            self._save_meeting(meeting_id, meeting)
+            self._publish(meeting_id, changes)
+            return True
     
+    @track_stage('storage.list_meetings', root=False)
     def list_meetings(self, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-        meetings = []
-        for meeting_file in self.meetings_dir.glob('*.json'):
-            with open(meeting_file, 'r', encoding='utf-8') as f:
-                meeting = json.load(f)
-                
-                if filters:
-                    if 'meeting_type' in filters and meeting.get('meeting_type') != filters['meeting_type']:
-                        continue
-                    if 'platform' in filters and meeting.get('platform') != filters['platform']:
-                        continue
-                    if 'status' in filters and meeting.get('status') != filters['status']:
-                        continue
-                
-                meetings.append(meeting)
-        
+        meetings = self._index.list(filters)
         meetings.sort(key=lambda x: x.get('created_at', ''), reverse=True)
         return meetings
     
+    def list_meeting_ids(self) -> List[str]:
+        return self._index.ids()
+    
+    @track_stage('storage.import_meeting', root=False)
+    def import_meeting(self, meeting: Dict[str, Any], transcript: Optional[Dict[str, Any]] = None,
+                       summary: Optional[Dict[str, Any]] = None, overwrite: bool = False) -> bool:
+        """
+        Write an exported meeting back as-is, keeping its id and versions.
+        Returns False if the meeting exists and `overwrite` is not set.
+        """
+        meeting_id = meeting['meeting_id']
+        with self._locks.lock(meeting_id):
+            if not overwrite and self.get_meeting(meeting_id) is not None:
+                return False
+            
+            if transcript is not None:
+                self._write_transcript(meeting_id, transcript)
+            if summary is not None:
+                self._write(self.summaries_dir, meeting_id, summary)
+                self._journal.remove(meeting_id)
+                self._stats.summary_saved(meeting_id, summary.get('action_items', []))
+            # Meeting file last, so it never appears without its documents
+            self._save_meeting(meeting_id, meeting)
+        
+        self._publish(meeting_id, dict(meeting, created=True))
+        return True
+    
+    @track_stage('storage.delete_meeting', root=False)
     def delete_meeting(self, meeting_id: str) -> bool:
-        meeting_file = self.meetings_dir / f'{meeting_id}.json'
-        transcript_file = self.transcripts_dir / f'{meeting_id}.json'
-        summary_file = self.summaries_dir / f'{meeting_id}.json'
-        
-        deleted = False
-        if meeting_file.exists():
-            meeting_file.unlink()
-            deleted = True
-        if transcript_file.exists():
-            transcript_file.unlink()
-        if summary_file.exists():
-            summary_file.unlink()
+        with self._locks.lock(meeting_id):
+            deleted = self._remove(self.meetings_dir, meeting_id)
+            self._index.remove(meeting_id)
+            self._remove(self.transcripts_dir, meeting_id)
+            self._remove(self.summaries_dir, meeting_id)
+            self._journal.remove(meeting_id)
+            if deleted:
+                self._index.mark_changed(meeting_id)
+                self._stats.meeting_removed(meeting_id)
         
+        if deleted:
+            self._publish(meeting_id, {'deleted': True})
         return deleted
     
+    @track_stage('storage.save_detailed_transcript', root=False)
     def save_detailed_transcript(self, meeting_id: str, transcript_data: Dict[str, Any]) -> bool:
         transcript = {
             'meeting_id': meeting_id,
@@ -101,13 +173,17 @@ class MeetingStorage:
             'service': transcript_data.get('service', 'unknown')
         }
         
+        if transcript_data.get('compaction'):
+            transcript['compaction'] = transcript_data['compaction']
+        
         for segment in transcript['segments']:
             if 'segment_id' not in segment:
                 segment['segment_id'] = str(uuid.uuid4())
         
-        transcript_file = self.transcripts_dir / f'{meeting_id}.json'
-        with open(transcript_file, 'w', encoding='utf-8') as f:
-            json.dump(transcript, f, indent=2, ensure_ascii=False)
+        with self._locks.lock(meeting_id):
+            previous = self.get_detailed_transcript(meeting_id) or {}
+            self._apply_versions(transcript, previous, 'segments', 'segment_id', 'deleted_segments')
+            transcript_file = self._write_transcript(meeting_id, transcript)
         
         self.update_meeting(meeting_id, {
             'status': 'transcribed',
@@ -115,14 +191,47 @@ class MeetingStorage:
         })
         return True
     
+    @track_stage('storage.append_transcript_segments', root=False)
+    def append_transcript_segments(self, meeting_id: str, segments: List[Dict[str, Any]],
+                                   service: Optional[str] = None) -> int:
+        """
+        Add segments to the end of a transcript that is still being
+        recorded, without marking the meeting transcribed. Returns the new
+        transcript version.
+        """
+        with self._locks.lock(meeting_id):
+            transcript = self.get_detailed_transcript(meeting_id) or {
+                'meeting_id': meeting_id,
+                'segments': [],
+                'created_at': datetime.utcnow().isoformat(),
+                'service': service or 'unknown',
+                'version': 0
+            }
+            version = transcript.get('version', 0) + 1
+            
+            for segment in segments:
+                if 'segment_id' not in segment:
+                    segment['segment_id'] = str(uuid.uuid4())
+                segment['version'] = version
+            
+            transcript['segments'].extend(segments)
+            transcript['version'] = version
+            self._write_transcript(meeting_id, transcript)
+            return version
+    
+    @track_stage('storage.get_detailed_transcript', root=False)
     def get_detailed_transcript(self, meeting_id: str) -> Optional[Dict[str, Any]]:
-        transcript_file = self.transcripts_dir / f'{meeting_id}.json'
-        if not transcript_file.exists():
+        return self._read(self.transcripts_dir, meeting_id)
+    
+    @track_stage('storage.get_transcript_changes', root=False)
+    def get_transcript_changes(self, meeting_id: str, since: int) -> Optional[Dict[str, Any]]:
+        transcript = self.get_detailed_transcript(meeting_id)
+        if not transcript:
             return None
         
-        with open(transcript_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return self._changes_since(transcript, since, 'segments', 'segment_id', 'deleted_segments')
     
+    @track_stage('storage.save_structured_summary', root=False)
     def save_structured_summary(self, meeting_id: str, summary_data: Dict[str, Any]) -> bool:
         summary = {
             'meeting_id': meeting_id,
@@ -138,58 +247,230 @@ class MeetingStorage:
             'template': summary_data.get('template', 'general')
         }
         
+        if summary_data.get('generation'):
+            summary['generation'] = summary_data['generation']
+        
         for action_item in summary['action_items']:
             if 'id' not in action_item:
                 action_item['id'] = str(uuid.uuid4())
             if 'completed' not in action_item:
                 action_item['completed'] = False
         
-        summary_file = self.summaries_dir / f'{meeting_id}.json'
-        with open(summary_file, 'w', encoding='utf-8') as f:
-            json.dump(summary, f, indent=2, ensure_ascii=False)
+        with self._locks.lock(meeting_id):
+            previous = self.get_structured_summary(meeting_id) or {}
+            fields_changed = any(previous.get(field) != summary[field] for field in SUMMARY_FIELDS)
+            self._apply_versions(summary, previous, 'action_items', 'id', 'deleted_action_items',
+                                 changed=fields_changed)
+            
+            previous_fields = previous.get('field_versions', {})
+            summary['field_versions'] = {
+                field: previous_fields[field]
+                if field in previous_fields and previous.get(field) == summary[field]
+                else summary['version']
+                for field in SUMMARY_FIELDS
+            }
+            
+            # Pending journal records are part of `previous` already
+            summary['journal_seq'] = previous.get('journal_seq', 0)
+            self._write(self.summaries_dir, meeting_id, summary)
+            self._journal.remove(meeting_id)
+            self._stats.summary_saved(meeting_id, summary['action_items'])
         
         self.update_meeting(meeting_id, {'status': 'completed'})
         return True
     
+    @track_stage('storage.get_structured_summary', root=False)
     def get_structured_summary(self, meeting_id: str) -> Optional[Dict[str, Any]]:
-        summary_file = self.summaries_dir / f'{meeting_id}.json'
-        if not summary_file.exists():
+        # Journal first: if a compaction lands in between, the new base
+        # already holds these records and its journal_seq skips them
+        records = self._journal.read(meeting_id)
+        summary = self._read(self.summaries_dir, meeting_id)
+        if summary is None:
             return None
         
-        with open(summary_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        self._apply_journal(summary, records)
+        return summary
     
-    def update_action_item(self, meeting_id: str, action_item_id: str, updates: Dict[str, Any]) -> bool:
+    @track_stage('storage.get_summary_changes', root=False)
+    def get_summary_changes(self, meeting_id: str, since: int) -> Optional[Dict[str, Any]]:
         summary = self.get_structured_summary(meeting_id)
         if not summary:
-            return False
-        
-        for action_item in summary.get('action_items', []):
-            if action_item.get('id') == action_item_id:
-                action_item.update(updates)
-                return self.save_structured_summary(meeting_id, summary)
+            return None
         
-        return False
+        changes = self._changes_since(summary, since, 'action_items', 'id', 'deleted_action_items')
+        if changes['full']:
+            changes.update({field: summary.get(field) for field in SUMMARY_FIELDS})
+        else:
+            field_versions = summary.get('field_versions', {})
+            changes.update({
+                field: summary.get(field)
+                for field in SUMMARY_FIELDS
+                if field_versions.get(field, 0) > since
+            })
+        return changes
     
-    def add_participant(self, meeting_id: str, participant_data: Dict[str, Any]) -> bool:
-        meeting = self.get_meeting(meeting_id)
-        if not meeting:
-            return False
-        
-        participant = {
-            'id': participant_data.get('id', str(uuid.uuid4())),
-            'name': participant_data.get('name', ''),
-            'email': participant_data.get('email'),
-            'platform_user_id': participant_data.get('platform_user_id'),
-            'avatar_url': participant_data.get('avatar_url')
-        }
+    @track_stage('storage.update_action_item', root=False)
+    def update_action_item(self, meeting_id: str, action_item_id: str, updates: Dict[str, Any]) -> bool:
+        """
+        Journal the change instead of rewriting the summary file. The
+        meeting's status is left alone.
+        """
+        with self._locks.lock(meeting_id):
+            summary = self.get_structured_summary(meeting_id)
+            if not summary:
+                return False
+            
+            action_item = next(
+                (item for item in summary.get('action_items', []) if item.get('id') == action_item_id),
+                None
+            )
+            if action_item is None:
+                return False
+            
+            changes = {field: value for field, value in updates.items() if action_item.get(field) != value}
+            if not changes:
+                return True
+            
+            size = self._journal.append(meeting_id, {
+                'seq': summary.get('journal_seq', 0) + 1,
+                'op': 'action_item',
+                'id': action_item_id,
+                'changes': changes,
+                'version': summary.get('version', 0) + 1,
+                'at': datetime.utcnow().isoformat()
+            })
+            action_item.update(changes)
+            self._stats.summary_saved(meeting_id, summary['action_items'])
+            
+            if size >= self.journal_max_bytes:
+                self.compact_journal(meeting_id)
+            return True
+    
+    @track_stage('storage.compact_journal', root=False)
+    def compact_journal(self, meeting_id: str) -> bool:
+        """Fold a meeting's pending journal records into its summary file."""
+        with self._locks.lock(meeting_id):
+            records = self._journal.read(meeting_id)
+            if not records:
+                # Compacted by another process in the meantime
+                return False
+            
+            summary = self._read(self.summaries_dir, meeting_id)
+            if summary is not None:
+                self._apply_journal(summary, records)
+                self._write(self.summaries_dir, meeting_id, summary)
+            self._journal.remove(meeting_id)
+            return summary is not None
+    
+    def layout_migrated(self) -> bool:
+        return self._layout.migrated
+    
+    @track_stage('storage.migrate_layout', root=False)
+    def migrate_layout(self, batch: int = 500) -> int:
+        """
+        Move up to `batch` flat files into the sharded layout and return
+        how many were moved. Once none are left the layout is marked as
+        migrated and lookups stop trying flat paths.
+        """
+        if self._layout.migrated:
+            return 0
         
-        if 'participants' not in meeting:
-            meeting['participants'] = []
+        moved = 0
+        for directory in (self.meetings_dir, self.transcripts_dir, self.summaries_dir):
+            for meeting_id, entry in list(itertools.islice(self._layout.flat_files(directory), batch - moved)):
+                with self._locks.lock(meeting_id):
+                    sharded = self._layout.write_path(directory, meeting_id)
+                    try:
+                        if sharded.exists():
+                            # Already rewritten in the new layout
+                            os.remove(entry.path)
+                        else:
+                            # A rename, so readers see the file in one place or the other
+                            os.replace(entry.path, sharded)
+                    except FileNotFoundError:
+                        continue
+                moved += 1
+            if moved >= batch:
+                return moved
         
-        meeting['participants'].append(participant)
-        self._save_meeting(meeting_id, meeting)
-        return True
+        if moved == 0:
+            self._layout.mark_migrated()
+        return moved
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return self._stats.snapshot()
+    
+    @track_stage('storage.rebuild_stats', root=False)
+    def rebuild_stats(self):
+        """
+        Recompute the dashboard counters from disk, picking up writes made
+        by other processes. Runs in the background (StatsRebuilder), never
+        per request. A summary is only read again when its file or its
+        journal changed since the last rebuild.
+        """
+        self._stats.begin_rebuild()
+        meetings = {meeting['meeting_id']: meeting for meeting in self._index.list()}
+        action_items = {}
+        for meeting_id in meetings:
+            # Taken before the read: a write in between changes the stamp
+            # again and is picked up by the next rebuild
+            stamp = self._summary_stamp(meeting_id)
+            if stamp is None:
+                continue
+            cached = self._summary_counts.get(meeting_id)
+            if cached is not None and cached[0] == stamp:
+                action_items[meeting_id] = cached[1]
+                continue
+            summary = self.get_structured_summary(meeting_id)
+            if summary:
+                counts = action_item_counts(summary.get('action_items', []))
+                self._summary_counts[meeting_id] = (stamp, counts)
+                action_items[meeting_id] = counts
+        for meeting_id in set(self._summary_counts) - set(action_items):
+            del self._summary_counts[meeting_id]
+        self._stats.finish_rebuild(meetings, action_items)
+    
+    def _summary_stamp(self, meeting_id: str) -> Optional[Tuple]:
+        """Identify the current summary file and journal, or None without a summary."""
+        for path in self._layout.candidates(self.summaries_dir, meeting_id):
+            try:
+                summary = path.stat()
+            except FileNotFoundError:
+                continue
+            journal = self._journal.stat(meeting_id)
+            # Files are replaced on write, so the inode changes along with mtime
+            return (str(path), summary.st_ino, summary.st_mtime_ns, summary.st_size,
+                    journal and (journal.st_mtime_ns, journal.st_size))
+        return None
+    
+    def compact_journals(self) -> int:
+        compacted = 0
+        for meeting_id in self._journal.pending():
+            if self.compact_journal(meeting_id):
+                compacted += 1
+        return compacted
+    
+    @track_stage('storage.add_participant', root=False)
+    def add_participant(self, meeting_id: str, participant_data: Dict[str, Any]) -> bool:
+        with self._locks.lock(meeting_id):
+            meeting = self.get_meeting(meeting_id)
+            if not meeting:
+                return False
+            
+            participant = {
+                'id': participant_data.get('id', str(uuid.uuid4())),
+                'name': participant_data.get('name', ''),
+                'email': participant_data.get('email'),
+                'platform_user_id': participant_data.get('platform_user_id'),
+                'avatar_url': participant_data.get('avatar_url')
+            }
+            
+            if 'participants' not in meeting:
+                meeting['participants'] = []
+            
+            meeting['participants'].append(participant)
+            self._save_meeting(meeting_id, meeting)
+            return True
     
     def get_participant(self, meeting_id: str, participant_id: str) -> Optional[Dict[str, Any]]:
         meeting = self.get_meeting(meeting_id)
@@ -202,7 +483,120 @@ class MeetingStorage:
         
         return None
     
+    def lock(self, meeting_id: str):
+        """
+        Hold a meeting's lock across a caller's own read-modify-write, e.g.
+        get_meeting() followed by update_meeting().
+        """
+        return self._locks.lock(meeting_id)
+    
+    def _read(self, directory: Path, meeting_id: str) -> Optional[Dict[str, Any]]:
+        for path in self._layout.candidates(directory, meeting_id):
+            try:
+                return json_codec.read_file(path)
+            except FileNotFoundError:
+                continue
+        # Missing, or deleted since it was listed
+        return None
+    
+    def _write(self, directory: Path, meeting_id: str, document: Dict[str, Any]) -> Tuple[Path, bytes]:
+        path = self._layout.write_path(directory, meeting_id)
+        data = json_codec.write_file(path, document)
+        self._layout.remove_flat(directory, meeting_id)
+        return path, data
+    
+    def _remove(self, directory: Path, meeting_id: str) -> bool:
+        removed = False
+        for path in set(self._layout.candidates(directory, meeting_id)):
+            try:
+                path.unlink()
+                removed = True
+            except FileNotFoundError:
+                pass
+        return removed
+    
+    def _publish(self, meeting_id: str, changes: Dict[str, Any]):
+        if self.on_meeting_update and changes:
+            self.on_meeting_update(meeting_id, changes)
+    
+    def _write_transcript(self, meeting_id: str, transcript: Dict[str, Any]) -> Path:
+        transcript_file, _ = self._write(self.transcripts_dir, meeting_id, transcript)
+        return transcript_file
+    
+    def _apply_journal(self, summary: Dict[str, Any], records: List[Dict[str, Any]]):
+        applied = summary.get('journal_seq', 0)
+        items = {item.get('id'): item for item in summary.get('action_items', [])}
+        
+        for record in records:
+            if record['seq'] <= applied:
+                continue
+            if record['op'] == 'action_item' and record['id'] in items:
+                items[record['id']].update(record['changes'])
+                items[record['id']]['version'] = record['version']
+                summary['version'] = max(summary.get('version', 0), record['version'])
+            applied = record['seq']
+        
+        summary['journal_seq'] = applied
+    
+    def _apply_versions(self, document: Dict[str, Any], previous: Dict[str, Any],
+                        items_key: str, id_key: str, tombstones_key: str, changed: bool = False):
+        """
+        Stamp `document` with the next version. Items unchanged since
+        `previous` keep their version, changed or new items get the new one,
+        and items that disappeared are recorded as tombstones. A save that
+        changes nothing keeps the current version.
+        """
+        current = previous.get('version', 0)
+        version = current + 1
+        old_items = {item.get(id_key): item for item in previous.get(items_key, [])}
+        new_ids = set()
+        
+        for item in document[items_key]:
+            new_ids.add(item[id_key])
+            old = old_items.get(item[id_key])
+            if old is not None and _without_version(old) == _without_version(item):
+                item['version'] = old.get('version', current)
+            else:
+                item['version'] = version
+                changed = True
+        
+        tombstones = [t for t in previous.get(tombstones_key, []) if t['id'] not in new_ids]
+        for item_id in old_items:
+            if item_id not in new_ids:
+                tombstones.append({'id': item_id, 'version': version})
+                changed = True
+        
+        tombstones_from = previous.get('tombstones_from', 0)
+        if len(tombstones) > MAX_TOMBSTONES:
+            tombstones_from = tombstones[-MAX_TOMBSTONES - 1]['version']
+            tombstones = tombstones[-MAX_TOMBSTONES:]
+        
+        document['version'] = version if changed or not previous else current
+        document[tombstones_key] = tombstones
+        document['tombstones_from'] = tombstones_from
+    
+    def _changes_since(self, document: Dict[str, Any], since: int,
+                       items_key: str, id_key: str, tombstones_key: str) -> Dict[str, Any]:
+        version = document.get('version', 0)
+        # Too far behind (or ahead, after a reset) to rebuild from tombstones
+        full = since <= 0 or since < document.get('tombstones_from', 0) or since > version
+        
+        changes = {
+            'meeting_id': document.get('meeting_id'),
+            'version': version,
+            'since': 0 if full else since,
+            'full': full
+        }
+        if full:
+            changes[items_key] = document.get(items_key, [])
+            changes['deleted'] = []
+        else:
+            changes[items_key] = [item for item in document.get(items_key, []) if item.get('version', 0) > since]
+            changes['deleted'] = [t['id'] for t in document.get(tombstones_key, []) if t['version'] > since]
+        return changes
+    
     def _save_meeting(self, meeting_id: str, meeting: Dict[str, Any]):
-        meeting_file = self.meetings_dir / f'{meeting_id}.json'
-        with open(meeting_file, 'w', encoding='utf-8') as f:
-            json.dump(meeting, f, indent=2, ensure_ascii=False)
+        meeting_file, data = self._write(self.meetings_dir, meeting_id, meeting)
+        self._index.put(meeting_id, data, meeting_file.stat(), meeting, meeting_file)
+        self._index.mark_changed(meeting_id)
+        self._stats.meeting_saved(meeting_id, meeting)
@@ -0,0 +1,131 @@
+import hashlib
+import os
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+import json_codec
+
+
+LAYOUT_FILE = 'layout.json'
+
+
+class StorageLayout:
+    """
+    Where a meeting's files live under each storage directory.
+
+    With `depth` > 0 files are fanned out by a hash of the meeting id into
+    256 subdirectories per level, e.g. meetings/3f/<meeting_id>.json for
+    depth 1 or meetings/3f/a2/<meeting_id>.json for depth 2. Until the flat
+    files left over from the old layout have been migrated, lookups also
+    try the flat path; a marker file under data/ records that migration
+    is done.
+    """
+
+    def __init__(self, data_dir, depth: int = 1):
+        self.data_dir = Path(data_dir)
+        self.depth = depth
+        self._marker = self.data_dir / LAYOUT_FILE
+        self._made_dirs = set()
+
+        try:
+            marker = json_codec.read_file(self._marker)
+        except FileNotFoundError:
+            marker = None
+        if marker is not None and marker.get('shard_depth') != depth:
+            print(f"Storage was migrated to shard depth {marker.get('shard_depth')}, "
+                  f"not the configured {depth}; using {marker.get('shard_depth')}")
+            self.depth = marker.get('shard_depth')
+        # Flat files can only exist if migration has not finished
+        self.migrated = self.depth == 0 or marker is not None
+
+    def shard(self, meeting_id: str) -> List[str]:
+        digest = hashlib.sha1(meeting_id.encode('utf-8')).hexdigest()
+        return [digest[2 * level:2 * level + 2] for level in range(self.depth)]
+
+    def path(self, directory: Path, meeting_id: str) -> Path:
+        return directory.joinpath(*self.shard(meeting_id), f'{meeting_id}.json')
+
+    def write_path(self, directory: Path, meeting_id: str) -> Path:
+        path = self.path(directory, meeting_id)
+        if self.depth and path.parent not in self._made_dirs:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._made_dirs.add(path.parent)
+        return path
+
+    def candidates(self, directory: Path, meeting_id: str) -> List[Path]:
+        """
+        Paths to try, in order, when reading. The sharded path is tried
+        again last: a migration may rename the file between the first two
+        attempts.
+        """
+        sharded = self.path(directory, meeting_id)
+        if self.migrated:
+            return [sharded]
+        return [sharded, directory / f'{meeting_id}.json', sharded]
+
+    def remove_flat(self, directory: Path, meeting_id: str):
+        """Drop a stale flat copy after writing the sharded file."""
+        if self.migrated:
+            return
+        try:
+            (directory / f'{meeting_id}.json').unlink()
+        except FileNotFoundError:
+            pass
+
+    def flat_files(self, directory: Path) -> Iterator[Tuple[str, os.DirEntry]]:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.endswith('.json') and entry.is_file():
+                    yield entry.name[:-5], entry
+
+    def iter_files(self, directory: Path) -> Iterator[Tuple[str, os.DirEntry]]:
+        """Every meeting file under `directory`, sharded and flat."""
+        if not self.migrated or self.depth == 0:
+            yield from self.flat_files(directory)
+        if self.depth:
+            yield from self._walk(directory, self.depth)
+
+    def _walk(self, directory, levels: int) -> Iterator[Tuple[str, os.DirEntry]]:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if levels > 0:
+                    if entry.is_dir() and len(entry.name) == 2:
+                        yield from self._walk(entry.path, levels - 1)
+                elif entry.name.endswith('.json'):
+                    yield entry.name[:-5], entry
+
+    def mark_migrated(self):
+        json_codec.write_file(self._marker, {'shard_depth': self.depth})
+        self.migrated = True
+
+
+class LayoutMigrator:
+    """
+    Background task that moves flat files into the sharded layout, a batch
+    at a time, and stops once none are left.
+    """
+
+    def __init__(self, socketio, storage, batch: int = 500, pause: float = 0.05):
+        self.socketio = socketio
+        self.storage = storage
+        self.batch = batch
+        self.pause = pause
+        self._task = None
+
+    def start(self):
+        if self._task is None and not self.storage.layout_migrated():
+            self._task = self.socketio.start_background_task(self._run)
+
+    def _run(self):
+        total = 0
+        while True:
+            try:
+                moved = self.storage.migrate_layout(self.batch)
+            except Exception as e:
+                print(f"Storage layout migration failed: {str(e)}")
+                return
+            if not moved:
+                break
+            total += moved
+            self.socketio.sleep(self.pause)
+        print(f"Storage layout migration done, {total} files moved")
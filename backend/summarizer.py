@@ -1,33 +1,171 @@
+import contextvars
 import os
 import json
+import time
 import uuid
-from typing import Dict, List, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Any, Optional
 import requests
 from datetime import datetime
 
+from incremental_json import IncrementalJSONParser
+from metrics import stage_timer, track_stage
+from tracing import tracer
+
+
+PROVIDERS = {
+    'openai': {
+        'name': 'OpenAI',
+        'url': 'https://api.openai.com/v1/chat/completions',
+        'model': 'gpt-3.5-turbo'
+    },
+    'deepseek': {
+        'name': 'DeepSeek',
+        'url': 'https://api.deepseek.com/v1/chat/completions',
+        'model': 'deepseek-chat'
+    }
+}
+SYSTEM_PROMPT = 'You are an expert meeting assistant that generates structured summaries.'
+# Transcript characters sent with each summary prompt
+TRANSCRIPT_MAX_CHARS = 10000
+# What each request reports while streaming: (text paths, item paths)
+_OVERVIEW_TEXT = {('overview', 'text'): 'overview', ('overview',): 'overview'}
+STREAM_PATHS = {
+    'combined': (_OVERVIEW_TEXT, {('action_items',): 'action_item', ('outline',): 'outline'}),
+    'overview': (_OVERVIEW_TEXT, {}),
+    'action_items': ({}, {(): 'action_item'}),
+    'outline': ({}, {(): 'outline'})
+}
+
 
 class MeetingSummarizer:
-    def __init__(self, service='openai', api_key=None):
+    def __init__(self, service='openai', api_key=None, combine_max_chars: int = 4000):
         self.service = service
         self.api_key = api_key
+        # Up to this transcript length all tasks share one request; the
+        # output is short enough that splitting would only repeat the input
+        self.combine_max_chars = combine_max_chars
         
         if not self.api_key:
             raise ValueError(f"API key required for {service}")
+        if service not in PROVIDERS:
+            raise ValueError(f"Unsupported service: {service}")
+        
+        # Keep-alive connections, shared by the concurrent task requests
+        self._session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=4)
+        self._session.mount('https://', adapter)
     
+    @track_stage('summarize_structured')
     def generate_structured_summary(
         self,
         transcript_segments: List[Dict[str, Any]],
         meeting_title: str = "Meeting",
-        template: str = "general"
+        template: str = "general",
+        on_event: Optional[Callable[[str, Any], None]] = None
     ) -> Dict[str, Any]:
-        full_text = self._segments_to_text(transcript_segments)
+        """
+        Overview, keywords, sentiment, action items and outline for a
+        transcript. Short transcripts get one combined request. Longer ones
+        get one request per task, run concurrently, so the whole summary
+        takes about as long as the slowest task. Per-task latency is
+        returned under 'generation'.
+        
+        With `on_event` the completions are streamed: it is called with
+        ('overview', text delta), ('action_item', item) and ('outline',
+        entry) as each part arrives, possibly from several threads.
+        """
+        full_text = self._segments_to_text(transcript_segments)[:TRANSCRIPT_MAX_CHARS]
+        tracer.set_attributes(
+            provider=self.service,
+            template=template,
+            segment_count=len(transcript_segments),
+            input_chars=len(full_text)
+        )
         
-        if self.service == 'openai':
-            return self._generate_with_openai(full_text, meeting_title, template)
-        elif self.service == 'deepseek':
-            return self._generate_with_deepseek(full_text, meeting_title, template)
+        started = time.perf_counter()
+        first_content = []
+        if on_event:
+            report = on_event
+            
+            def on_event(name, value):
+                if not first_content:
+                    first_content.append(round(time.perf_counter() - started, 3))
+                report(name, value)
+        
+        if len(full_text) <= self.combine_max_chars:
+            timings = {}
+            content = self._timed(
+                timings, 'combined', self._chat, self._build_prompt(full_text, meeting_title, template),
+                SYSTEM_PROMPT, 0.3, 2000, 60, self._stream_parser('combined', on_event)
+            )
+            summary = self._parse_llm_response(content)
+            mode = 'combined'
         else:
-            raise ValueError(f"Unsupported service: {self.service}")
+            summary, timings = self._generate_concurrently(full_text, meeting_title, template, on_event)
+            mode = 'concurrent'
+        
+        summary['generation'] = {
+            'mode': mode,
+            'service': self.service,
+            'seconds': round(time.perf_counter() - started, 3),
+            'tasks': timings
+        }
+        if first_content:
+            summary['generation']['first_content_seconds'] = first_content[0]
+        tracer.set_attributes(summary_mode=mode, **{f'{task}_seconds': seconds for task, seconds in timings.items()})
+        return summary
+    
+    def _generate_concurrently(
+        self,
+        full_text: str,
+        meeting_title: str,
+        template: str,
+        on_event: Optional[Callable[[str, Any], None]] = None
+    ):
+        timings = {}
+        prompts = {
+            'overview': (self._build_overview_prompt(full_text, meeting_title, template), 1000),
+            'action_items': (self._action_items_prompt(full_text), 1000),
+            'outline': (self._outline_prompt(full_text), 1000)
+        }
+        
+        with ThreadPoolExecutor(max_workers=len(prompts)) as executor:
+            # Each task runs in a copy of this context, so its span nests
+            # under the request's summarize span
+            futures = {
+                task: executor.submit(
+                    contextvars.copy_context().run,
+                    self._timed, timings, task, self._chat, prompt, SYSTEM_PROMPT, 0.3, max_tokens, 60,
+                    self._stream_parser(task, on_event)
+                )
+                for task, (prompt, max_tokens) in prompts.items()
+            }
+            # The overview is required; a failed list leaves it empty
+            summary = self._parse_llm_response(futures['overview'].result())
+            for task in ('action_items', 'outline'):
+                try:
+                    summary[task] = self._parse_json_array(futures[task].result())
+                except Exception as e:
+                    print(f"Summary task {task} failed: {str(e)}")
+                    summary[task] = []
+        
+        summary['action_items'] = self._normalize_action_items(summary['action_items'])
+        return summary, timings
+    
+    def _stream_parser(self, task: str, on_event) -> Optional[Callable[[str], None]]:
+        if on_event is None:
+            return None
+        text_paths, item_paths = STREAM_PATHS[task]
+        return IncrementalJSONParser(on_event, text_paths=text_paths, item_paths=item_paths).feed
+    
+    def _timed(self, timings: Dict[str, float], task: str, func, *args):
+        started = time.perf_counter()
+        try:
+            with stage_timer(f'llm_{task}'):
+                return func(*args)
+        finally:
+            timings[task] = round(time.perf_counter() - started, 3)
     
     def _segments_to_text(self, segments: List[Dict[str, Any]]) -> str:
         lines = []
@@ -44,91 +182,73 @@ class MeetingSummarizer:
         
         return "\n".join(lines)
     
-    def _generate_with_openai(
+    def _chat(
         self,
-        full_text: str,
-        meeting_title: str,
-        template: str
-    ) -> Dict[str, Any]:
-        prompt = self._build_prompt(full_text, meeting_title, template)
+        prompt: str,
+        system: Optional[str] = SYSTEM_PROMPT,
+        temperature: float = 0.3,
+        max_tokens: int = 2000,
+        timeout: float = 60,
+        on_delta: Optional[Callable[[str], None]] = None
+    ) -> str:
+        """
+        One chat completion from the configured provider; returns the
+        message text. With `on_delta` the completion is streamed and each
+        piece of text is passed to it as it arrives.
+        """
+        provider = PROVIDERS[self.service]
+        messages = [{'role': 'system', 'content': system}] if system else []
+        messages.append({'role': 'user', 'content': prompt})
+        body = {
+            'model': provider['model'],
+            'messages': messages,
+            'temperature': temperature,
+            'max_tokens': max_tokens
+        }
+        if on_delta:
+            body['stream'] = True
         
         try:
-            response = requests.post(
-                'https://api.openai.com/v1/chat/completions',
+            response = self._session.post(
+                provider['url'],
                 headers={
                     'Authorization': f'Bearer {self.api_key}',
                     'Content-Type': 'application/json'
                 },
-                json={
-                    'model': 'gpt-3.5-turbo',
-                    'messages': [
-                        {
-                            'role': 'system',
-                            'content': 'You are an expert meeting assistant that generates structured summaries.'
-                        },
-                        {
-                            'role': 'user',
-                            'content': prompt
-                        }
-                    ],
-                    'temperature': 0.3,
-                    'max_tokens': 2000
-                },
-                timeout=60
+                json=body,
+                timeout=timeout,
+                stream=bool(on_delta)
             )
             
             response.raise_for_status()
-            result = response.json()
-            
-            content = result['choices'][0]['message']['content']
+            if on_delta:
+                return self._read_stream(response, on_delta)
             
-            return self._parse_llm_response(content)
-        
-        except Exception as e:
-            raise Exception(f"OpenAI API error: {str(e)}")
-    
-    def _generate_with_deepseek(
-        self,
-        full_text: str,
-        meeting_title: str,
-        template: str
-    ) -> Dict[str, Any]:
-        prompt = self._build_prompt(full_text, meeting_title, template)
-        
-        try:
-            response = requests.post(
-                'https://api.deepseek.com/v1/chat/completions',
-                headers={
-                    'Authorization': f'Bearer {self.api_key}',
-                    'Content-Type': 'application/json'
-                },
-                json={
-                    'model': 'deepseek-chat',
-                    'messages': [
-                        {
-                            'role': 'system',
-                            'content': 'You are an expert meeting assistant that generates structured summaries.'
-                        },
-                        {
-                            'role': 'user',
-                            'content': prompt
-                        }
-                    ],
-                    'temperature': 0.3,
-                    'max_tokens': 2000
-                },
-                timeout=60
-            )
-            
-            response.raise_for_status()
             result = response.json()
             
-            content = result['choices'][0]['message']['content']
-            
-            return self._parse_llm_response(content)
+            return result['choices'][0]['message']['content']
         
         except Exception as e:
-            raise Exception(f"DeepSeek API error: {str(e)}")
+            raise Exception(f"{provider['name']} API error: {str(e)}")
+    
+    def _read_stream(self, response, on_delta: Callable[[str], None]) -> str:
+        # Server-sent events: one `data: {chunk}` line per delta, then `data: [DONE]`
+        parts = []
+        # event-stream responses often carry no charset
+        response.encoding = 'utf-8'
+        with response:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith('data:'):
+                    continue
+                data = line[5:].strip()
+                if data == '[DONE]':
+                    break
+                choices = json.loads(data).get('choices') or [{}]
+                delta = (choices[0].get('delta') or {}).get('content')
+                if delta:
+                    parts.append(delta)
+                    on_delta(delta)
+        return ''.join(parts)
     
     def _build_prompt(self, full_text: str, meeting_title: str, template: str) -> str:
         template_instructions = self._get_template_instructions(template)
@@ -177,6 +297,71 @@ IMPORTANT:
 - Ensure the overview is comprehensive but concise
 - Return ONLY valid JSON, no additional text"""
     
+    def _build_overview_prompt(self, full_text: str, meeting_title: str, template: str) -> str:
+        template_instructions = self._get_template_instructions(template)
+        
+        return f"""Analyze the following meeting transcript and summarize it in JSON format.
+
+Meeting Title: {meeting_title}
+
+{template_instructions}
+
+Transcript:
+{full_text}
+
+Please provide a JSON response with the following structure:
+{{
+  "overview": {{
+    "text": "A concise 2-3 paragraph summary of the meeting covering key points, decisions, and outcomes.",
+    "word_count": <number>
+  }},
+  "keywords": ["keyword1", "keyword2", "keyword3"],
+  "sentiment": "positive | neutral | negative"
+}}
+
+Return ONLY valid JSON, no additional text."""
+    
+    def _action_items_prompt(self, text: str) -> str:
+        return f"""Extract all action items from the following text. An action item is a task, commitment, or to-do mentioned in the conversation.
+
+Text:
+{text}
+
+Return a JSON array of action items with this structure:
+[
+  {{
+    "text": "Action item description",
+    "assignee": "Person's name or 'Unassigned'",
+    "deadline": "Deadline if mentioned or 'No deadline specified'"
+  }}
+]
+
+Return ONLY the JSON array, no additional text."""
+    
+    def _outline_prompt(self, full_text: str) -> str:
+        return f"""Analyze this meeting transcript and create a structured outline of the main topics discussed.
+
+Transcript:
+{full_text}
+
+Identify 3-7 main topics/themes discussed in the meeting. For each topic, provide:
+- The topic name
+- Approximate timestamp when it was discussed (in seconds from start)
+- Duration (in seconds)
+- 2-4 key subtopics or points under that topic
+
+Return a JSON array with this structure:
+[
+  {{
+    "topic": "Topic name",
+    "timestamp": <seconds>,
+    "duration": <seconds>,
+    "subtopics": ["Subtopic 1", "Subtopic 2"]
+  }}
+]
+
+Return ONLY the JSON array, no additional text."""
+    
     def _get_template_instructions(self, template: str) -> str:
         templates = {
             'general': 'Focus on key discussion points, decisions made, and next steps.',
@@ -189,26 +374,39 @@ IMPORTANT:
         
         return templates.get(template, templates['general'])
     
+    def _strip_fences(self, content: str) -> str:
+        content = content.strip()
+        
+        if content.startswith('```json'):
+            content = content[7:]
+        if content.startswith('```'):
+            content = content[3:]
+        if content.endswith('```'):
+            content = content[:-3]
+        
+        return content.strip()
+    
+    def _parse_json_array(self, content: str) -> List[Dict[str, Any]]:
+        parsed = json.loads(self._strip_fences(content))
+        if not isinstance(parsed, list):
+            raise ValueError('expected a JSON array')
+        return parsed
+    
+    def _normalize_action_items(self, action_items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        for action_item in action_items:
+            if 'id' not in action_item:
+                action_item['id'] = str(uuid.uuid4())
+            if 'completed' not in action_item:
+                action_item['completed'] = False
+        return action_items
+    
     def _parse_llm_response(self, content: str) -> Dict[str, Any]:
         try:
-            content = content.strip()
-            
-            if content.startswith('```json'):
-                content = content[7:]
-            if content.startswith('```'):
-                content = content[3:]
-            if content.endswith('```'):
-                content = content[:-3]
-            
-            content = content.strip()
+            content = self._strip_fences(content)
             
             parsed = json.loads(content)
             
-            for action_item in parsed.get('action_items', []):
-                if 'id' not in action_item:
-                    action_item['id'] = str(uuid.uuid4())
-                if 'completed' not in action_item:
-                    action_item['completed'] = False
+            self._normalize_action_items(parsed.get('action_items', []))
             
             if 'overview' in parsed and isinstance(parsed['overview'], str):
                 text = parsed['overview']
@@ -247,156 +445,27 @@ IMPORTANT:
             'template': 'general'
         }
     
+    @track_stage('extract_action_items')
     def extract_action_items(self, text: str) -> List[Dict[str, Any]]:
-        prompt = f"""Extract all action items from the following text. An action item is a task, commitment, or to-do mentioned in the conversation.
-
-Text:
-{text[:5000]}
-
-Return a JSON array of action items with this structure:
-[
-  {{
-    "text": "Action item description",
-    "assignee": "Person's name or 'Unassigned'",
-    "deadline": "Deadline if mentioned or 'No deadline specified'"
-  }}
-]
-
-Return ONLY the JSON array, no additional text."""
-        
         try:
-            if self.service == 'openai':
-                response = requests.post(
-                    'https://api.openai.com/v1/chat/completions',
-                    headers={
-                        'Authorization': f'Bearer {self.api_key}',
-                        'Content-Type': 'application/json'
-                    },
-                    json={
-                        'model': 'gpt-3.5-turbo',
-                        'messages': [{'role': 'user', 'content': prompt}],
-                        'temperature': 0.2,
-                        'max_tokens': 1000
-                    },
-                    timeout=30
-                )
-            elif self.service == 'deepseek':
-                response = requests.post(
-                    'https://api.deepseek.com/v1/chat/completions',
-                    headers={
-                        'Authorization': f'Bearer {self.api_key}',
-                        'Content-Type': 'application/json'
-                    },
-                    json={
-                        'model': 'deepseek-chat',
-                        'messages': [{'role': 'user', 'content': prompt}],
-                        'temperature': 0.2,
-                        'max_tokens': 1000
-                    },
-                    timeout=30
-                )
-            
-            response.raise_for_status()
-            result = response.json()
-            content = result['choices'][0]['message']['content'].strip()
-            
-            if content.startswith('```json'):
-                content = content[7:]
-            if content.startswith('```'):
-                content = content[3:]
-            if content.endswith('```'):
-                content = content[:-3]
-            content = content.strip()
-            
-            action_items = json.loads(content)
-            
-            for item in action_items:
-                if 'id' not in item:
-                    item['id'] = str(uuid.uuid4())
-                if 'completed' not in item:
-                    item['completed'] = False
-            
-            return action_items
+            content = self._chat(self._action_items_prompt(text[:5000]), system=None, temperature=0.2,
+                                 max_tokens=1000, timeout=30)
+            return self._normalize_action_items(self._parse_json_array(content))
         
         except Exception as e:
             return []
     
+    @track_stage('generate_outline')
     def generate_outline(
         self,
         transcript_segments: List[Dict[str, Any]]
     ) -> List[Dict[str, Any]]:
         full_text = self._segments_to_text(transcript_segments)
         
-        prompt = f"""Analyze this meeting transcript and create a structured outline of the main topics discussed.
-
-Transcript:
-{full_text[:8000]}
-
-Identify 3-7 main topics/themes discussed in the meeting. For each topic, provide:
-- The topic name
-- Approximate timestamp when it was discussed (in seconds from start)
-- Duration (in seconds)
-- 2-4 key subtopics or points under that topic
-
-Return a JSON array with this structure:
-[
-  {{
-    "topic": "Topic name",
-    "timestamp": <seconds>,
-    "duration": <seconds>,
-    "subtopics": ["Subtopic 1", "Subtopic 2"]
-  }}
-]
-
-Return ONLY the JSON array, no additional text."""
-        
         try:
-            if self.service == 'openai':
-                response = requests.post(
-                    'https://api.openai.com/v1/chat/completions',
-                    headers={
-                        'Authorization': f'Bearer {self.api_key}',
-                        'Content-Type': 'application/json'
-                    },
-                    json={
-                        'model': 'gpt-3.5-turbo',
-                        'messages': [{'role': 'user', 'content': prompt}],
-                        'temperature': 0.3,
-                        'max_tokens': 1000
-                    },
-                    timeout=30
-                )
-            elif self.service == 'deepseek':
-                response = requests.post(
-                    'https://api.deepseek.com/v1/chat/completions',
-                    headers={
-                        'Authorization': f'Bearer {self.api_key}',
-                        'Content-Type': 'application/json'
-                    },
-                    json={
-                        'model': 'deepseek-chat',
-                        'messages': [{'role': 'user', 'content': prompt}],
-                        'temperature': 0.3,
-                        'max_tokens': 1000
-                    },
-                    timeout=30
-                )
-            
-            response.raise_for_status()
-            result = response.json()
-            content = result['choices'][0]['message']['content'].strip()
-            
-            if content.startswith('```json'):
-                content = content[7:]
-            if content.startswith('```'):
-                content = content[3:]
-            if content.endswith('```'):
-                content = content[:-3]
-            content = content.strip()
-            
-            outline = json.loads(content)
-            
-            return outline
+            content = self._chat(self._outline_prompt(full_text[:8000]), system=None, temperature=0.3,
+                                 max_tokens=1000, timeout=30)
+            return self._parse_json_array(content)
         
         except Exception as e:
             return []
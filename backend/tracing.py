@@ -0,0 +1,387 @@
+"""
+Lightweight tracing for the meeting pipeline.
+
+Spans nest through a context variable, so a span opened inside a request
+or inside another span becomes its child. Every span tied to a meeting
+gets a trace id derived from the meeting id, which puts the upload,
+transcription and summary requests, and the background work they start,
+into one trace that renders as a single waterfall:
+
+    python tracing.py <meeting_id>
+
+Finished spans are handed to an exporter on a background thread: JSON
+lines under data/traces, rotated by size, or OTLP/HTTP for a collector.
+Tracing is off unless an exporter is configured. A fraction of traces
+can be kept with `sample_rate`; the decision is made once per trace,
+by meeting id when the trace starts with one.
+"""
+import argparse
+import contextvars
+import hashlib
+import json
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+import requests
+
+
+def _random_id(bits: int) -> str:
+    # Not cryptographic; ids only need to be unique, and os.urandom per
+    # span would be the single largest cost of tracing
+    return f'{random.getrandbits(bits):0{bits // 4}x}'
+
+
+def meeting_trace_id(meeting_id: str) -> str:
+    return hashlib.md5(f'meeting:{meeting_id}'.encode()).hexdigest()
+
+
+class Span:
+    __slots__ = ('name', 'span_id', 'parent', 'root', 'trace_id', 'start_time', '_started',
+                 'duration', 'attributes', 'error', 'sampled', '_finished', '_token')
+
+    def __init__(self, name: str, parent: Optional['Span'] = None, trace_id: Optional[str] = None):
+        self.name = name
+        self.span_id = _random_id(64)
+        self.parent = parent
+        self.root = parent.root if parent else self
+        self.trace_id = trace_id or (None if parent else _random_id(128))
+        self.start_time = time.time()
+        self._started = time.perf_counter()
+        self.duration = None
+        self.attributes: Dict[str, Any] = {}
+        self.error = None
+        self.sampled = parent.sampled if parent else True
+        # Children finished before the root; exported together with it so
+        # a late set_meeting() still reaches every span of the request
+        self._finished: List['Span'] = []
+        self._token = None
+
+    def set_attributes(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'trace_id': self.root.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent.span_id if self.parent else None,
+            'name': self.name,
+            'start_time': self.start_time,
+            'duration': self.duration,
+            'attributes': self.attributes,
+            'error': self.error
+        }
+
+
+class JsonLinesExporter:
+    """
+    Appends spans to `path`. Once the file passes `max_bytes` it is moved
+    to `path`.1, shifting older files up to `path`.<backups>, which is
+    dropped.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 50 * 1024 * 1024, backups: int = 3):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.backups = backups
+
+    def export(self, spans: List[Dict[str, Any]]):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for span in spans:
+                f.write(json.dumps(span, ensure_ascii=False) + '\n')
+            size = f.tell()
+        if self.max_bytes and size >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        try:
+            for index in range(self.backups - 1, 0, -1):
+                source = rotated_path(self.path, index)
+                if source.exists():
+                    os.replace(source, rotated_path(self.path, index + 1))
+            if self.backups > 0:
+                os.replace(self.path, rotated_path(self.path, 1))
+            else:
+                os.remove(self.path)
+        except FileNotFoundError:
+            # Another worker rotated the same file first
+            pass
+
+
+def rotated_path(path: Path, index: int) -> Path:
+    return path.with_name(f'{path.name}.{index}')
+
+
+class OTLPExporter:
+    """Posts spans to an OTLP/HTTP collector using the JSON encoding."""
+
+    def __init__(self, endpoint: str, service_name: str = 'meritel-backend', timeout: float = 5.0):
+        self.url = endpoint.rstrip('/') + '/v1/traces'
+        self.service_name = service_name
+        self.timeout = timeout
+
+    def export(self, spans: List[Dict[str, Any]]):
+        payload = {
+            'resourceSpans': [{
+                'resource': {'attributes': [_otlp_attribute('service.name', self.service_name)]},
+                'scopeSpans': [{
+                    'scope': {'name': 'meritel.tracing'},
+                    'spans': [self._convert(span) for span in spans]
+                }]
+            }]
+        }
+        requests.post(self.url, json=payload, timeout=self.timeout).raise_for_status()
+
+    def _convert(self, span: Dict[str, Any]) -> Dict[str, Any]:
+        start_ns = int(span['start_time'] * 1e9)
+        converted = {
+            'traceId': span['trace_id'],
+            'spanId': span['span_id'],
+            'name': span['name'],
+            'kind': 1,
+            'startTimeUnixNano': str(start_ns),
+            'endTimeUnixNano': str(start_ns + int(span['duration'] * 1e9)),
+            'attributes': [_otlp_attribute(k, v) for k, v in span['attributes'].items()],
+            'status': {'code': 2, 'message': span['error']} if span['error'] else {'code': 1}
+        }
+        if span['parent_id']:
+            converted['parentSpanId'] = span['parent_id']
+        return converted
+
+
+def _otlp_attribute(key: str, value) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {'key': key, 'value': {'boolValue': value}}
+    if isinstance(value, int):
+        return {'key': key, 'value': {'intValue': str(value)}}
+    if isinstance(value, float):
+        return {'key': key, 'value': {'doubleValue': value}}
+    return {'key': key, 'value': {'stringValue': str(value)}}
+
+
+class Tracer:
+    def __init__(self, exporter=None, enabled: bool = True, sample_rate: float = 1.0,
+                 batch_size: int = 256, flush_interval: float = 1.0):
+        self.exporter = exporter
+        self.enabled = enabled and exporter is not None
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._current: contextvars.ContextVar = contextvars.ContextVar('meritel_span', default=None)
+        self._queue: queue.Queue = queue.Queue(maxsize=10000)
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+
+    def current_span(self) -> Optional[Span]:
+        return self._current.get()
+
+    def start_span(self, name: str, meeting_id: Optional[str] = None, root: bool = True,
+                   **attributes) -> Optional[Span]:
+        """
+        Open a span as a child of the current one. With `root` False no
+        span is opened outside a trace, for calls that are only worth
+        tracing as part of a request or a traced task.
+        """
+        if not self.enabled:
+            return None
+
+        parent = self._current.get()
+        if parent is None and not root:
+            return None
+        span = Span(name, parent, meeting_trace_id(meeting_id) if meeting_id and not parent else None)
+        if parent is None and self.sample_rate < 1.0:
+            # Keep or drop all of a meeting's traces together
+            if meeting_id:
+                span.sampled = int(span.trace_id[:8], 16) < self.sample_rate * 0x100000000
+            else:
+                span.sampled = random.random() < self.sample_rate
+        if meeting_id:
+            attributes['meeting_id'] = meeting_id
+            if parent:
+                self._bind_meeting(span.root, meeting_id)
+        span.attributes.update(attributes)
+        span._token = self._current.set(span)
+        return span
+
+    def end_span(self, span: Optional[Span], error: Optional[BaseException] = None):
+        if span is None:
+            return
+
+        span.duration = time.perf_counter() - span._started
+        if error is not None:
+            span.error = f'{type(error).__name__}: {error}'
+        self._current.reset(span._token)
+
+        if span.root is not span:
+            span.root._finished.append(span)
+            return
+
+        if not span.sampled:
+            span._finished = []
+            return
+        spans = [s.to_dict() for s in span._finished]
+        spans.append(span.to_dict())
+        span._finished = []
+        self._enqueue(spans)
+
+    @contextmanager
+    def span(self, name: str, meeting_id: Optional[str] = None, **attributes):
+        span = self.start_span(name, meeting_id, **attributes)
+        try:
+            yield span
+        except BaseException as e:
+            self.end_span(span, e)
+            raise
+        else:
+            self.end_span(span)
+
+    def set_attributes(self, **attributes):
+        span = self._current.get()
+        if span is not None:
+            span.set_attributes(**attributes)
+
+    def set_meeting(self, meeting_id: str):
+        """Attach the current trace to a meeting created partway through it."""
+        span = self._current.get()
+        if span is not None:
+            span.attributes.setdefault('meeting_id', meeting_id)
+            self._bind_meeting(span.root, meeting_id)
+
+    def _bind_meeting(self, root: Span, meeting_id: str):
+        root.trace_id = meeting_trace_id(meeting_id)
+        root.attributes.setdefault('meeting_id', meeting_id)
+
+    def _enqueue(self, spans: List[Dict[str, Any]]):
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            # Dropping spans is better than blocking the request
+            return
+
+        if self._worker is None:
+            with self._worker_lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._export_loop, daemon=True)
+                    self._worker.start()
+
+    def _export_loop(self):
+        while True:
+            batch = self._queue.get()
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    batch.extend(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                self.exporter.export(batch)
+            except Exception as e:
+                print(f"Trace export failed ({len(batch)} spans): {str(e)}")
+
+    def flush(self, timeout: float = 5.0):
+        deadline = time.monotonic() + timeout
+        while not self._queue.empty() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        # Let the worker finish the batch it already took off the queue
+        time.sleep(min(self.flush_interval + 0.1, max(0.0, deadline - time.monotonic())))
+
+
+def create_tracer() -> Tracer:
+    from config import (
+        TRACING_EXPORTER, TRACING_FILE, TRACING_FILE_MAX_BYTES, TRACING_FILE_BACKUPS,
+        TRACING_SAMPLE_RATE, OTLP_ENDPOINT
+    )
+
+    if TRACING_EXPORTER == 'otlp' and OTLP_ENDPOINT:
+        exporter = OTLPExporter(OTLP_ENDPOINT)
+    elif TRACING_EXPORTER == 'jsonl':
+        exporter = JsonLinesExporter(TRACING_FILE, max_bytes=TRACING_FILE_MAX_BYTES, backups=TRACING_FILE_BACKUPS)
+    else:
+        exporter = None
+    return Tracer(exporter, sample_rate=TRACING_SAMPLE_RATE)
+
+
+tracer = create_tracer()
+
+
+def load_trace(path: str, meeting_id: str) -> List[Dict[str, Any]]:
+    """A meeting's spans from `path` and its rotated files, oldest first."""
+    trace_id = meeting_trace_id(meeting_id)
+    path = Path(path)
+    files = []
+    index = 1
+    while rotated_path(path, index).exists():
+        files.insert(0, rotated_path(path, index))
+        index += 1
+    if path.exists():
+        files.append(path)
+
+    spans = []
+    for file_path in files:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if trace_id in line:
+                    span = json.loads(line)
+                    if span['trace_id'] == trace_id:
+                        spans.append(span)
+    return spans
+
+
+def render_waterfall(spans: List[Dict[str, Any]], width: int = 60) -> str:
+    if not spans:
+        return 'No spans found'
+
+    by_id = {span['span_id']: span for span in spans}
+    children: Dict[Optional[str], List[Dict[str, Any]]] = {}
+    for span in spans:
+        parent_id = span['parent_id'] if span['parent_id'] in by_id else None
+        children.setdefault(parent_id, []).append(span)
+    for siblings in children.values():
+        siblings.sort(key=lambda s: s['start_time'])
+
+    trace_start = min(span['start_time'] for span in spans)
+    trace_end = max(span['start_time'] + span['duration'] for span in spans)
+    scale = width / max(trace_end - trace_start, 1e-9)
+
+    lines = [f"{'span':<48} {'start':>9} {'duration':>10}  timeline"]
+
+    def walk(span, depth):
+        offset = span['start_time'] - trace_start
+        bar_start = int(offset * scale)
+        bar = ' ' * bar_start + '#' * max(1, int(span['duration'] * scale))
+        label = ('  ' * depth + span['name'])[:48]
+        marker = ' !' if span.get('error') else ''
+        lines.append(f"{label:<48} {offset:>8.3f}s {span['duration']:>9.3f}s  |{bar:<{width}}|{marker}")
+        for child in children.get(span['span_id'], []):
+            walk(child, depth + 1)
+
+    for root in children.get(None, []):
+        walk(root, 0)
+    return '\n'.join(lines)
+
+
+def main(argv=None) -> int:
+    from config import TRACING_FILE
+
+    parser = argparse.ArgumentParser(description="Render a meeting's pipeline trace as a waterfall")
+    parser.add_argument('meeting_id')
+    parser.add_argument('--file', default=TRACING_FILE)
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.file):
+        print(f"No trace file at {args.file}")
+        return 1
+
+    print(render_waterfall(load_trace(args.file, args.meeting_id)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,230 @@
+import os
+import subprocess
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+from tracing import tracer
+
+
+class WaveformStore:
+    """
+    Precomputed min/max peaks pyramid for meeting recordings.
+
+    Level 0 holds one min/max pair per `base_samples_per_peak` samples of
+    mono audio decoded at `sample_rate`; each following level halves the
+    resolution until fewer than `min_peaks` pairs remain.
+    """
+
+    def __init__(self, data_dir='data', sample_rate: int = 8000, base_samples_per_peak: int = 128,
+                 min_peaks: int = 512, bits: int = 8):
+        if bits not in (8, 16):
+            raise ValueError(f"Unsupported waveform bit depth: {bits}")
+
+        self.waveforms_dir = Path(data_dir) / 'waveforms'
+        self.waveforms_dir.mkdir(parents=True, exist_ok=True)
+        self.sample_rate = sample_rate
+        self.base_samples_per_peak = base_samples_per_peak
+        self.min_peaks = min_peaks
+        self.bits = bits
+        self._lock = threading.Lock()
+        self._pending: Dict[str, threading.Thread] = {}
+
+    def generate(self, meeting_id: str, audio_path: str) -> Dict[str, Any]:
+        if not os.path.exists(audio_path):
+            raise FileNotFoundError(f"Audio file not found: {audio_path}")
+
+        base_min, base_max, total_samples = self._decode_base_level(audio_path)
+
+        levels = {}
+        level_min, level_max = base_min, base_max
+        level = 0
+        while True:
+            levels[f'min_{level}'] = self._quantize(level_min)
+            levels[f'max_{level}'] = self._quantize(level_max)
+
+            if len(level_min) <= self.min_peaks:
+                break
+
+            # Pairwise fold; an odd trailing peak is kept as its own bucket
+            if len(level_min) % 2:
+                level_min = np.append(level_min, level_min[-1])
+                level_max = np.append(level_max, level_max[-1])
+            level_min = level_min.reshape(-1, 2).min(axis=1)
+            level_max = level_max.reshape(-1, 2).max(axis=1)
+            level += 1
+
+        meta = np.array([self.sample_rate, self.base_samples_per_peak, total_samples, self.bits, level + 1],
+                        dtype=np.int64)
+
+        waveform_file = self._waveform_file(meeting_id)
+        temp_file = waveform_file.with_suffix('.tmp.npz')
+        with open(temp_file, 'wb') as f:
+            np.savez(f, meta=meta, **levels)
+        os.replace(temp_file, waveform_file)
+
+        print(f"Waveform peaks generated for {meeting_id}: {level + 1} levels")
+        tracer.set_attributes(audio_duration=total_samples / self.sample_rate, levels=level + 1)
+        return self._describe(meta)
+
+    def generate_async(self, meeting_id: str, audio_path: str) -> threading.Thread:
+        with self._lock:
+            thread = self._pending.get(meeting_id)
+            if thread and thread.is_alive():
+                return thread
+
+            def run():
+                try:
+                    with tracer.span('waveform.generate', meeting_id=meeting_id):
+                        self.generate(meeting_id, audio_path)
+                except Exception as e:
+                    print(f"Waveform generation failed for {meeting_id}: {str(e)}")
+                finally:
+                    with self._lock:
+                        self._pending.pop(meeting_id, None)
+
+            thread = threading.Thread(target=run, daemon=True)
+            self._pending[meeting_id] = thread
+            thread.start()
+            return thread
+
+    def exists(self, meeting_id: str) -> bool:
+        return self._waveform_file(meeting_id).exists()
+
+    def delete(self, meeting_id: str) -> bool:
+        waveform_file = self._waveform_file(meeting_id)
+        if waveform_file.exists():
+            waveform_file.unlink()
+            return True
+        return False
+
+    def get_peaks(
+        self,
+        meeting_id: str,
+        start: float = 0.0,
+        end: Optional[float] = None,
+        width: Optional[int] = None,
+        level: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Return interleaved [min, max, ...] peaks covering `start`..`end` seconds.
+        Without an explicit `level`, picks the coarsest level that still gives
+        at least `width` peaks over the requested range.
+        """
+        waveform_file = self._waveform_file(meeting_id)
+        if not waveform_file.exists():
+            return None
+
+        with np.load(waveform_file) as npz:
+            meta = npz['meta']
+            info = self._describe(meta)
+
+            duration = info['duration']
+            start = max(0.0, min(float(start), duration))
+            end = duration if end is None else max(start, min(float(end), duration))
+
+            if level is None:
+                level = 0
+                if width:
+                    span = (end - start) * self.sample_rate
+                    while level + 1 < info['levels']:
+                        coarser_spp = info['base_samples_per_peak'] << (level + 1)
+                        if span / coarser_spp < width:
+                            break
+                        level += 1
+            level = max(0, min(int(level), info['levels'] - 1))
+
+            samples_per_peak = info['base_samples_per_peak'] << level
+            first = int(start * info['sample_rate'] // samples_per_peak)
+            last = int(np.ceil(end * info['sample_rate'] / samples_per_peak))
+
+            level_min = npz[f'min_{level}'][first:last]
+            level_max = npz[f'max_{level}'][first:last]
+
+        peaks = np.empty(len(level_min) * 2, dtype=level_min.dtype)
+        peaks[0::2] = level_min
+        peaks[1::2] = level_max
+
+        info.update({
+            'level': level,
+            'samples_per_peak': samples_per_peak,
+            'start': first * samples_per_peak / info['sample_rate'],
+            'end': min(last * samples_per_peak / info['sample_rate'], duration),
+            'length': len(level_min),
+            'data': peaks.tolist()
+        })
+        return info
+
+    def _decode_base_level(self, audio_path: str):
+        spp = self.base_samples_per_peak
+        # Read in whole peak blocks so every chunk folds without a remainder
+        chunk_bytes = spp * 2 * 4096
+
+        process = subprocess.Popen([
+            'ffmpeg', '-v', 'error',
+            '-i', audio_path,
+            '-ac', '1',
+            '-ar', str(self.sample_rate),
+            '-f', 's16le',
+            '-'
+        ], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+        mins = []
+        maxs = []
+        total_samples = 0
+        leftover = b''
+        try:
+            while True:
+                chunk = process.stdout.read(chunk_bytes)
+                if not chunk:
+                    break
+                chunk = leftover + chunk
+                usable = len(chunk) - len(chunk) % (spp * 2)
+                leftover = chunk[usable:]
+                if not usable:
+                    continue
+
+                samples = np.frombuffer(chunk[:usable], dtype='<i2').reshape(-1, spp)
+                mins.append(samples.min(axis=1))
+                maxs.append(samples.max(axis=1))
+                total_samples += samples.size
+
+            if len(leftover) >= 2:
+                tail = np.frombuffer(leftover[:len(leftover) - len(leftover) % 2], dtype='<i2')
+                mins.append(tail.min(keepdims=True))
+                maxs.append(tail.max(keepdims=True))
+                total_samples += tail.size
+
+            stderr = process.stderr.read()
+        finally:
+            process.stdout.close()
+            process.stderr.close()
+            returncode = process.wait()
+
+        if returncode != 0:
+            raise Exception(f"Waveform decoding failed: {stderr.decode(errors='replace')}")
+
+        if not mins:
+            return np.zeros(0, dtype=np.int16), np.zeros(0, dtype=np.int16), 0
+
+        return np.concatenate(mins), np.concatenate(maxs), total_samples
+
+    def _quantize(self, peaks: np.ndarray) -> np.ndarray:
+        if self.bits == 16:
+            return peaks.astype(np.int16)
+        return (peaks.astype(np.int16) >> 8).astype(np.int8)
+
+    def _describe(self, meta: np.ndarray) -> Dict[str, Any]:
+        sample_rate, base_spp, total_samples, bits, levels = (int(v) for v in meta)
+        return {
+            'sample_rate': sample_rate,
+            'base_samples_per_peak': base_spp,
+            'duration': total_samples / sample_rate if sample_rate else 0.0,
+            'bits': bits,
+            'levels': levels
+        }
+
+    def _waveform_file(self, meeting_id: str) -> Path:
+        return self.waveforms_dir / f'{meeting_id}.npz'
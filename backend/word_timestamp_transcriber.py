@@ -4,6 +4,9 @@ import requests
 from typing import Dict, Any, List, Optional
 from pathlib import Path
 
+from metrics import track_stage
+from tracing import tracer
+
 
 class WordTimestampTranscriber:
     def __init__(self, service='deepgram', api_key=None):
@@ -13,16 +16,26 @@ class WordTimestampTranscriber:
         if not self.api_key:
             raise ValueError(f"API key required for {service} transcription")
     
+    @track_stage('transcribe')
     def transcribe_with_timestamps(self, audio_path: str) -> Dict[str, Any]:
         if not os.path.exists(audio_path):
             raise FileNotFoundError(f"Audio file not found: {audio_path}")
         
+        tracer.set_attributes(provider=self.service, audio_bytes=os.path.getsize(audio_path))
+        
         if self.service == 'deepgram':
-            return self._transcribe_deepgram(audio_path)
+            result = self._transcribe_deepgram(audio_path)
         elif self.service == 'assemblyai':
-            return self._transcribe_assemblyai(audio_path)
+            result = self._transcribe_assemblyai(audio_path)
         else:
             raise ValueError(f"Unsupported transcription service: {self.service}")
+        
+        segments = result.get('segments', [])
+        tracer.set_attributes(
+            segment_count=len(segments),
+            audio_duration=segments[-1]['end_time'] if segments else 0.0
+        )
+        return result
     
     def _transcribe_deepgram(self, audio_path: str) -> Dict[str, Any]:
         url = "https://api.deepgram.com/v1/listen"
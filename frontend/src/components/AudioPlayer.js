@@ -1,9 +1,12 @@
-import React, { useRef, useEffect } from 'react';
+import React, { useRef, useEffect, useState } from 'react';
+import axios from 'axios';
 import { useAudioSync } from '../hooks/useAudioSync';
 import './AudioPlayer.css';
 
-const AudioPlayer = ({ audioUrl, onTimeUpdate }) => {
+const AudioPlayer = ({ audioUrl, waveformUrl, onTimeUpdate }) => {
   const audioRef = useRef(null);
+  const canvasRef = useRef(null);
+  const [waveform, setWaveform] = useState(null);
   const { currentTime, duration, isPlaying, seekTo } = useAudioSync(audioRef);
   
   useEffect(() => {
@@ -12,6 +15,39 @@ const AudioPlayer = ({ audioUrl, onTimeUpdate }) => {
     }
   }, [currentTime, onTimeUpdate]);
   
+  useEffect(() => {
+    if (!waveformUrl || !canvasRef.current) return;
+    
+    const width = canvasRef.current.clientWidth || 800;
+    axios.get(waveformUrl, { params: { width } })
+      .then(response => setWaveform(response.data.waveform))
+      .catch(err => console.log('No waveform available:', err.message));
+  }, [waveformUrl]);
+  
+  useEffect(() => {
+    const canvas = canvasRef.current;
+    if (!canvas || !waveform || !waveform.length) return;
+    
+    const width = canvas.clientWidth;
+    const height = canvas.clientHeight;
+    canvas.width = width;
+    canvas.height = height;
+    
+    const ctx = canvas.getContext('2d');
+    const scale = waveform.bits === 16 ? 32768 : 128;
+    const mid = height / 2;
+    const progressX = duration ? (currentTime / duration) * width : 0;
+    
+    ctx.clearRect(0, 0, width, height);
+    for (let x = 0; x < width; x++) {
+      const i = Math.floor((x / width) * waveform.length) * 2;
+      const min = waveform.data[i] / scale;
+      const max = waveform.data[i + 1] / scale;
+      ctx.fillStyle = x < progressX ? '#2196F3' : '#bbb';
+      ctx.fillRect(x, mid - max * mid, 1, Math.max(1, (max - min) * mid));
+    }
+  }, [waveform, currentTime, duration]);
+  
   const handlePlayPause = () => {
     if (isPlaying) {
       audioRef.current.pause();
@@ -39,7 +75,7 @@ const AudioPlayer = ({ audioUrl, onTimeUpdate }) => {
   
   return (
     <div className="audio-player">
-      <audio ref={audioRef} src={audioUrl} />
+      <audio ref={audioRef} src={audioUrl} preload="metadata" />
       
       <button className="play-pause-btn" onClick={handlePlayPause}>
         {isPlaying ? (
@@ -58,9 +94,10 @@ const AudioPlayer = ({ audioUrl, onTimeUpdate }) => {
       </div>
       
       <div className="progress-container">
+        {waveformUrl && <canvas ref={canvasRef} className="waveform-canvas" />}
         <input 
           type="range" 
-          className="progress-bar"
+          className={`progress-bar ${waveform ? 'over-waveform' : ''}`}
           min="0" 
           max={duration || 0} 
           value={currentTime}
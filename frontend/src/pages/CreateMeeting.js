@@ -1,6 +1,7 @@
 import React, { useState } from 'react';
 import axios from 'axios';
 import { useNavigate } from 'react-router-dom';
+import { uploadResumable } from '../utils/resumableUpload';
 import './CreateMeeting.css';
 
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:5000';
@@ -15,6 +16,7 @@ const CreateMeeting = () => {
   });
   const [uploadedFile, setUploadedFile] = useState(null);
   const [isLoading, setIsLoading] = useState(false);
+  const [uploadProgress, setUploadProgress] = useState(null);
   const [error, setError] = useState('');
 
   const handleInputChange = (e) => {
@@ -55,42 +57,36 @@ const CreateMeeting = () => {
     setError('');
 
     try {
-      const meetingResponse = await axios.post(`${API_BASE_URL}/api/meetings`, {
-        title: formData.title,
-        description: formData.description,
-        meeting_type: formData.meeting_type,
-        platform: formData.platform,
-        status: 'created'
-      });
-
-      const meeting = meetingResponse.data.meeting;
-      const meetingId = meeting.meeting_id;
+      let meeting;
 
       if (formData.platform === 'upload' && uploadedFile) {
-        const uploadFormData = new FormData();
-        uploadFormData.append('audio', uploadedFile);
-
-        await axios.post(
-          `${API_BASE_URL}/api/meetings/${meetingId}/upload`,
-          uploadFormData,
-          {
-            headers: {
-              'Content-Type': 'multipart/form-data'
-            },
-            onUploadProgress: (progressEvent) => {
-              const percentCompleted = Math.round((progressEvent.loaded * 100) / progressEvent.total);
-              console.log(`Upload progress: ${percentCompleted}%`);
-            }
-          }
-        );
+        // The server creates the meeting once every chunk has arrived
+        meeting = await uploadResumable(uploadedFile, {
+          title: formData.title,
+          description: formData.description,
+          meeting_type: formData.meeting_type,
+          platform: formData.platform
+        }, setUploadProgress);
+      } else {
+        const meetingResponse = await axios.post(`${API_BASE_URL}/api/meetings`, {
+          title: formData.title,
+          description: formData.description,
+          meeting_type: formData.meeting_type,
+          platform: formData.platform,
+          status: 'created'
+        });
+        meeting = meetingResponse.data.meeting;
       }
 
+      const meetingId = meeting.meeting_id;
+
       navigate(`/meetings/${meetingId}`);
     } catch (err) {
       console.error('Error creating meeting:', err);
       setError(err.response?.data?.error || 'Failed to create meeting');
     } finally {
       setIsLoading(false);
+      setUploadProgress(null);
     }
   };
 
@@ -214,7 +210,9 @@ const CreateMeeting = () => {
             className="submit-button"
             disabled={isLoading}
           >
-            {isLoading ? 'Creating...' : 'Create Meeting'}
+            {isLoading
+              ? (uploadProgress !== null ? `Uploading... ${uploadProgress}%` : 'Creating...')
+              : 'Create Meeting'}
           </button>
         </form>
       </div>
@@ -1,9 +1,20 @@
-import React from 'react';
+import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
+import axios from 'axios';
 import './HomePage.css';
 
+const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:5000';
+
 const HomePage = () => {
   const navigate = useNavigate();
+  const [stats, setStats] = useState(null);
+
+  useEffect(() => {
+    // Precomputed counters: one small response however many meetings exist
+    axios.get(`${API_BASE_URL}/api/stats`)
+      .then(response => setStats(response.data.stats))
+      .catch(err => console.error('Error loading stats:', err));
+  }, []);
 
   return (
     <div className="home-page">
@@ -61,6 +72,45 @@ const HomePage = () => {
         </div>
       </section>
 
+      {stats && stats.total_meetings > 0 && (
+        <section className="dashboard-stats">
+          <div className="stats-grid">
+            <div className="stat-card">
+              <span className="stat-value">{stats.total_meetings}</span>
+              <span className="stat-label">Meetings</span>
+            </div>
+            <div className="stat-card">
+              <span className="stat-value">{Math.round(stats.total_duration_seconds / 60)}</span>
+              <span className="stat-label">Minutes recorded</span>
+            </div>
+            <div className="stat-card">
+              <span className="stat-value">{stats.meetings_by_type.online || 0} / {stats.meetings_by_type.physical || 0}</span>
+              <span className="stat-label">Online / Physical</span>
+            </div>
+            <div className="stat-card">
+              <span className="stat-value">{stats.action_items.open}</span>
+              <span className="stat-label">Open action items</span>
+            </div>
+          </div>
+
+          <div className="recent-meetings">
+            <h3>Recent Activity</h3>
+            {stats.recent_meetings.map(meeting => (
+              <div
+                key={meeting.meeting_id}
+                className="recent-meeting"
+                onClick={() => navigate(`/meetings/${meeting.meeting_id}`)}
+              >
+                <span className="recent-title">{meeting.title || 'Untitled meeting'}</span>
+                <span className="recent-meta">
+                  {meeting.status} · {new Date(meeting.created_at).toLocaleDateString()}
+                </span>
+              </div>
+            ))}
+          </div>
+        </section>
+      )}
+
       <section className="features">
         <div className="features-grid">
           <div className="feature-card">
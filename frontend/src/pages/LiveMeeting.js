@@ -2,6 +2,7 @@ import React, { useState, useEffect, useRef } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import axios from 'axios';
 import io from 'socket.io-client';
+import { applyTranscriptChanges } from '../utils/transcriptSync';
 import './LiveMeeting.css';
 
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:5000';
@@ -11,23 +12,26 @@ const LiveMeeting = () => {
   const navigate = useNavigate();
   const socketRef = useRef(null);
   const transcriptEndRef = useRef(null);
+  const transcriptRef = useRef(null);
   
   const [meeting, setMeeting] = useState(null);
   const [botStatus, setBotStatus] = useState(null);
-  const [transcriptSegments, setTranscriptSegments] = useState([]);
-  const [interimTranscript, setInterimTranscript] = useState('');
+  const [transcript, setTranscript] = useState(null);
   const [isLoading, setIsLoading] = useState(true);
   const [error, setError] = useState('');
   const [isStopping, setIsStopping] = useState(false);
+  const [now, setNow] = useState(Date.now());
 
   useEffect(() => {
     loadMeetingData();
+    fetchBotStatus();
     connectWebSocket();
     
-    const statusInterval = setInterval(fetchBotStatus, 5000);
+    // Bot status is pushed over the socket; this only advances the clock
+    const clockInterval = setInterval(() => setNow(Date.now()), 1000);
     
     return () => {
-      clearInterval(statusInterval);
+      clearInterval(clockInterval);
       if (socketRef.current) {
         socketRef.current.disconnect();
       }
@@ -38,7 +42,7 @@ const LiveMeeting = () => {
     if (transcriptEndRef.current) {
       transcriptEndRef.current.scrollIntoView({ behavior: 'smooth' });
     }
-  }, [transcriptSegments, interimTranscript]);
+  }, [transcript]);
 
   const loadMeetingData = async () => {
     try {
@@ -55,27 +59,42 @@ const LiveMeeting = () => {
   const fetchBotStatus = async () => {
     try {
       const response = await axios.get(`${API_BASE_URL}/api/bots/${meetingId}/status`);
-      setBotStatus(response.data);
-      
-      if (response.data.status === 'inactive') {
-        navigate(`/meetings/${meetingId}`);
-      }
+      handleBotStatus(response.data);
     } catch (err) {
       console.error('Error fetching bot status:', err);
     }
   };
 
+  const handleBotStatus = (status) => {
+    setBotStatus(status);
+    
+    if (status.status === 'inactive') {
+      navigate(`/meetings/${meetingId}`);
+    }
+  };
+
   const connectWebSocket = () => {
-    socketRef.current = io(API_BASE_URL);
+    socketRef.current = io(API_BASE_URL, { transports: ['websocket'] });
     
     socketRef.current.on('connect', () => {
       console.log('WebSocket connected');
       socketRef.current.emit('join_meeting', { meeting_id: meetingId });
+      // Only segments newer than what is already shown are sent back
+      socketRef.current.emit('sync_meeting', {
+        meeting_id: meetingId,
+        transcript_version: transcriptRef.current?.version || 0
+      });
+    });
+    
+    socketRef.current.on('meeting_status', (data) => {
+      if (data.meeting_id === meetingId && data.bot) {
+        handleBotStatus(data.bot);
+      }
     });
     
-    socketRef.current.on('transcript_update', (data) => {
-      if (data.meeting_id === meetingId) {
-        handleTranscriptUpdate(data.transcript);
+    socketRef.current.on('transcript_changes', (changes) => {
+      if (changes.meeting_id === meetingId) {
+        handleTranscriptChanges(changes);
       }
     });
     
@@ -84,19 +103,28 @@ const LiveMeeting = () => {
     });
   };
 
-  const handleTranscriptUpdate = (transcript) => {
-    if (transcript.is_final) {
-      setTranscriptSegments(prev => [...prev, {
-        text: transcript.text,
-        words: transcript.words || [],
-        timestamp: new Date().toISOString()
-      }]);
-      setInterimTranscript('');
-    } else {
-      setInterimTranscript(transcript.text);
+  const handleTranscriptChanges = async (changes) => {
+    let merged = applyTranscriptChanges(transcriptRef.current, changes);
+    if (!merged) {
+      // Missed an update; fetch everything after the version we have
+      const response = await axios.get(`${API_BASE_URL}/api/meetings/${meetingId}/transcript`, {
+        params: { since: transcriptRef.current?.version || 0 }
+      });
+      merged = applyTranscriptChanges(transcriptRef.current, response.data.changes);
+    }
+    if (merged) {
+      transcriptRef.current = merged;
+      setTranscript(merged);
     }
   };
 
+  const transcriptSegments = transcript?.segments || [];
+
+  // started_at is UTC without a zone suffix
+  const botDuration = botStatus?.started_at
+    ? Math.max(0, (now - Date.parse(`${botStatus.started_at}Z`)) / 1000)
+    : botStatus?.duration || 0;
+
   const handleStopBot = async () => {
     if (!window.confirm('Stop recording? The bot will leave the meeting and processing will begin.')) {
       return;
@@ -145,9 +173,9 @@ const LiveMeeting = () => {
             <span className="live-dot"></span>
             <span className="live-text">LIVE</span>
           </div>
-          {botStatus && botStatus.duration > 0 && (
+          {botDuration > 0 && (
             <div className="duration">
-              {formatDuration(botStatus.duration)}
+              {formatDuration(botDuration)}
             </div>
           )}
         </div>
@@ -181,7 +209,7 @@ const LiveMeeting = () => {
           </div>
           
           <div className="transcript-stream">
-            {transcriptSegments.length === 0 && !interimTranscript && (
+            {transcriptSegments.length === 0 && (
               <div className="empty-state">
                 <svg width="64" height="64" viewBox="0 0 64 64" fill="none">
                   <rect x="20" y="12" width="24" height="40" rx="4" stroke="#ccc" strokeWidth="2"/>
@@ -192,24 +220,15 @@ const LiveMeeting = () => {
               </div>
             )}
             
-            {transcriptSegments.map((segment, index) => (
-              <div key={index} className="transcript-line">
+            {transcriptSegments.map((segment) => (
+              <div key={segment.segment_id} className="transcript-line">
                 <div className="line-timestamp">
-                  {new Date(segment.timestamp).toLocaleTimeString()}
+                  {formatDuration(segment.start_time)}
                 </div>
                 <div className="line-text">{segment.text}</div>
               </div>
             ))}
             
-            {interimTranscript && (
-              <div className="transcript-line interim">
-                <div className="line-timestamp">
-                  {new Date().toLocaleTimeString()}
-                </div>
-                <div className="line-text">{interimTranscript}</div>
-              </div>
-            )}
-            
             <div ref={transcriptEndRef} />
           </div>
         </div>
@@ -1,10 +1,12 @@
 import React, { useState, useEffect, useRef } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import axios from 'axios';
+import io from 'socket.io-client';
 import AudioPlayer from '../components/AudioPlayer';
 import SyncedTranscript from '../components/SyncedTranscript';
 import StructuredSummary from '../components/StructuredSummary';
 import { formatTime, formatDuration } from '../utils/transcriptHighlighter';
+import { applyTranscriptChanges, applySummaryChanges } from '../utils/transcriptSync';
 import './MeetingDetail.css';
 
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:5000';
@@ -13,10 +15,15 @@ const MeetingDetail = () => {
   const { meetingId } = useParams();
   const navigate = useNavigate();
   const audioPlayerRef = useRef(null);
+  const socketRef = useRef(null);
+  const transcriptRef = useRef(null);
+  const summaryRef = useRef(null);
   
   const [meeting, setMeeting] = useState(null);
   const [transcript, setTranscript] = useState(null);
   const [summary, setSummary] = useState(null);
+  // Summary being generated, filled in from summary_stream events
+  const [streamingSummary, setStreamingSummary] = useState(null);
   const [currentTime, setCurrentTime] = useState(0);
   const [view, setView] = useState('transcript');
   const [isLoading, setIsLoading] = useState(true);
@@ -25,8 +32,110 @@ const MeetingDetail = () => {
 
   useEffect(() => {
     loadMeetingData();
+    connectWebSocket();
+
+    return () => {
+      if (socketRef.current) {
+        socketRef.current.disconnect();
+      }
+    };
   }, [meetingId]);
 
+  useEffect(() => {
+    transcriptRef.current = transcript;
+  }, [transcript]);
+
+  useEffect(() => {
+    summaryRef.current = summary;
+  }, [summary]);
+
+  const connectWebSocket = () => {
+    socketRef.current = io(API_BASE_URL, { transports: ['websocket'] });
+
+    socketRef.current.on('connect', () => {
+      socketRef.current.emit('join_meeting', { meeting_id: meetingId });
+      // Catch up on anything that changed while disconnected
+      socketRef.current.emit('sync_meeting', {
+        meeting_id: meetingId,
+        transcript_version: transcriptRef.current?.version || 0,
+        summary_version: summaryRef.current?.version || 0
+      });
+    });
+
+    socketRef.current.on('transcript_changes', (changes) => {
+      if (changes.meeting_id === meetingId) {
+        handleTranscriptChanges(changes);
+      }
+    });
+
+    socketRef.current.on('summary_changes', (changes) => {
+      if (changes.meeting_id === meetingId) {
+        handleSummaryChanges(changes);
+      }
+    });
+
+    socketRef.current.on('summary_stream', (event) => {
+      if (event.meeting_id === meetingId) {
+        handleSummaryStream(event);
+      }
+    });
+  };
+
+  const handleSummaryStream = (event) => {
+    if (event.type === 'started') {
+      setStreamingSummary({ overview: { text: '' }, action_items: [], outline: [] });
+      return;
+    }
+    if (event.type === 'done' || event.type === 'error') {
+      setStreamingSummary(null);
+      return;
+    }
+
+    setStreamingSummary((current) => {
+      if (!current) return current;
+      if (event.type === 'overview') {
+        return { ...current, overview: { text: current.overview.text + event.text } };
+      }
+      if (event.type === 'action_item') {
+        // Ids are assigned when the summary is saved
+        const item = { completed: false, ...event.item, id: `streaming-${event.index}` };
+        return { ...current, action_items: [...current.action_items, item] };
+      }
+      if (event.type === 'outline') {
+        return { ...current, outline: [...current.outline, event.item] };
+      }
+      return current;
+    });
+  };
+
+  const handleTranscriptChanges = async (changes) => {
+    let merged = applyTranscriptChanges(transcriptRef.current, changes);
+    if (!merged) {
+      const response = await axios.get(`${API_BASE_URL}/api/meetings/${meetingId}/transcript`, {
+        params: { since: transcriptRef.current?.version || 0 }
+      });
+      merged = applyTranscriptChanges(transcriptRef.current, response.data.changes);
+    }
+    if (merged) {
+      transcriptRef.current = merged;
+      setTranscript(merged);
+    }
+  };
+
+  const handleSummaryChanges = async (changes) => {
+    let merged = applySummaryChanges(summaryRef.current, changes);
+    if (!merged) {
+      const response = await axios.get(`${API_BASE_URL}/api/meetings/${meetingId}/summary`, {
+        params: { since: summaryRef.current?.version || 0 }
+      });
+      merged = applySummaryChanges(summaryRef.current, response.data.changes);
+    }
+    if (merged) {
+      summaryRef.current = merged;
+      setSummary(merged);
+    }
+  };
+
   const loadMeetingData = async () => {
     try {
       setIsLoading(true);
@@ -63,7 +172,8 @@ const MeetingDetail = () => {
 
       const response = await axios.post(
         `${API_BASE_URL}/api/meetings/${meetingId}/transcribe`,
-        {},
+        // Re-transcribing asks for a new result, not the cached one
+        { force: Boolean(hasTranscript) },
         { headers: { 'Content-Type': 'application/json' } }
       );
       setTranscript(response.data.transcript);
@@ -80,10 +190,11 @@ const MeetingDetail = () => {
     try {
       setIsProcessing(true);
       setError('');
+      setView('summary');
 
       const response = await axios.post(
         `${API_BASE_URL}/api/meetings/${meetingId}/summarize`,
-        {},
+        { stream: true },
         { headers: { 'Content-Type': 'application/json' } }
       );
       setSummary(response.data.summary);
@@ -91,6 +202,7 @@ const MeetingDetail = () => {
       console.error('Error generating summary:', err);
       setError(err.response?.data?.error || 'Failed to generate summary');
     } finally {
+      setStreamingSummary(null);
       setIsProcessing(false);
     }
   };
@@ -102,19 +214,21 @@ const MeetingDetail = () => {
   const handleToggleActionItem = async (itemId) => {
     if (!summary || !summary.action_items) return;
 
-    const updatedItems = summary.action_items.map(item => {
-      if ((item.id || summary.action_items.indexOf(item)) === itemId) {
-        return { ...item, completed: !item.completed };
-      }
-      return item;
-    });
+    const toggledItem = summary.action_items.find(item => item.id === itemId);
+    if (!toggledItem) return;
+
+    const updatedItems = summary.action_items.map(item =>
+      item.id === itemId ? { ...item, completed: !item.completed } : item
+    );
 
     setSummary({ ...summary, action_items: updatedItems });
 
     try {
-      await axios.patch(`${API_BASE_URL}/api/meetings/${meetingId}/summary`, {
-        action_items: updatedItems
-      });
+      const response = await axios.patch(
+        `${API_BASE_URL}/api/meetings/${meetingId}/action-items/${itemId}`,
+        { completed: !toggledItem.completed }
+      );
+      handleSummaryChanges(response.data.changes);
     } catch (err) {
       console.error('Error updating action item:', err);
     }
@@ -162,8 +276,12 @@ const MeetingDetail = () => {
   }
 
   const hasRecording = meeting.audio_file_path || meeting.recording_url;
+  const recordingVersion = encodeURIComponent((meeting.audio_file_path || '').split(/[\\/]/).pop());
+  const connection = navigator.connection || {};
+  const recordingVariant = connection.saveData || /(^|-)2g$/.test(connection.effectiveType || '') ? 'low' : 'original';
   const hasTranscript = transcript && transcript.segments && transcript.segments.length > 0;
-  const hasSummary = summary && (summary.overview || summary.action_items || summary.outline);
+  const displayedSummary = streamingSummary || summary;
+  const hasSummary = displayedSummary && (displayedSummary.overview || displayedSummary.action_items || displayedSummary.outline);
 
   return (
     <div className="meeting-detail-v2">
@@ -285,9 +403,9 @@ const MeetingDetail = () => {
           ) : (
             hasSummary ? (
               <StructuredSummary 
-                summary={summary}
+                summary={displayedSummary}
                 onSeek={handleSeek}
-                onToggleActionItem={handleToggleActionItem}
+                onToggleActionItem={streamingSummary ? () => {} : handleToggleActionItem}
               />
             ) : (
               <div className="content-placeholder">
@@ -311,7 +429,8 @@ const MeetingDetail = () => {
         <footer className="audio-player-footer">
           <AudioPlayer 
             ref={audioPlayerRef}
-            audioUrl={`${API_BASE_URL}/api/meetings/${meetingId}/audio`}
+            audioUrl={`${API_BASE_URL}/api/meetings/${meetingId}/audio?v=${recordingVersion}&variant=${recordingVariant}`}
+            waveformUrl={`${API_BASE_URL}/api/meetings/${meetingId}/waveform`}
             onTimeUpdate={setCurrentTime}
           />
         </footer>
@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
 import axios from 'axios';
+import io from 'socket.io-client';
 import './MeetingsList.css';
 
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:5000';
@@ -13,8 +14,34 @@ const MeetingsList = () => {
 
   useEffect(() => {
     loadMeetings();
+
+    // Status changes are pushed to the list room in batches, so the list
+    // never has to be refetched to see them
+    const socket = io(API_BASE_URL, { transports: ['websocket'] });
+    socket.on('connect', () => socket.emit('join_meetings_list'));
+    socket.on('meetings_status', (data) => applyStatusUpdates(data.updates || []));
+
+    return () => socket.disconnect();
   }, []);
 
+  const applyStatusUpdates = (updates) => {
+    setMeetings(prev => {
+      let next = prev;
+      for (const { bot, created, deleted, ...fields } of updates) {
+        if (deleted) {
+          next = next.filter(m => m.meeting_id !== fields.meeting_id);
+        } else if (created) {
+          if (!next.some(m => m.meeting_id === fields.meeting_id)) {
+            next = [fields, ...next];
+          }
+        } else if (Object.keys(fields).length > 1) {
+          next = next.map(m => m.meeting_id === fields.meeting_id ? { ...m, ...fields } : m);
+        }
+      }
+      return next;
+    });
+  };
+
   const loadMeetings = async () => {
     try {
       const response = await axios.get(`${API_BASE_URL}/api/meetings`);
@@ -20,8 +20,78 @@ const PhysicalMeeting = () => {
   const mediaRecorderRef = useRef(null);
   const audioChunksRef = useRef([]);
   const timerRef = useRef(null);
+  const liveRef = useRef(null);
+
+  // Send queued chunks one at a time at their byte offset; a failed chunk
+  // stays queued and is retried, and a 409 tells us where the server is.
+  // Every chunk is also kept in audioChunksRef, so whatever the server is
+  // missing can be sent again, and the whole recording can still be
+  // uploaded if the live session fails.
+  const flushLiveChunks = async () => {
+    const live = liveRef.current;
+    if (!live || live.sending) {
+      return;
+    }
+    live.sending = true;
+
+    while (live.queue.length > 0) {
+      const chunk = live.queue[0];
+      try {
+        const response = await axios.put(
+          `${API_BASE_URL}/api/meetings/${live.meetingId}/live-recording`,
+          chunk,
+          {
+            params: { offset: live.offset },
+            headers: { 'Content-Type': 'application/octet-stream' }
+          }
+        );
+        live.offset = response.data.offset;
+        live.queue.shift();
+        live.retries = 0;
+      } catch (err) {
+        if (err.response?.status === 409 && typeof err.response.data?.offset === 'number') {
+          const committed = err.response.data.offset;
+          const recorded = new Blob(audioChunksRef.current);
+          if (committed <= recorded.size) {
+            // Resume from the server's offset with the bytes it lacks
+            live.offset = committed;
+            live.queue = [recorded.slice(committed)];
+            continue;
+          }
+          live.error = 'Live upload is out of sync with the recording';
+          live.queue = [];
+          break;
+        }
+        if (err.response && err.response.status < 500) {
+          live.error = err.response.data?.error || 'Live upload failed';
+          live.queue = [];
+          break;
+        }
+        live.retries += 1;
+        await new Promise(resolve => setTimeout(resolve, Math.min(10000, 500 * 2 ** live.retries)));
+      }
+    }
+
+    live.sending = false;
+    live.drained.forEach(resolve => resolve());
+    live.drained = [];
+  };
+
+  const waitForLiveChunks = () => new Promise((resolve) => {
+    const live = liveRef.current;
+    if (!live || (!live.sending && live.queue.length === 0)) {
+      resolve();
+      return;
+    }
+    live.drained.push(resolve);
+  });
 
   const startRecording = async () => {
+    if (!title.trim()) {
+      setError('Please enter a meeting title');
+      return;
+    }
+
     try {
       const stream = await navigator.mediaDevices.getUserMedia({ audio: true });
       
@@ -30,10 +100,33 @@ const PhysicalMeeting = () => {
       });
 
       audioChunksRef.current = [];
+      liveRef.current = null;
+
+      // Stream chunks to the server as they are recorded so transcription
+      // can start before the meeting ends. If that is unavailable, fall
+      // back to buffering the whole recording and uploading it on stop.
+      try {
+        const meetingResponse = await axios.post(`${API_BASE_URL}/api/meetings`, {
+          title: title,
+          description: description,
+          meeting_type: 'physical',
+          platform: 'recording',
+          status: 'created'
+        });
+        const meetingId = meetingResponse.data.meeting.meeting_id;
+        await axios.post(`${API_BASE_URL}/api/meetings/${meetingId}/live-recording`);
+        liveRef.current = { meetingId, offset: 0, queue: [], sending: false, retries: 0, drained: [] };
+      } catch (err) {
+        console.warn('Live upload unavailable, recording locally:', err);
+      }
 
       mediaRecorderRef.current.ondataavailable = (event) => {
         if (event.data.size > 0) {
           audioChunksRef.current.push(event.data);
+          if (liveRef.current && !liveRef.current.error) {
+            liveRef.current.queue.push(event.data);
+            flushLiveChunks();
+          }
         }
       };
 
@@ -100,15 +193,32 @@ const PhysicalMeeting = () => {
     try {
       const audioBlob = await stopRecording();
 
-      const meetingResponse = await axios.post(`${API_BASE_URL}/api/meetings`, {
-        title: title,
-        description: description,
-        meeting_type: 'physical',
-        platform: 'recording',
-        status: 'created'
-      });
-
-      const meetingId = meetingResponse.data.meeting.meeting_id;
+      let meetingId;
+      if (liveRef.current) {
+        meetingId = liveRef.current.meetingId;
+        // Most of the meeting is already uploaded and transcribed; only
+        // the last chunks and the final span remain
+        await waitForLiveChunks();
+        if (!liveRef.current.error) {
+          await axios.post(`${API_BASE_URL}/api/meetings/${meetingId}/live-recording/stop`);
+          liveRef.current = null;
+          navigate(`/meetings/${meetingId}`);
+          return;
+        }
+        // The server side of the live session is gone or unusable, so
+        // upload the whole recording to the same meeting instead
+        console.warn('Live upload failed, uploading the full recording:', liveRef.current.error);
+        liveRef.current = null;
+      } else {
+        const meetingResponse = await axios.post(`${API_BASE_URL}/api/meetings`, {
+          title: title,
+          description: description,
+          meeting_type: 'physical',
+          platform: 'recording',
+          status: 'created'
+        });
+        meetingId = meetingResponse.data.meeting.meeting_id;
+      }
 
       const formData = new FormData();
       formData.append('audio', audioBlob, `recording_${meetingId}.webm`);
@@ -124,7 +234,7 @@ const PhysicalMeeting = () => {
       navigate(`/meetings/${meetingId}`);
     } catch (err) {
       console.error('Error saving recording:', err);
-      setError(err.response?.data?.error || 'Failed to save recording');
+      setError(err.response?.data?.error || err.message || 'Failed to save recording');
       setIsProcessing(false);
     }
   };
@@ -0,0 +1,96 @@
+import axios from 'axios';
+
+const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:5000';
+
+const MAX_RETRIES = 8;
+// crypto.subtle has no incremental digest, so larger files skip the checksum
+const CHECKSUM_MAX_SIZE = 256 * 1024 * 1024;
+
+const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+
+const storageKey = (file) => `upload:${file.name}:${file.size}:${file.lastModified}`;
+
+const sha256 = async (file) => {
+  if (!window.crypto?.subtle || file.size > CHECKSUM_MAX_SIZE) {
+    return null;
+  }
+  const digest = await window.crypto.subtle.digest('SHA-256', await file.arrayBuffer());
+  const hex = Array.from(new Uint8Array(digest))
+    .map(b => b.toString(16).padStart(2, '0'))
+    .join('');
+  return `sha256:${hex}`;
+};
+
+const resumeOrCreate = async (file, metadata) => {
+  const savedId = localStorage.getItem(storageKey(file));
+  if (savedId) {
+    try {
+      const response = await axios.get(`${API_BASE_URL}/api/uploads/${savedId}`);
+      return response.data;
+    } catch (err) {
+      localStorage.removeItem(storageKey(file));
+    }
+  }
+
+  const response = await axios.post(`${API_BASE_URL}/api/uploads`, {
+    filename: file.name,
+    size: file.size,
+    ...metadata
+  });
+  localStorage.setItem(storageKey(file), response.data.upload_id);
+  return response.data;
+};
+
+/**
+ * Upload a file in chunks, resuming from the server's committed offset
+ * after network errors or a page reload. Resolves with the meeting the
+ * server creates (or updates, when metadata.meeting_id is given).
+ */
+export const uploadResumable = async (file, metadata = {}, onProgress = () => {}) => {
+  const checksumPromise = sha256(file);
+  const upload = await resumeOrCreate(file, metadata);
+  const uploadUrl = `${API_BASE_URL}/api/uploads/${upload.upload_id}`;
+
+  let offset = upload.offset;
+  let retries = 0;
+  onProgress(Math.round((offset * 100) / file.size));
+
+  while (offset < file.size) {
+    const chunk = file.slice(offset, offset + upload.chunk_size);
+    try {
+      const response = await axios.put(uploadUrl, chunk, {
+        params: { offset },
+        headers: { 'Content-Type': 'application/octet-stream' }
+      });
+      offset = response.data.offset;
+      retries = 0;
+      onProgress(Math.round((offset * 100) / file.size));
+    } catch (err) {
+      const serverOffset = err.response?.data?.offset;
+      if (err.response?.status === 409 && typeof serverOffset === 'number') {
+        offset = serverOffset;
+        continue;
+      }
+      if (err.response && err.response.status < 500) {
+        throw err;
+      }
+      if (++retries > MAX_RETRIES) {
+        throw err;
+      }
+      await sleep(Math.min(30000, 1000 * 2 ** retries));
+      // The connection may have dropped mid-chunk; ask where to resume
+      try {
+        const status = await axios.get(uploadUrl);
+        offset = status.data.offset;
+      } catch (statusErr) {
+        console.warn('Could not fetch upload offset, retrying chunk:', statusErr);
+      }
+    }
+  }
+
+  const response = await axios.post(`${uploadUrl}/complete`, {
+    checksum: await checksumPromise
+  });
+  localStorage.removeItem(storageKey(file));
+  return response.data.meeting;
+};
@@ -0,0 +1,60 @@
+// Merge versioned deltas from `GET .../transcript?since=N`, `GET .../summary?since=N`
+// and the `transcript_changes` / `summary_changes` socket events into local state.
+//
+// Each apply function returns the merged document, or null when the delta
+// starts after the version held locally (an update was missed). In that
+// case, fetch the changes since the local version and apply those instead.
+
+const mergeItems = (items, changes, key, idKey) => {
+  const deleted = new Set(changes.deleted || []);
+  const changed = new Map((changes[key] || []).map(item => [item[idKey], item]));
+
+  const merged = [];
+  for (const item of items || []) {
+    if (deleted.has(item[idKey])) continue;
+    if (changed.has(item[idKey])) {
+      merged.push(changed.get(item[idKey]));
+      changed.delete(item[idKey]);
+    } else {
+      merged.push(item);
+    }
+  }
+  return merged.concat(Array.from(changed.values()));
+};
+
+const isApplicable = (current, changes) => {
+  if (changes.full) return true;
+  return (current?.version || 0) >= changes.since;
+};
+
+export const applyTranscriptChanges = (transcript, changes) => {
+  if (!isApplicable(transcript, changes)) return null;
+  if (transcript && changes.version <= transcript.version && !changes.full) return transcript;
+
+  const base = changes.full ? [] : transcript?.segments;
+  const segments = mergeItems(base, changes, 'segments', 'segment_id');
+  segments.sort((a, b) => a.start_time - b.start_time);
+
+  return {
+    ...(transcript || {}),
+    meeting_id: changes.meeting_id,
+    segments,
+    version: changes.version
+  };
+};
+
+export const applySummaryChanges = (summary, changes) => {
+  if (!isApplicable(summary, changes)) return null;
+  if (summary && changes.version <= summary.version && !changes.full) return summary;
+
+  const { meeting_id, version, since, full, deleted, action_items, ...fields } = changes;
+  const base = full ? [] : summary?.action_items;
+
+  return {
+    ...(full ? {} : summary || {}),
+    ...fields,
+    meeting_id,
+    action_items: mergeItems(base, changes, 'action_items', 'id'),
+    version
+  };
+};